@@ -5,9 +5,12 @@ Integrates with the existing main.py chatbot logic
 from typing import Optional, List
 from pydantic import BaseModel
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi import FastAPI, HTTPException, Response
+from fastapi import FastAPI, HTTPException, Request, Response, BackgroundTasks
+from fastapi.responses import PlainTextResponse
+from fastapi.concurrency import run_in_threadpool
 import sys
 import os
+import time
 from dotenv import load_dotenv
 
 # Add parent directory to path to import our chatbot BEFORE importing main
@@ -21,16 +24,24 @@ load_dotenv(env_path)
 # Now import our modules after environment and path are set up
 
 from main import YouTubeRAGChatbot
+from config import Config
+from bulk_ingest import BulkIngestor, configure_service_rate_limits
 from youtube_utils import extract_video_id, validate_video_id
-
-# Debug: Check if environment variable is loaded
-google_api_key = os.getenv("GOOGLE_API_KEY")
-print(
-    f"DEBUG: GOOGLE_API_KEY loaded: {'Yes' if google_api_key else 'No'
-                                     }"
+from utils import (
+    VideoSessionManager, ConversationStore, DashboardAggregator, get_client_pool,
+    get_retry_metrics, get_service_state, metrics, observe, set_instrumentation_enabled,
+    start_request_timings, finish_request_timings, server_timing_header, get_logger, setup_logging,
+    new_request_id, set_request_id, reset_request_id
 )
-if google_api_key:
-    print(f"DEBUG: API Key starts with: {google_api_key[:10]}...")
+
+setup_logging(level=Config.LOG_LEVEL, fmt=Config.LOG_FORMAT, sample_rate=Config.LOG_SAMPLE_RATE)
+logger = get_logger("api")
+
+# Check if environment variable is loaded (never log the key itself)
+if not os.getenv("GOOGLE_API_KEY"):
+    logger.warning("⚠️ GOOGLE_API_KEY is not set")
+
+STARTED_AT = time.time()
 
 app = FastAPI(title="YouTube RAG Chatbot API", version="4.0.0")
 
@@ -50,7 +61,90 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-chatbot_instances = {}
+# Processed videos, bounded in memory. Indexes live in a store shared by all
+# workers, so any worker can serve any processed video.
+chatbot_instances = VideoSessionManager(
+    store_dir=Config.INDEX_STORE_DIR,
+    loader=YouTubeRAGChatbot.load,
+    max_videos=Config.SESSION_MAX_VIDEOS,
+    max_bytes=Config.SESSION_MAX_BYTES,
+    retain_seconds=Config.INDEX_RETAIN_SECONDS,
+)
+
+# Conversation history of chat sessions (per worker process; clients that
+# want follow-up questions send the same session_id with each question)
+conversations = ConversationStore(
+    ttl_seconds=Config.CONVERSATION_TTL_SECONDS,
+    max_sessions=Config.CONVERSATION_MAX_SESSIONS,
+    max_tokens=Config.CONVERSATION_MAX_TOKENS,
+    recent_turns=Config.CONVERSATION_RECENT_TURNS,
+)
+
+# Running dashboard totals, shared by all workers through the registry database
+dashboard_metrics = DashboardAggregator(chatbot_instances.registry.db_path)
+
+# Apply per-service request rates from the environment
+configure_service_rate_limits()
+
+set_instrumentation_enabled(Config.METRICS_ENABLED)
+
+
+def _collect_gauges():
+    """Numbers tracked elsewhere, exported at scrape time"""
+    for policy, counts in get_retry_metrics().items():
+        for field, value in counts.items():
+            yield "retry_events", {"policy": policy, "event": field}, value
+    for service in ("youtube", "embedding", "llm"):
+        stats = get_service_state(service).get_stats()
+        yield "service_paused_seconds", {"service": service}, stats["paused_for"]
+        yield "service_circuit_open", {"service": service}, int(stats["circuit_open"])
+    for key, value in chatbot_instances.get_stats().items():
+        if isinstance(value, (int, float)):
+            yield f"sessions_{key}", {}, value
+    for key, value in conversations.get_stats().items():
+        yield f"conversations_{key}", {}, value
+    for key, value in get_client_pool().prompt_cache.get_stats().items():
+        if isinstance(value, (int, float)):
+            yield f"prompt_cache_{key}", {}, value
+
+
+metrics.register_collector(_collect_gauges)
+
+
+@app.middleware("http")
+async def assign_request_id(request: Request, call_next):
+    """Tag every log line of a request with an id, echoed in X-Request-ID"""
+    request_id = request.headers.get("X-Request-ID") or new_request_id()
+    token = set_request_id(request_id)
+    try:
+        response = await call_next(request)
+    finally:
+        reset_request_id(token)
+    response.headers["X-Request-ID"] = request_id
+    return response
+
+
+@app.middleware("http")
+async def record_request_timing(request: Request, call_next):
+    """Time every request by route and optionally report stage spans in Server-Timing"""
+    if not Config.METRICS_ENABLED:
+        return await call_next(request)
+
+    token = start_request_timings()
+    started_at = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        elapsed = time.perf_counter() - started_at
+        timings = finish_request_timings(token)
+
+    route = request.scope.get("route")
+    observe("http_request_duration_seconds", elapsed,
+            method=request.method, route=getattr(route, "path", "unmatched"),
+            status=response.status_code)
+    if Config.SERVER_TIMING_HEADER:
+        response.headers["Server-Timing"] = server_timing_header(timings, elapsed)
+    return response
 
 
 class VideoProcessRequest(BaseModel):
@@ -59,6 +153,35 @@ class VideoProcessRequest(BaseModel):
     translate_to_english: bool = True  # Default to translate
 
 
+class BulkProcessRequest(BaseModel):
+    video_urls: List[str]
+    language_code: str = "en"
+    translate_to_english: bool = True
+    concurrency: Optional[int] = None  # Defaults to Config.BULK_CONCURRENCY
+
+
+class BatchChatRequest(BaseModel):
+    video_id: str
+    questions: List[str]
+    max_concurrency: Optional[int] = None  # Defaults to Config.BATCH_MAX_CONCURRENCY
+
+
+class BatchAnswer(BaseModel):
+    question: str
+    answer: str
+
+
+class BatchChatResponse(BaseModel):
+    video_id: str
+    answers: List[BatchAnswer]
+    coverage: float = 1.0
+
+
+class ReindexRequest(BaseModel):
+    video_url: str
+    language_code: Optional[str] = None  # Defaults to the language it was processed in
+
+
 class TranscriptListRequest(BaseModel):
     video_url: str
 
@@ -66,17 +189,22 @@ class TranscriptListRequest(BaseModel):
 class ChatRequest(BaseModel):
     video_id: str
     question: str
+    session_id: Optional[str] = None  # Remember the conversation across questions
 
 
 class VideoProcessResponse(BaseModel):
     success: bool
     video_id: str
     message: str
+    status: str = "ready"  # "partial" while the index keeps growing
+    coverage: float = 1.0  # Seconds of video indexed / total seconds
 
 
 class ChatResponse(BaseModel):
     answer: str
     video_id: str
+    coverage: float = 1.0
+    session_id: Optional[str] = None
 
 
 class TimestampInfo(BaseModel):
@@ -91,6 +219,8 @@ class ChatResponseWithTimestamps(BaseModel):
     video_id: str
     timestamps: List[TimestampInfo]
     question: str
+    coverage: float = 1.0
+    session_id: Optional[str] = None
 
 
 # Enhanced API Models
@@ -104,6 +234,8 @@ class SentimentResponse(BaseModel):
     emotional_tone: list
     confidence_score: float
     word_analysis: dict
+    index_version: Optional[str] = None  # Index version the artifacts were computed for
+    stale: bool = False  # Computed for an older index version; a refresh is running
 
 
 class SummaryResponse(BaseModel):
@@ -112,6 +244,24 @@ class SummaryResponse(BaseModel):
     key_takeaways: list
     technical_concepts: list
     generated_at: float
+    index_version: Optional[str] = None  # Index version the artifacts were computed for
+    stale: bool = False  # Computed for an older index version; a refresh is running
+
+
+class ChapterInfo(BaseModel):
+    index: int
+    title: str  # Most distinctive words of the chapter
+    start_time: float
+    end_time: float
+    formatted: str
+    chunk_count: int
+    url: str
+
+
+class ChaptersResponse(BaseModel):
+    video_id: str
+    status: str  # Chapters are built once the video is fully indexed
+    chapters: List[ChapterInfo]
 
 
 class MultiVideoSearchRequest(BaseModel):
@@ -129,6 +279,14 @@ async def root():
     return {"message": "YouTube RAG Chatbot API is running!", "version": "4.0"}
 
 
+@app.get("/health")
+async def health():
+    """
+    Liveness check; answers without touching models, indexes or the registry
+    """
+    return {"status": "ok", "uptime_seconds": round(time.time() - STARTED_AT, 3)}
+
+
 @app.options("/api/transcripts")
 async def transcripts_options(response: Response):
     """Handle CORS preflight for transcripts endpoint"""
@@ -141,11 +299,9 @@ async def get_available_transcripts(request: TranscriptListRequest):
     Get all available transcripts for a YouTube video
     """
     try:
-        print(f"📋 Getting transcripts for URL: {request.video_url}")
-
         # Extract video ID from URL
         video_id = extract_video_id(request.video_url)
-        print(f"📋 Extracted video ID: {video_id}")
+        logger.info("📋 Getting transcripts", extra={"video_id": video_id})
 
         if not validate_video_id(video_id):
             raise HTTPException(
@@ -153,11 +309,8 @@ async def get_available_transcripts(request: TranscriptListRequest):
             )
 
         # Create a temporary chatbot instance to get transcripts
-        print("📋 Creating chatbot instance...")
         chatbot = YouTubeRAGChatbot()
-        print("📋 Getting available transcripts...")
         available_transcripts = chatbot.get_available_transcripts(video_id)
-        print(f"📋 Found {len(available_transcripts)} transcripts")
 
         return {
             "success": True,
@@ -166,13 +319,10 @@ async def get_available_transcripts(request: TranscriptListRequest):
         }
 
     except ValueError as e:
-        print(f"❌ ValueError in transcripts: {str(e)}")
+        logger.warning("❌ Invalid transcripts request: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        print(f"❌ Exception in transcripts: {str(e)}")
-        print(f"❌ Exception type: {type(e).__name__}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ Failed to get transcripts: %s", e)
         raise HTTPException(
             status_code=500, detail=f"Failed to get transcripts: {str(e)}"
         )
@@ -184,10 +334,119 @@ async def process_options(response: Response):
     return {"message": "OK"}
 
 
+def _record_processed(video_id: str, chatbot: YouTubeRAGChatbot):
+    """Add a fully indexed video to the dashboard totals"""
+    try:
+        dashboard_metrics.record_video_processed(
+            video_id,
+            chatbot.get_video_analytics(video_id),
+            chatbot.analyze_video_sentiment(video_id),
+        )
+    except Exception as e:
+        logger.warning("⚠️ Failed to update dashboard for video %s: %s", video_id, e)
+
+
+def _heartbeat(video_id: str):
+    """Tell other workers this one is still indexing the video"""
+    try:
+        chatbot_instances.heartbeat(video_id)
+    except Exception as e:
+        logger.warning("⚠️ Failed to send indexing heartbeat for video %s: %s", video_id, e)
+
+
+def _continue_indexing(video_id: str, chatbot: YouTubeRAGChatbot):
+    """Background task that grows a partially ready index to the full video"""
+    try:
+        chatbot.continue_indexing(on_batch=lambda: _heartbeat(video_id))
+        logger.info("✅ Background indexing finished", extra={"video_id": video_id})
+    except Exception as e:
+        logger.error("❌ Background indexing failed for video %s: %s", video_id, e)
+        return
+
+    # Publish the complete index so other workers pick it up
+    if chatbot_instances.peek(video_id) is chatbot:
+        try:
+            chatbot_instances.persist(video_id)
+        except Exception as e:
+            logger.error("❌ Failed to save index for video %s: %s", video_id, e)
+        _record_processed(video_id, chatbot)
+        if Config.PRECOMPUTE_ARTIFACTS:
+            _precompute_artifacts(video_id, chatbot)
+
+
+def _precompute_artifacts(video_id: str, chatbot: YouTubeRAGChatbot) -> Optional[dict]:
+    """Compute a video's summary and sentiment for its current index version
+    and publish them with the index; None if they could not be computed"""
+    artifacts = chatbot.get_artifacts()
+    if artifacts is not None:
+        return artifacts
+    try:
+        artifacts = chatbot.precompute_artifacts()
+    except Exception as e:
+        logger.warning("⚠️ Failed to precompute artifacts for video %s: %s", video_id, e)
+        return None
+
+    if chatbot_instances.peek(video_id) is chatbot:
+        try:
+            chatbot_instances.persist_state(video_id)
+        except Exception as e:
+            logger.error("❌ Failed to save artifacts for video %s: %s", video_id, e)
+    return artifacts
+
+
+async def _get_artifacts(video_id: str, chatbot: YouTubeRAGChatbot,
+                         background_tasks: BackgroundTasks) -> Optional[dict]:
+    """
+    Precomputed artifacts for a read endpoint.
+
+    Missing ones are computed now; stale ones (from an older index version)
+    are served, flagged stale, while a refresh runs in the background. None
+    while the video is still being indexed.
+    """
+    artifacts = chatbot.get_artifacts(allow_stale=True)
+    if artifacts is None:
+        if not chatbot.is_fully_indexed:
+            return None
+        return await run_in_threadpool(_precompute_artifacts, video_id, chatbot)
+    if artifacts["stale"]:
+        background_tasks.add_task(_precompute_artifacts, video_id, chatbot)
+    return artifacts
+
+
+async def _get_chatbot(video_id: str) -> YouTubeRAGChatbot:
+    """Look up a processed video, loading it from the shared store if needed"""
+    try:
+        return await run_in_threadpool(chatbot_instances.__getitem__, video_id)
+    except KeyError:
+        raise HTTPException(
+            status_code=404,
+            detail="Video not found. Please process the video first.",
+        )
+
+
+def _history(request: ChatRequest) -> str:
+    """Conversation so far for a chat request ("" without a session)"""
+    if not request.session_id:
+        return ""
+    return conversations.get_history(request.session_id, request.video_id)
+
+
+def _remember_turn(request: ChatRequest, answer: str, chatbot: YouTubeRAGChatbot,
+                   background_tasks: BackgroundTasks):
+    """Add a turn to the session; older turns are summarized after the response is sent"""
+    if request.session_id and conversations.add_turn(
+            request.session_id, request.video_id, request.question, answer):
+        background_tasks.add_task(conversations.compact, request.session_id,
+                                  chatbot.summarize_conversation)
+
+
 @app.post("/api/process", response_model=VideoProcessResponse)
-async def process_video(request: VideoProcessRequest):
+async def process_video(request: VideoProcessRequest, background_tasks: BackgroundTasks):
     """
-    Process a YouTube video and prepare it for Q&A
+    Process a YouTube video and prepare it for Q&A.
+
+    Returns as soon as the first Config.PARTIAL_READY_CHUNKS chunks are indexed;
+    the rest of the video is indexed in the background.
     """
     try:
         # Extract video ID from URL
@@ -199,31 +458,67 @@ async def process_video(request: VideoProcessRequest):
             )
 
         # Check if we already have this video processed
-        if video_id in chatbot_instances:
+        if await run_in_threadpool(chatbot_instances.__contains__, video_id):
+            chatbot = await _get_chatbot(video_id)
+            if (chatbot.index_status["state"] == "partial" and not chatbot.is_indexing
+                    and await run_in_threadpool(chatbot_instances.claim, video_id)):
+                # The worker that was indexing it stopped; resume from the saved state
+                logger.info("🔁 Resuming abandoned indexing", extra={"video_id": video_id})
+                background_tasks.add_task(_continue_indexing, video_id, chatbot)
             return VideoProcessResponse(
                 success=True,
                 video_id=video_id,
                 message="Video already processed and ready for Q&A",
+                status=chatbot.index_status["state"],
+                coverage=chatbot.get_coverage(),
+            )
+
+        # Make sure no other worker is ingesting the same video
+        if not await run_in_threadpool(chatbot_instances.claim, video_id):
+            return VideoProcessResponse(
+                success=True,
+                video_id=video_id,
+                message="Video is being processed by another worker",
+                status="processing",
+                coverage=0.0,
             )
 
         # Create and process chatbot
-        print(f"🔧 Creating chatbot instance for video: {video_id}")
+        logger.info("🔧 Processing video",
+                    extra={"video_id": video_id, "language_code": request.language_code})
         chatbot = YouTubeRAGChatbot()
-        print(f"🔧 Processing video with language: {request.language_code}")
         try:
-            chatbot.process_video(
-                video_id, request.language_code, request.translate_to_english
+            await run_in_threadpool(
+                chatbot.process_video,
+                video_id, request.language_code, request.translate_to_english,
+                partial_ready_chunks=Config.PARTIAL_READY_CHUNKS,
             )
-            print(f"✅ Video processing completed successfully")
+            logger.info("✅ Video ready for Q&A",
+                        extra={"video_id": video_id, "coverage": round(chatbot.get_coverage(), 4)})
         except Exception as process_error:
-            print(f"❌ Error during video processing: {str(process_error)}")
-            print(f"❌ Error type: {type(process_error).__name__}")
+            await run_in_threadpool(chatbot_instances.release, video_id)
+            logger.error("❌ Error during video processing: %s", process_error,
+                         extra={"video_id": video_id, "error_type": type(process_error).__name__})
             raise HTTPException(
                 status_code=500, detail=f"Video processing failed: {str(process_error)}"
             )
 
-        # Store the chatbot instance
-        chatbot_instances[video_id] = chatbot
+        # Store the chatbot instance (and publish its index to other workers)
+        await run_in_threadpool(chatbot_instances.__setitem__, video_id, chatbot)
+
+        if chatbot.is_fully_indexed:
+            await run_in_threadpool(_record_processed, video_id, chatbot)
+            if Config.PRECOMPUTE_ARTIFACTS:
+                background_tasks.add_task(_precompute_artifacts, video_id, chatbot)
+        else:
+            background_tasks.add_task(_continue_indexing, video_id, chatbot)
+            return VideoProcessResponse(
+                success=True,
+                video_id=video_id,
+                message="Video partially processed; answering from the indexed portion while indexing continues",
+                status="partial",
+                coverage=chatbot.get_coverage(),
+            )
 
         return VideoProcessResponse(
             success=True,
@@ -231,6 +526,8 @@ async def process_video(request: VideoProcessRequest):
             message=f"Video processed successfully with {request.language_code} transcript and ready for Q&A",
         )
 
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -239,6 +536,87 @@ async def process_video(request: VideoProcessRequest):
         )
 
 
+@app.options("/api/process/bulk")
+async def process_bulk_options(response: Response):
+    """Handle CORS preflight for bulk process endpoint"""
+    return {"message": "OK"}
+
+
+@app.post("/api/process/bulk")
+async def process_videos_bulk(request: BulkProcessRequest):
+    """
+    Process many videos at once, skipping ones that are already processed.
+    Returns a throughput report once every video has been ingested.
+    """
+    if not request.video_urls:
+        raise HTTPException(status_code=400, detail="video_urls must not be empty")
+
+    def store(video_id, chatbot):
+        chatbot_instances[video_id] = chatbot
+        _record_processed(video_id, chatbot)
+        if Config.PRECOMPUTE_ARTIFACTS and Config.BULK_PRECOMPUTE_ARTIFACTS:
+            _precompute_artifacts(video_id, chatbot)
+
+    ingestor = BulkIngestor(
+        concurrency=request.concurrency,
+        is_indexed=lambda video_id: video_id in chatbot_instances,
+        on_processed=store,
+        # Like /api/process: make sure no other worker ingests the same video
+        claim=chatbot_instances.claim,
+        release=chatbot_instances.release,
+    )
+    try:
+        return await run_in_threadpool(
+            ingestor.run, request.video_urls,
+            request.language_code, request.translate_to_english
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Bulk processing failed: {str(e)}")
+
+
+@app.options("/api/reindex")
+async def reindex_options(response: Response):
+    """Handle CORS preflight for reindex endpoint"""
+    return {"message": "OK"}
+
+
+@app.post("/api/reindex")
+async def reindex_video(request: ReindexRequest, background_tasks: BackgroundTasks):
+    """
+    Re-fetch a processed video's transcript and update its index in place.
+
+    Only chunks cut from changed caption segments are re-embedded; the report
+    says how many embeddings were reused instead of recomputed. Precomputed
+    artifacts of a changed transcript turn stale and are refreshed in the
+    background (right away with PRECOMPUTE_ARTIFACTS, otherwise on the next
+    read).
+    """
+    video_id = extract_video_id(request.video_url)
+    if not validate_video_id(video_id):
+        raise HTTPException(status_code=400, detail="Invalid video ID extracted from URL")
+
+    chatbot = await _get_chatbot(video_id)
+    if chatbot.is_indexing:
+        raise HTTPException(status_code=409, detail="Video is still being indexed")
+
+    try:
+        report = await run_in_threadpool(chatbot.reindex, language_code=request.language_code)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error("❌ Reindex failed: %s", e, extra={"video_id": video_id})
+        raise HTTPException(status_code=500, detail=f"Failed to reindex video: {str(e)}")
+
+    # Publish the updated index as a new version for the other workers
+    await run_in_threadpool(chatbot_instances.__setitem__, video_id, chatbot)
+    # Word and chunk counts change with the transcript
+    background_tasks.add_task(_record_processed, video_id, chatbot)
+    if Config.PRECOMPUTE_ARTIFACTS:
+        background_tasks.add_task(_precompute_artifacts, video_id, chatbot)
+    return report
+
+
 @app.options("/api/chat")
 async def chat_options(response: Response):
     """Handle CORS preflight for chat endpoint"""
@@ -251,51 +629,53 @@ async def chat_timestamps_options(response: Response):
     return {"message": "OK"}
 
 
+@app.options("/api/chat/batch")
+async def chat_batch_options(response: Response):
+    """Handle CORS preflight for batch chat endpoint"""
+    return {"message": "OK"}
+
+
 @app.post("/api/chat", response_model=ChatResponse)
-async def chat_with_video(request: ChatRequest):
-    # Add this line
-    print(
-        f"📩 Incoming question for video {request.video_id}: {request.question}")
+async def chat_with_video(request: ChatRequest, background_tasks: BackgroundTasks):
+    logger.debug("📩 Incoming question",
+                 extra={"video_id": request.video_id, "question_chars": len(request.question)})
 
     try:
-        if request.video_id not in chatbot_instances:
-            raise HTTPException(
-                status_code=404,
-                detail="Video not found. Please process the video first.",
-            )
+        chatbot = await _get_chatbot(request.video_id)
+        answer = await run_in_threadpool(chatbot.ask, request.question, _history(request))
+        await run_in_threadpool(dashboard_metrics.record_question, request.video_id)
+        _remember_turn(request, answer, chatbot, background_tasks)
 
-        chatbot = chatbot_instances[request.video_id]
-        answer = chatbot.ask(request.question)
+        logger.debug("🤖 Answer generated",
+                     extra={"video_id": request.video_id, "answer_chars": len(answer)})
 
-        print(f"🤖 Answer generated: {answer}")  # Also log response
-
-        return ChatResponse(answer=answer, video_id=request.video_id)
+        return ChatResponse(answer=answer, video_id=request.video_id,
+                            coverage=chatbot.get_coverage(), session_id=request.session_id)
 
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"❌ Chat error: {e}")
+        logger.error("❌ Chat error: %s", e, extra={"video_id": request.video_id})
         raise HTTPException(
             status_code=500, detail=f"Failed to generate answer: {str(e)}"
         )
 
 
 @app.post("/api/chat/timestamps", response_model=ChatResponseWithTimestamps)
-async def chat_with_video_timestamps(request: ChatRequest):
+async def chat_with_video_timestamps(request: ChatRequest, background_tasks: BackgroundTasks):
     """Chat with video and return answer with timestamp information"""
-    print(
-        f"📩 Incoming question with timestamps for video {request.video_id}: {request.question}")
+    logger.debug("📩 Incoming question with timestamps",
+                 extra={"video_id": request.video_id, "question_chars": len(request.question)})
 
     try:
-        if request.video_id not in chatbot_instances:
-            raise HTTPException(
-                status_code=404,
-                detail="Video not found. Please process the video first.",
-            )
-
-        chatbot = chatbot_instances[request.video_id]
+        chatbot = await _get_chatbot(request.video_id)
 
         # Use the new method that returns timestamps
         if hasattr(chatbot, 'ask_with_timestamps'):
-            result = chatbot.ask_with_timestamps(request.question)
+            result = await run_in_threadpool(
+                chatbot.ask_with_timestamps, request.question, _history(request))
+            await run_in_threadpool(dashboard_metrics.record_question, request.video_id)
+            _remember_turn(request, result['answer'], chatbot, background_tasks)
 
             # Convert timestamps to the required format
             timestamp_infos = []
@@ -311,35 +691,102 @@ async def chat_with_video_timestamps(request: ChatRequest):
                 answer=result['answer'],
                 video_id=result['video_id'],
                 timestamps=timestamp_infos,
-                question=result['question']
+                question=result['question'],
+                coverage=chatbot.get_coverage(),
+                session_id=request.session_id
             )
         else:
             # Fallback to regular chat if timestamps not supported
-            answer = chatbot.ask(request.question)
+            answer = await run_in_threadpool(chatbot.ask, request.question, _history(request))
+            await run_in_threadpool(dashboard_metrics.record_question, request.video_id)
+            _remember_turn(request, answer, chatbot, background_tasks)
             return ChatResponseWithTimestamps(
                 answer=answer,
                 video_id=request.video_id,
                 timestamps=[],
-                question=request.question
+                question=request.question,
+                coverage=chatbot.get_coverage(),
+                session_id=request.session_id
             )
 
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"❌ Chat with timestamps error: {e}")
+        logger.error("❌ Chat with timestamps error: %s", e, extra={"video_id": request.video_id})
         raise HTTPException(
             status_code=500, detail=f"Failed to generate answer with timestamps: {str(e)}"
         )
 
 
+@app.post("/api/chat/batch", response_model=BatchChatResponse)
+async def chat_batch(request: BatchChatRequest):
+    """
+    Answer several questions about one video at once.
+
+    The questions share one embedding request and one index search; their
+    LLM calls run concurrently (at most max_concurrency at a time).
+    """
+    if not request.questions:
+        raise HTTPException(status_code=400, detail="No questions given")
+    if len(request.questions) > Config.BATCH_MAX_QUESTIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {Config.BATCH_MAX_QUESTIONS} questions per batch",
+        )
+    if request.max_concurrency is not None and request.max_concurrency < 1:
+        raise HTTPException(status_code=400, detail="max_concurrency must be at least 1")
+
+    logger.debug("📩 Incoming question batch",
+                 extra={"video_id": request.video_id, "questions": len(request.questions)})
+
+    try:
+        chatbot = await _get_chatbot(request.video_id)
+        answers = await run_in_threadpool(chatbot.ask_batch, request.questions,
+                                          request.max_concurrency)
+        await run_in_threadpool(dashboard_metrics.record_question, request.video_id,
+                                len(request.questions))
+
+        return BatchChatResponse(
+            video_id=request.video_id,
+            answers=[BatchAnswer(question=question, answer=answer)
+                     for question, answer in zip(request.questions, answers)],
+            coverage=chatbot.get_coverage(),
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("❌ Batch chat error: %s", e, extra={"video_id": request.video_id})
+        raise HTTPException(
+            status_code=500, detail=f"Failed to answer questions: {str(e)}"
+        )
+
+
 @app.get("/api/status/{video_id}")
 async def get_video_status(video_id: str):
     """
     Check if a video is processed and ready for Q&A
     """
-    is_ready = video_id in chatbot_instances
+    is_ready = await run_in_threadpool(chatbot_instances.__contains__, video_id)
+    if not is_ready:
+        return {
+            "video_id": video_id,
+            "is_ready": False,
+            "status": "not_processed",
+            "coverage": 0.0,
+            "message": "Video not processed yet",
+        }
+
+    index_status = (await _get_chatbot(video_id)).get_index_status()
+    is_partial = index_status["state"] == "partial"
     return {
         "video_id": video_id,
-        "is_ready": is_ready,
-        "message": "Video is ready for Q&A" if is_ready else "Video not processed yet",
+        "is_ready": True,
+        "status": index_status["state"],
+        "coverage": index_status["coverage"],
+        "indexed_chunks": index_status.get("indexed_chunks", 0),
+        "total_chunks": index_status.get("total_chunks", 0),
+        "message": "Video is partially indexed and ready for Q&A" if is_partial else "Video is ready for Q&A",
     }
 
 
@@ -348,34 +795,44 @@ async def clear_video(video_id: str):
     """
     Clear a processed video from memory
     """
-    if video_id in chatbot_instances:
-        del chatbot_instances[video_id]
+    try:
+        await run_in_threadpool(chatbot_instances.__delitem__, video_id)
+        await run_in_threadpool(dashboard_metrics.record_video_removed, video_id)
         return {"message": f"Video {video_id} cleared from memory"}
-    else:
+    except KeyError:
         raise HTTPException(status_code=404, detail="Video not found")
 
 
-@app.get("/api/videos")
-async def list_processed_videos():
-    """
-    List all currently processed videos
-    """
-    # Enhanced with analytics summary
+def _video_summaries() -> dict:
+    """Analytics of every processed video (reads the registry; run off the event loop)"""
     video_summaries = {}
-    for video_id, chatbot in chatbot_instances.items():
-        if hasattr(chatbot, 'get_video_analytics'):
+    for video_id in chatbot_instances:
+        # Don't reload evicted sessions just to list them
+        chatbot = chatbot_instances.peek(video_id)
+        if chatbot is None:
+            video_summaries[video_id] = {"status": "on_disk"}
+        elif hasattr(chatbot, 'get_video_analytics'):
             analytics = chatbot.get_video_analytics(video_id)
             video_summaries[video_id] = analytics
         else:
             video_summaries[video_id] = {"status": "processed"}
 
     return {
-        "processed_videos": list(chatbot_instances.keys()),
-        "count": len(chatbot_instances),
+        "processed_videos": list(video_summaries),
+        "count": len(video_summaries),
         "video_summaries": video_summaries
     }
 
 
+@app.get("/api/videos")
+async def list_processed_videos():
+    """
+    List all currently processed videos
+    """
+    # Enhanced with analytics summary
+    return await run_in_threadpool(_video_summaries)
+
+
 # ==================== ENHANCED API ENDPOINTS ====================
 
 @app.get("/api/analytics/{video_id}", response_model=AnalyticsResponse)
@@ -384,14 +841,8 @@ async def get_video_analytics(video_id: str):
     Get comprehensive analytics for a processed video
     """
     try:
-        if video_id not in chatbot_instances:
-            raise HTTPException(
-                status_code=404,
-                detail="Video not found. Please process the video first."
-            )
-
-        chatbot = chatbot_instances[video_id]
-        analytics = chatbot.get_video_analytics(video_id)
+        chatbot = await _get_chatbot(video_id)
+        analytics = await run_in_threadpool(chatbot.get_video_analytics, video_id)
 
         if "error" in analytics:
             raise HTTPException(status_code=500, detail=analytics["error"])
@@ -400,25 +851,25 @@ async def get_video_analytics(video_id: str):
             video_stats=analytics["video_stats"],
             interaction_stats=analytics["interaction_stats"]
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Analytics error: {str(e)}")
 
 
 @app.get("/api/sentiment/{video_id}", response_model=SentimentResponse)
-async def get_video_sentiment(video_id: str):
+async def get_video_sentiment(video_id: str, background_tasks: BackgroundTasks):
     """
-    Analyze sentiment and emotional tone of a video
+    Analyze sentiment and emotional tone of a video (precomputed per index version)
     """
     try:
-        if video_id not in chatbot_instances:
-            raise HTTPException(
-                status_code=404,
-                detail="Video not found. Please process the video first."
-            )
-
-        chatbot = chatbot_instances[video_id]
-        sentiment = chatbot.analyze_video_sentiment(video_id)
+        chatbot = await _get_chatbot(video_id)
+        artifacts = await _get_artifacts(video_id, chatbot, background_tasks)
+        if artifacts is not None:
+            sentiment = artifacts["sentiment"]
+        else:
+            sentiment = await run_in_threadpool(chatbot.analyze_video_sentiment, video_id)
 
         if "error" in sentiment:
             raise HTTPException(status_code=500, detail=sentiment["error"])
@@ -427,27 +878,30 @@ async def get_video_sentiment(video_id: str):
             overall_sentiment=sentiment["overall_sentiment"],
             emotional_tone=sentiment["emotional_tone"],
             confidence_score=sentiment["confidence_score"],
-            word_analysis=sentiment["word_analysis"]
+            word_analysis=sentiment["word_analysis"],
+            index_version=artifacts["index_version"] if artifacts else None,
+            stale=artifacts["stale"] if artifacts else False,
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Sentiment analysis error: {str(e)}")
 
 
 @app.get("/api/summary/{video_id}", response_model=SummaryResponse)
-async def get_video_summary(video_id: str):
+async def get_video_summary(video_id: str, background_tasks: BackgroundTasks):
     """
-    Generate structured summary of a video
+    Generate structured summary of a video (precomputed per index version)
     """
     try:
-        if video_id not in chatbot_instances:
-            raise HTTPException(
-                status_code=404,
-                detail="Video not found. Please process the video first."
-            )
-
-        chatbot = chatbot_instances[video_id]
-        summary = chatbot.generate_structured_summary(video_id)
+        chatbot = await _get_chatbot(video_id)
+        artifacts = await _get_artifacts(video_id, chatbot, background_tasks)
+        if artifacts is not None:
+            summary = artifacts["summary"]
+        else:
+            # Still indexing: summarize what is indexed so far, without storing it
+            summary = await run_in_threadpool(chatbot.generate_structured_summary, video_id)
 
         if "error" in summary:
             raise HTTPException(status_code=500, detail=summary["error"])
@@ -457,13 +911,37 @@ async def get_video_summary(video_id: str):
             detailed_summary=summary["detailed_summary"],
             key_takeaways=summary["key_takeaways"],
             technical_concepts=summary["technical_concepts"],
-            generated_at=summary["generated_at"]
+            generated_at=summary["generated_at"],
+            index_version=artifacts["index_version"] if artifacts else None,
+            stale=artifacts["stale"] if artifacts else False,
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Summary generation error: {str(e)}")
 
 
+@app.get("/api/chapters/{video_id}", response_model=ChaptersResponse)
+async def get_video_chapters(video_id: str):
+    """
+    Topical chapters of a video with their time ranges (empty while the video
+    is still being indexed, and for short videos answered without an index)
+    """
+    chatbot = await _get_chatbot(video_id)
+    try:
+        chapters = await run_in_threadpool(chatbot.get_chapters)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Chapter error: {str(e)}")
+
+    return ChaptersResponse(
+        video_id=video_id,
+        status=chatbot.index_status.get("state", "unknown"),
+        chapters=[ChapterInfo(**chapter, url=chatbot.get_youtube_timestamp_url(
+            video_id, chapter["start_time"])) for chapter in chapters],
+    )
+
+
 @app.post("/api/search", response_model=MultiVideoSearchResponse)
 async def search_across_videos(request: MultiVideoSearchRequest):
     """
@@ -474,30 +952,33 @@ async def search_across_videos(request: MultiVideoSearchRequest):
         videos_searched = 0
 
         # If specific video IDs provided, search only those
-        target_videos = request.video_ids if request.video_ids else list(
-            chatbot_instances.keys())
+        target_videos = request.video_ids if request.video_ids else await run_in_threadpool(
+            list, chatbot_instances)
 
         for video_id in target_videos:
-            if video_id in chatbot_instances:
-                chatbot = chatbot_instances[video_id]
-                try:
-                    # Search this specific video
-                    if hasattr(chatbot, 'search_across_videos'):
-                        results = chatbot.search_across_videos(request.query)
-                        all_results.extend(results)
-                    else:
-                        # Fallback to regular ask method
-                        answer = chatbot.ask(request.query)
-                        all_results.append({
-                            "video_id": video_id,
-                            "answer": answer,
-                            "confidence": 0.7,
-                            "relevant": True
-                        })
-                    videos_searched += 1
-                except Exception as e:
-                    print(f"Error searching video {video_id}: {e}")
-                    continue
+            # Loading a video from the shared store hits disk; keep it off the event loop
+            try:
+                chatbot = await _get_chatbot(video_id)
+            except HTTPException:
+                continue
+            try:
+                # Search this specific video
+                if hasattr(chatbot, 'search_across_videos'):
+                    results = await run_in_threadpool(chatbot.search_across_videos, request.query)
+                    all_results.extend(results)
+                else:
+                    # Fallback to regular ask method
+                    answer = await run_in_threadpool(chatbot.ask, request.query)
+                    all_results.append({
+                        "video_id": video_id,
+                        "answer": answer,
+                        "confidence": 0.7,
+                        "relevant": True
+                    })
+                videos_searched += 1
+            except Exception as e:
+                logger.warning("⚠️ Error searching video %s: %s", video_id, e)
+                continue
 
         # Sort by confidence score
         all_results.sort(key=lambda x: x.get("confidence", 0), reverse=True)
@@ -512,89 +993,47 @@ async def search_across_videos(request: MultiVideoSearchRequest):
 
 
 @app.get("/api/dashboard")
-async def get_dashboard_data():
-    """
-    Get comprehensive dashboard data for all processed videos
+async def get_dashboard_data(page: int = 1, page_size: int = 20):
     """
-    try:
-        dashboard_data = {
-            "total_videos": len(chatbot_instances),
-            "videos": [],
-            "system_stats": {
-                "total_questions_asked": 0,
-                "avg_processing_time": 0,
-                "total_words_processed": 0
-            }
-        }
-
-        processing_times = []
-        total_questions = 0
-        total_words = 0
-
-        for video_id, chatbot in chatbot_instances.items():
-            try:
-                if hasattr(chatbot, 'get_video_analytics'):
-                    analytics = chatbot.get_video_analytics(video_id)
-                    sentiment = chatbot.analyze_video_sentiment(video_id)
-
-                    video_data = {
-                        "video_id": video_id,
-                        "analytics": analytics,
-                        "sentiment": sentiment,
-                        "status": "ready"
-                    }
-
-                    # Aggregate stats
-                    if "video_stats" in analytics:
-                        processing_times.append(
-                            analytics["video_stats"].get("processing_time", 0))
-                        total_questions += analytics["interaction_stats"].get(
-                            "total_questions", 0)
-                        total_words += analytics["video_stats"].get(
-                            "word_count", 0)
-                else:
-                    video_data = {
-                        "video_id": video_id,
-                        "status": "processed",
-                        "analytics": {},
-                        "sentiment": {}
-                    }
+    Get dashboard data: system totals plus one page of per-video detail.
 
-                dashboard_data["videos"].append(video_data)
-            except Exception as e:
-                print(f"Error getting data for video {video_id}: {e}")
-                continue
+    Totals are maintained incrementally, so this is constant work regardless
+    of how many videos have been processed.
+    """
+    if page < 1 or not 1 <= page_size <= 100:
+        raise HTTPException(
+            status_code=400, detail="page must be >= 1 and page_size between 1 and 100")
 
-        # Calculate system stats
-        dashboard_data["system_stats"]["total_questions_asked"] = total_questions
-        dashboard_data["system_stats"]["avg_processing_time"] = (
-            sum(processing_times) /
-            len(processing_times) if processing_times else 0
-        )
-        dashboard_data["system_stats"]["total_words_processed"] = total_words
+    try:
+        system_stats = await run_in_threadpool(dashboard_metrics.get_system_stats)
+        videos = await run_in_threadpool(dashboard_metrics.get_videos, page, page_size)
+        total_videos = system_stats.pop("total_videos")
 
-        return dashboard_data
+        return {
+            "total_videos": total_videos,
+            "videos": videos,
+            "system_stats": system_stats,
+            "page": page,
+            "page_size": page_size,
+            "total_pages": (total_videos + page_size - 1) // page_size,
+        }
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Dashboard error: {str(e)}")
 
 
 @app.get("/api/export/{video_id}")
-async def export_video_data(video_id: str):
+async def export_video_data(video_id: str, background_tasks: BackgroundTasks):
     """
     Export comprehensive data for a video
     """
     try:
-        if video_id not in chatbot_instances:
-            raise HTTPException(
-                status_code=404,
-                detail="Video not found. Please process the video first."
-            )
-
-        chatbot = chatbot_instances[video_id]
+        chatbot = await _get_chatbot(video_id)
 
         if hasattr(chatbot, 'export_analytics'):
-            export_data = chatbot.export_analytics(video_id)
+            await _get_artifacts(video_id, chatbot, background_tasks)
+            export_data = await run_in_threadpool(
+                chatbot.export_analytics, video_id, allow_stale=True)
         else:
             # Fallback export
             export_data = {
@@ -604,6 +1043,8 @@ async def export_video_data(video_id: str):
             }
 
         return export_data
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Export error: {str(e)}")
 
@@ -614,7 +1055,7 @@ async def list_processed_videos():
     List all processed videos
     """
     try:
-        processed_videos = list(chatbot_instances.keys())
+        processed_videos = await run_in_threadpool(list, chatbot_instances)
         return {
             "processed_videos": processed_videos,
             "total_count": len(processed_videos)
@@ -624,6 +1065,37 @@ async def list_processed_videos():
             status_code=500, detail=f"Failed to list videos: {str(e)}")
 
 
+@app.get("/api/sessions/stats")
+async def get_session_stats():
+    """
+    Memory usage of processed videos: resident count/bytes, evictions and reload latency,
+    plus live chat conversations
+    """
+    stats = await run_in_threadpool(chatbot_instances.get_stats)
+    return {**stats, "conversations": conversations.get_stats()}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """
+    Stage timings, request latencies, retry and session metrics in Prometheus text format
+    """
+    return PlainTextResponse(metrics.render_prometheus(),
+                             media_type="text/plain; version=0.0.4")
+
+
+@app.get("/api/retry/stats")
+async def get_retry_stats():
+    """
+    Attempts, retries and give-ups per retry policy, plus each service's pause and circuit state
+    """
+    return {
+        "policies": get_retry_metrics(),
+        "services": {service: get_service_state(service).get_stats()
+                     for service in ("youtube", "embedding", "llm")},
+    }
+
+
 # Enhanced CORS options for new endpoints
 @app.options("/api/analytics/{video_id}")
 async def analytics_options():
@@ -640,6 +1112,11 @@ async def summary_options():
     return {"message": "OK"}
 
 
+@app.options("/api/chapters/{video_id}")
+async def chapters_options():
+    return {"message": "OK"}
+
+
 @app.options("/api/search")
 async def search_options():
     return {"message": "OK"}
@@ -0,0 +1,4 @@
+"""
+Offline benchmarks for YouTube RAG Chatbot.
+Everything here runs against deterministic local fakes; no network access needed.
+"""
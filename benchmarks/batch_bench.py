@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Batched question answering (YouTubeRAGChatbot.ask_batch) against asking the
+same questions one by one in a loop.
+
+Embedding and LLM latency are simulated with the fakes, so the numbers show
+what batching saves in round trips: the serial loop pays one query embedding
+and one LLM call per question in sequence, while a batch makes one embedding
+request and one index search and overlaps the LLM calls up to
+max_concurrency.
+
+Usage:
+    python -m benchmarks.batch_bench --questions 1 5 20 --concurrency 1 4 8 --output batch.json
+"""
+
+import argparse
+import json
+import os
+import time
+from typing import List
+
+# Keep benchmark output readable; must be set before config is imported
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from benchmarks.fakes import install_fakes  # noqa: E402
+from benchmarks.stats import summarize  # noqa: E402
+
+QUESTION_TEMPLATES = [
+    "What is said about marker{n}?",
+    "How does marker{n} relate to training the model?",
+    "Explain the part about marker{n} and the cache",
+    "Which examples mention marker{n}?",
+]
+
+
+def make_questions(count: int) -> List[str]:
+    return [QUESTION_TEMPLATES[i % len(QUESTION_TEMPLATES)].format(n=i * 7 % 500)
+            for i in range(count)]
+
+
+def bench(chatbot, pool, name: str, params: dict, run, repeats: int) -> dict:
+    run()  # Warm up
+    embedding_calls = pool.embedding_model.calls
+    samples = []
+    for _ in range(repeats):
+        started_at = time.perf_counter()
+        run()
+        samples.append(time.perf_counter() - started_at)
+    return {
+        "name": name,
+        "params": params,
+        "embedding_calls_per_run": round((pool.embedding_model.calls - embedding_calls) / repeats, 2),
+        **summarize(samples),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--questions", type=int, nargs="+", default=[1, 5, 20],
+                        help="Questions per batch")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8],
+                        help="max_concurrency values for ask_batch")
+    parser.add_argument("--segments", type=int, default=600, help="Caption segments in the video")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed runs per configuration")
+    parser.add_argument("--llm-sleep-ms", type=float, default=50.0,
+                        help="Simulated LLM latency per call")
+    parser.add_argument("--embedding-latency", type=float, default=0.02,
+                        help="Simulated embedding API latency in seconds")
+    parser.add_argument("--output", default=None, help="Write JSON results here")
+    args = parser.parse_args(argv)
+
+    pool = install_fakes(segments_per_video=args.segments, llm_sleep_ms=args.llm_sleep_ms,
+                         embedding_latency=args.embedding_latency)
+    from main import YouTubeRAGChatbot
+
+    chatbot = YouTubeRAGChatbot(clients=pool)
+    chatbot.config.DIRECT_CONTEXT_MAX_TOKENS = 0
+    chatbot.config.LEXICAL_ONLY_MAX_CHUNKS = 0
+    chatbot.process_video("batchvideo0")
+
+    results = []
+    for count in args.questions:
+        questions = make_questions(count)
+        params = {"questions": count, "segments": args.segments}
+        results.append(bench(chatbot, pool, "serial", {**params, "concurrency": 1},
+                             lambda: [chatbot.ask(question) for question in questions],
+                             args.repeats))
+        for concurrency in args.concurrency:
+            results.append(bench(chatbot, pool, "batch", {**params, "concurrency": concurrency},
+                                 lambda: chatbot.ask_batch(questions, concurrency),
+                                 args.repeats))
+
+    for result in results:
+        params = result["params"]
+        print(f"❓ {result['name']:<7} questions {params['questions']:>3}  "
+              f"concurrency {params['concurrency']:>2}  "
+              f"p50 {result['p50_ms']:>9.1f}ms  p95 {result['p95_ms']:>9.1f}ms  "
+              f"embedding calls {result['embedding_calls_per_run']}")
+
+    report = {"benchmark": "batch_questions", "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Chapter segmentation cost and "where does it talk about X" latency.
+
+Chapters are built from the chunk vectors at the end of indexing; the build
+is timed per video length. Navigation questions are then answered from the
+chapters (one query embedding and one product with the chapter centroids)
+and, with CHAPTER_NAVIGATION off, by the full RAG chain, whose LLM latency is
+simulated with the fakes.
+
+Usage:
+    python -m benchmarks.chapter_bench --segments 600 2400 --llm-sleep-ms 400 --output chapters.json
+"""
+
+import argparse
+import json
+import os
+import time
+
+# Keep benchmark output readable; must be set before config is imported
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from benchmarks.fakes import install_fakes  # noqa: E402
+from benchmarks.stats import summarize  # noqa: E402
+
+QUESTIONS = [
+    "Where does it talk about gradient descent?",
+    "When does the speaker explain the cache latency?",
+    "At what point do they discuss the database query?",
+    "Which part covers deploying the container?",
+]
+
+
+def bench_video(segments: int, repeats: int, llm_sleep_ms: float) -> list:
+    from main import YouTubeRAGChatbot
+
+    pool = install_fakes(segments_per_video=segments, llm_sleep_ms=llm_sleep_ms)
+    chatbot = YouTubeRAGChatbot(clients=pool)
+    chatbot.config.DIRECT_CONTEXT_MAX_TOKENS = 0
+    # Bag-of-words fake embeddings score far lower than real ones
+    chatbot.config.CHAPTER_MIN_SCORE = 0.0
+    chatbot.process_video(f"chap{segments % 10 ** 7:07d}")
+
+    build_samples = []
+    for _ in range(repeats):
+        chatbot.chapter_index = None
+        started_at = time.perf_counter()
+        chatbot.get_chapter_index()
+        build_samples.append(time.perf_counter() - started_at)
+
+    results = [{
+        "name": "build",
+        "params": {"segments": segments, "chunks": len(chatbot.vector_store.index_to_docstore_id),
+                   "chapters": len(chatbot.chapter_index)},
+        **summarize(build_samples),
+    }]
+    for name, navigation in (("chapters", True), ("rag", False)):
+        chatbot.config.CHAPTER_NAVIGATION = navigation
+        samples = []
+        for _ in range(repeats):
+            for question in QUESTIONS:
+                started_at = time.perf_counter()
+                chatbot.ask(question)
+                samples.append(time.perf_counter() - started_at)
+        results.append({"name": name, "params": {"segments": segments}, **summarize(samples)})
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--segments", type=int, nargs="+", default=[600, 2400],
+                        help="Caption segments per video")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed runs per measurement")
+    parser.add_argument("--llm-sleep-ms", type=float, default=400.0,
+                        help="Simulated LLM latency per call")
+    parser.add_argument("--output", default=None, help="Write JSON results here")
+    args = parser.parse_args(argv)
+
+    results = []
+    for segments in args.segments:
+        results.extend(bench_video(segments, args.repeats, args.llm_sleep_ms))
+
+    for result in results:
+        extra = (f"  {result['params']['chunks']} chunks -> {result['params']['chapters']} chapters"
+                 if result["name"] == "build" else "")
+        print(f"📚 {result['name']:<9} segments {result['params']['segments']:>5}  "
+              f"p50 {result['p50_ms']:>9.2f}ms  p95 {result['p95_ms']:>9.2f}ms{extra}")
+
+    report = {"benchmark": "chapters", "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+"""
+backend/app.py wired to the offline fakes, for running under uvicorn.
+
+    python -m uvicorn benchmarks.fake_app:app --workers 4
+
+FAKE_LLM_CPU_MS / FAKE_LLM_SLEEP_MS / FAKE_SEGMENTS control the fake workload.
+"""
+
+import os
+
+from benchmarks.fakes import install_fakes
+
+install_fakes(
+    segments_per_video=int(os.getenv("FAKE_SEGMENTS", "600")),
+    llm_cpu_ms=float(os.getenv("FAKE_LLM_CPU_MS", "0")),
+    llm_sleep_ms=float(os.getenv("FAKE_LLM_SLEEP_MS", "0")),
+)
+
+from backend.app import app  # noqa: E402
@@ -0,0 +1,159 @@
+"""
+Deterministic local stand-ins for YouTube, the embedding model, the LLM and
+the translator.
+"""
+
+import hashlib
+import os
+import random
+import time
+from collections import namedtuple
+from typing import List, Optional
+
+import numpy as np
+
+# Config validates the key at chatbot creation; fakes never use it
+os.environ.setdefault("GOOGLE_API_KEY", "offline-benchmark")
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.runnables import RunnableLambda
+
+FakeSegment = namedtuple("FakeSegment", ["text", "start", "duration"])
+
+VOCABULARY = (
+    "neural network training data model python function variable loop class "
+    "gradient descent loss accuracy layer tensor vector matrix database query "
+    "server cloud deploy container cache latency throughput memory thread "
+    "process kernel compiler syntax error debug test benchmark profile"
+).split()
+
+
+def make_segments(video_id: str, count: int = 600, words_per_segment: int = 10,
+                  segment_seconds: float = 4.0) -> List[FakeSegment]:
+    """Synthetic caption segments, identical for the same video id"""
+    rng = random.Random(video_id)
+    segments = []
+    for i in range(count):
+        words = [rng.choice(VOCABULARY) for _ in range(words_per_segment)]
+        segments.append(FakeSegment(
+            f"{' '.join(words)} marker{i}", i * segment_seconds, segment_seconds))
+    return segments
+
+
+class FakeTranscriptApi:
+    """Mimics YouTubeTranscriptApi.list()/fetch() with synthetic segments"""
+
+    def __init__(self, segments_per_video: int = 600, latency: float = 0.0):
+        self.segments_per_video = segments_per_video
+        self.latency = latency
+
+    class _Transcript:
+        def __init__(self, api, video_id, language_code):
+            self.api = api
+            self.video_id = video_id
+            self.language_code = language_code
+            self.language = language_code
+            self.is_generated = False
+            self.is_translatable = True
+
+        def fetch(self):
+            time.sleep(self.api.latency)
+            return make_segments(self.video_id, self.api.segments_per_video)
+
+    class _TranscriptList:
+        def __init__(self, api, video_id):
+            self.transcripts = [FakeTranscriptApi._Transcript(api, video_id, "en")]
+
+        def find_transcript(self, language_codes):
+            transcript = self.transcripts[0]
+            return FakeTranscriptApi._Transcript(transcript.api, transcript.video_id, language_codes[0])
+
+        def __iter__(self):
+            return iter(self.transcripts)
+
+    def list(self, video_id: str):
+        time.sleep(self.latency)
+        return self._TranscriptList(self, video_id)
+
+    def fetch(self, video_id: str, languages=None):
+        time.sleep(self.latency)
+        return make_segments(video_id, self.segments_per_video)
+
+
+class HashEmbeddings(Embeddings):
+    """Bag-of-words vectors built from token hashes; similar texts score high"""
+
+    def __init__(self, dimensions: int = 256, latency: float = 0.0):
+        self.dimensions = dimensions
+        self.latency = latency
+        self.calls = 0
+
+    def _embed(self, text: str) -> List[float]:
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for token in text.lower().split():
+            digest = hashlib.md5(token.encode("utf-8")).digest()
+            vector[int.from_bytes(digest[:4], "little") % self.dimensions] += 1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts: List[str], task_type: Optional[str] = None) -> List[List[float]]:
+        # task_type mirrors the Gemini signature; queries and documents embed alike here
+        self.calls += 1
+        time.sleep(self.latency)
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        self.calls += 1
+        time.sleep(self.latency)
+        return self._embed(text)
+
+
+class FakeTranslator:
+    """Mimics deep_translator.GoogleTranslator: upper-cases text after a delay"""
+
+    def __init__(self, source: str = "auto", target: str = "en", latency: float = 0.0):
+        self.source = source
+        self.target = target
+        self.latency = latency
+
+    def translate(self, text: str) -> str:
+        time.sleep(self.latency)
+        return text.upper()
+
+
+def make_fake_llm(cpu_ms: float = 0.0, sleep_ms: float = 0.0):
+    """
+    Runnable LLM that echoes the prompt size.
+
+    cpu_ms spins a pure-Python loop (holding the GIL) to model CPU-bound work;
+    sleep_ms models network latency.
+    """
+    def respond(prompt) -> str:
+        text = prompt.to_string() if hasattr(prompt, "to_string") else str(prompt)
+        if sleep_ms:
+            time.sleep(sleep_ms / 1000)
+        if cpu_ms:
+            deadline = time.perf_counter() + cpu_ms / 1000
+            spins = 0
+            while time.perf_counter() < deadline:
+                spins += 1
+        return f"Answer based on {len(text)} prompt characters."
+
+    return RunnableLambda(respond)
+
+
+def install_fakes(segments_per_video: int = 600, llm_cpu_ms: float = 0.0,
+                  llm_sleep_ms: float = 0.0, embedding_latency: float = 0.0,
+                  translator_latency: float = 0.0):
+    """Point the shared client pool at the fakes"""
+    from utils import get_client_pool
+
+    pool = get_client_pool()
+    pool.set_clients(
+        ytt_api=FakeTranscriptApi(segments_per_video),
+        embedding_model=HashEmbeddings(latency=embedding_latency),
+        llm=make_fake_llm(cpu_ms=llm_cpu_ms, sleep_ms=llm_sleep_ms),
+        translator_factory=lambda source, target: FakeTranslator(source, target, translator_latency),
+        translation_delay=0.0,
+    )
+    return pool
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+In-process HTTP load test for backend/app.py with fake model clients.
+
+The app is driven through httpx's ASGITransport, so no server, port or
+network is needed. Virtual users send a weighted mix of process, chat,
+chat/timestamps, summary, dashboard and search requests for a fixed
+duration; the report has per-endpoint latency percentiles, throughput and
+error rate.
+
+A probe task also measures event-loop lag (how late a 10ms sleep wakes up).
+Handlers that block the loop instead of using the threadpool show up as a
+large lag and a p99 that grows with concurrency.
+
+Usage:
+    python -m benchmarks.load_test --concurrency 32 --duration 20 --output load.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+# Keep load-test output readable; must be set before config is imported
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import httpx  # noqa: E402
+
+from benchmarks.fakes import install_fakes  # noqa: E402
+from benchmarks.stats import summarize  # noqa: E402
+
+# Relative frequency of each kind of request
+DEFAULT_MIX = {
+    "chat": 40,
+    "chat_timestamps": 25,
+    "summary": 10,
+    "dashboard": 10,
+    "search": 10,
+    "process": 5,
+}
+
+QUESTIONS = [
+    "What is the video about?",
+    "How does the model reduce the loss?",
+    "What does it say about cache latency?",
+    "Which database queries are discussed?",
+]
+
+
+def _load_app(segments: int, llm_sleep_ms: float, llm_cpu_ms: float, embedding_latency: float):
+    install_fakes(segments_per_video=segments, llm_sleep_ms=llm_sleep_ms,
+                  llm_cpu_ms=llm_cpu_ms, embedding_latency=embedding_latency)
+    os.environ.setdefault("INDEX_STORE_DIR", tempfile.mkdtemp(prefix="load-index-"))
+
+    from backend.app import app
+    return app
+
+
+def _make_request(kind: str, rng: random.Random, video_ids: List[str], new_ids) -> tuple:
+    """(label, method, path, json body) for one request of the given kind"""
+    video_id = rng.choice(video_ids)
+    question = rng.choice(QUESTIONS)
+    if kind == "chat":
+        return "POST /api/chat", "POST", "/api/chat", {"video_id": video_id, "question": question}
+    if kind == "chat_timestamps":
+        return ("POST /api/chat/timestamps", "POST", "/api/chat/timestamps",
+                {"video_id": video_id, "question": question})
+    if kind == "summary":
+        return "GET /api/summary", "GET", f"/api/summary/{video_id}", None
+    if kind == "dashboard":
+        return "GET /api/dashboard", "GET", "/api/dashboard", None
+    if kind == "search":
+        return "POST /api/search", "POST", "/api/search", {"query": question}
+    if kind == "process":
+        return "POST /api/process", "POST", "/api/process", {"video_url": next(new_ids)}
+    raise ValueError(f"Unknown request kind: {kind}")
+
+
+async def _measure_loop_lag(stop: asyncio.Event, interval: float = 0.01) -> List[float]:
+    lags = []
+    while not stop.is_set():
+        started_at = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(max(time.perf_counter() - started_at - interval, 0.0))
+    return lags
+
+
+async def run_load_test(concurrency: int = 16, duration: float = 10.0, videos: int = 4,
+                        mix: Dict[str, int] = None, segments: int = 300,
+                        llm_sleep_ms: float = 50.0, llm_cpu_ms: float = 0.0,
+                        embedding_latency: float = 0.0, seed: int = 0) -> dict:
+    """Drive mixed traffic against the app and return the report"""
+    app = _load_app(segments, llm_sleep_ms, llm_cpu_ms, embedding_latency)
+    mix = mix or DEFAULT_MIX
+    kinds, weights = zip(*mix.items())
+
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    status_codes: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+
+    # Valid 11-character video ids
+    video_ids = [f"load{i:07d}" for i in range(videos)]
+    new_ids = iter(f"new{i:08d}" for i in range(10 ** 7))
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest",
+                                 timeout=120.0) as client:
+        # Warm-up: index the videos the traffic asks about
+        for video_id in video_ids:
+            response = await client.post("/api/process", json={"video_url": video_id})
+            response.raise_for_status()
+
+        deadline = time.perf_counter() + duration
+
+        async def user(user_seed: int):
+            rng = random.Random(user_seed)
+            while time.perf_counter() < deadline:
+                kind = rng.choices(kinds, weights)[0]
+                label, method, path, body = _make_request(kind, rng, video_ids, new_ids)
+                started_at = time.perf_counter()
+                try:
+                    response = await client.request(method, path, json=body)
+                    status = response.status_code
+                except Exception:
+                    status = 599
+                elapsed = time.perf_counter() - started_at
+
+                status_codes[label][status] += 1
+                if status >= 400:
+                    errors[label] += 1
+                else:
+                    latencies[label].append(elapsed)
+
+        stop = asyncio.Event()
+        lag_task = asyncio.create_task(_measure_loop_lag(stop))
+        started_at = time.perf_counter()
+        await asyncio.gather(*(user(seed * 1000 + i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - started_at
+        stop.set()
+        loop_lags = await lag_task
+
+    endpoints = {}
+    for label in sorted(set(latencies) | set(errors)):
+        ok = len(latencies[label])
+        total = ok + errors[label]
+        endpoints[label] = {
+            **summarize(latencies[label]),
+            "requests": total,
+            "errors": errors[label],
+            "error_rate": round(errors[label] / total, 4) if total else 0.0,
+            "throughput_rps": round(ok / elapsed, 2),
+            "status_codes": dict(status_codes[label]),
+        }
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    total_errors = sum(errors.values())
+    total_requests = len(all_latencies) + total_errors
+    lag = summarize(loop_lags)
+    return {
+        "benchmark": "load_test",
+        "config": {
+            "concurrency": concurrency, "duration": duration, "videos": videos,
+            "mix": dict(mix), "segments": segments, "llm_sleep_ms": llm_sleep_ms,
+            "llm_cpu_ms": llm_cpu_ms, "embedding_latency": embedding_latency,
+        },
+        "elapsed_seconds": round(elapsed, 3),
+        "overall": {
+            **summarize(all_latencies),
+            "requests": total_requests,
+            "errors": total_errors,
+            "error_rate": round(total_errors / total_requests, 4) if total_requests else 0.0,
+            "throughput_rps": round(len(all_latencies) / elapsed, 2),
+        },
+        "event_loop_lag": {"p50_ms": lag["p50_ms"], "p99_ms": lag["p99_ms"], "max_ms": lag["max_ms"]},
+        "endpoints": endpoints,
+    }
+
+
+def _parse_mix(values: List[str]) -> Dict[str, int]:
+    mix = {}
+    for value in values:
+        kind, _, weight = value.partition("=")
+        if kind not in DEFAULT_MIX or not weight.isdigit():
+            raise argparse.ArgumentTypeError(
+                f"--mix expects kind=weight with kind in {sorted(DEFAULT_MIX)}")
+        mix[kind] = int(weight)
+    return mix
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=16, help="Virtual users")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of traffic")
+    parser.add_argument("--videos", type=int, default=4, help="Videos indexed before traffic starts")
+    parser.add_argument("--mix", nargs="+", default=None,
+                        help="Traffic weights, e.g. chat=50 search=10 (default: built-in mix)")
+    parser.add_argument("--segments", type=int, default=300, help="Caption segments per fake video")
+    parser.add_argument("--llm-sleep-ms", type=float, default=50.0,
+                        help="Simulated LLM network latency")
+    parser.add_argument("--llm-cpu-ms", type=float, default=0.0,
+                        help="CPU time the fake LLM burns per answer")
+    parser.add_argument("--embedding-latency", type=float, default=0.0,
+                        help="Simulated embedding API latency in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="Write JSON results here")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run_load_test(
+        concurrency=args.concurrency, duration=args.duration, videos=args.videos,
+        mix=_parse_mix(args.mix) if args.mix else None, segments=args.segments,
+        llm_sleep_ms=args.llm_sleep_ms, llm_cpu_ms=args.llm_cpu_ms,
+        embedding_latency=args.embedding_latency, seed=args.seed,
+    ))
+
+    for label, stats in report["endpoints"].items():
+        print(f"📈 {label:<26} {stats['throughput_rps']:>8.2f} req/s  p50 {stats['p50_ms']:>8.1f}ms  "
+              f"p95 {stats['p95_ms']:>8.1f}ms  p99 {stats['p99_ms']:>8.1f}ms  "
+              f"errors {stats['error_rate']:.1%}")
+    overall = report["overall"]
+    print(f"📊 Overall {overall['throughput_rps']} req/s, p99 {overall['p99_ms']}ms, "
+          f"error rate {overall['error_rate']:.1%}; event loop lag p99 "
+          f"{report['event_loop_lag']['p99_ms']}ms (max {report['event_loop_lag']['max_ms']}ms)")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Benchmark each RAG pipeline stage and the API endpoints against local fakes.
+
+Stages are timed directly on YouTubeRAGChatbot (splitting, embedding, vector
+store creation, translation, ask, ask_with_timestamps, full process_video);
+endpoints are timed end-to-end through FastAPI's TestClient. Results are
+written as JSON so runs from different versions can be compared.
+
+Usage:
+    python -m benchmarks.pipeline_bench --output bench.json
+    python -m benchmarks.pipeline_bench --baseline bench.json --fail-on-regression
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List
+
+# Keep benchmark output readable; must be set before config is imported
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from benchmarks.fakes import FakeTranslator, install_fakes, make_segments  # noqa: E402
+from benchmarks.stats import summarize, time_calls  # noqa: E402
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+QUESTIONS = [
+    "What is the video about?",
+    "How does gradient descent reduce the loss?",
+    "What does it say about cache latency?",
+    "Explain the deploy process for the server",
+]
+
+
+def _result(name: str, samples: List[float], **params) -> dict:
+    return {"name": name, "params": params, **summarize(samples)}
+
+
+def bench_stages(segments: int, repeats: int) -> List[dict]:
+    """Time the chatbot's pipeline stages for one synthetic video"""
+    from main import YouTubeRAGChatbot, simple_translate_text
+    from utils import EmbeddingBatcher
+
+    pool = install_fakes(segments_per_video=segments)
+    results = []
+
+    transcript_data = make_segments("stagebench01", segments)
+    transcript = " ".join(segment.text for segment in transcript_data)
+    chatbot = YouTubeRAGChatbot(clients=pool)
+
+    samples = time_calls(
+        lambda: chatbot.process_transcript_with_timestamps(transcript, transcript_data), repeats)
+    results.append(_result("process_transcript_with_timestamps", samples, segments=segments))
+    chunks = chatbot.process_transcript_with_timestamps(transcript, transcript_data)
+
+    # A fresh batcher per run, so every run embeds from scratch
+    def fresh_embedder():
+        chatbot.embedder = EmbeddingBatcher(chatbot.embedding_model,
+                                            batch_size=chatbot.config.EMBEDDING_BATCH_SIZE)
+        return ()
+
+    samples = time_calls(lambda: chatbot.generate_embeddings(chunks), repeats, setup=fresh_embedder)
+    results.append(_result("generate_embeddings", samples, chunks=len(chunks)))
+    samples = time_calls(lambda: chatbot.generate_embeddings(chunks), repeats)
+    results.append(_result("generate_embeddings_cached", samples, chunks=len(chunks)))
+
+    texts, embeddings, metadatas = chatbot._embed_chunks(chunks)
+    samples = time_calls(lambda: chatbot.create_vector_store(texts, embeddings, metadatas), repeats)
+    results.append(_result("create_vector_store", samples, chunks=len(texts)))
+
+    translator = FakeTranslator("es", "en")
+    samples = time_calls(
+        lambda: simple_translate_text(transcript, "es", "en", translator=translator, delay=0),
+        repeats)
+    results.append(_result("simple_translate_text", samples, characters=len(transcript)))
+
+    chatbot.current_video_id = "stagebench01"
+    chatbot.setup_rag_chain()
+    for method in ("ask", "ask_with_timestamps"):
+        ask = getattr(chatbot, method)
+        ask(QUESTIONS[0])  # Warm up lazily built chain components
+        samples = []
+        for i in range(repeats * len(QUESTIONS)):
+            started_at = time.perf_counter()
+            ask(QUESTIONS[i % len(QUESTIONS)])
+            samples.append(time.perf_counter() - started_at)
+        results.append(_result(method, samples, chunks=len(texts)))
+
+    # Distinct video ids so the embedding cache does not hide the work
+    video_ids = iter(f"procbench{segments}-{i:03d}" for i in range(repeats))
+    samples = time_calls(
+        lambda: YouTubeRAGChatbot(clients=pool).process_video(next(video_ids)), repeats)
+    results.append(_result("process_video", samples, segments=segments))
+    return results
+
+
+def bench_endpoints(segments: int, repeats: int) -> List[dict]:
+    """Time API endpoints end-to-end through the ASGI app"""
+    install_fakes(segments_per_video=segments)
+    os.environ.setdefault("INDEX_STORE_DIR", tempfile.mkdtemp(prefix="bench-index-"))
+    os.environ.setdefault("PARTIAL_READY_CHUNKS", "0")
+
+    from fastapi.testclient import TestClient
+    from backend.app import app
+
+    results = []
+    with TestClient(app) as client:
+        def post_ok(path, payload):
+            response = client.post(path, json=payload)
+            response.raise_for_status()
+
+        def get_ok(path):
+            response = client.get(path)
+            response.raise_for_status()
+
+        # Valid 11-character ids, distinct per transcript size
+        video_ids = [f"a{segments % 100000:05d}b{i:04d}" for i in range(repeats)]
+        ids = iter(video_ids)
+        samples = time_calls(lambda: post_ok("/api/process", {"video_url": next(ids)}), repeats)
+        results.append(_result("POST /api/process", samples, segments=segments))
+
+        video_id = video_ids[0]
+        endpoints = [
+            ("POST /api/chat", lambda q: post_ok("/api/chat", {"video_id": video_id, "question": q})),
+            ("POST /api/chat/timestamps",
+             lambda q: post_ok("/api/chat/timestamps", {"video_id": video_id, "question": q})),
+            ("GET /api/summary", lambda q: get_ok(f"/api/summary/{video_id}")),
+            ("GET /api/dashboard", lambda q: get_ok("/api/dashboard")),
+            ("GET /api/status", lambda q: get_ok(f"/api/status/{video_id}")),
+        ]
+        for name, call in endpoints:
+            samples = []
+            for i in range(repeats * len(QUESTIONS)):
+                started_at = time.perf_counter()
+                call(QUESTIONS[i % len(QUESTIONS)])
+                samples.append(time.perf_counter() - started_at)
+            results.append(_result(name, samples, segments=segments))
+    return results
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(report: dict, baseline: dict, threshold: float = 1.2) -> List[dict]:
+    """
+    Compare mean latencies against a previous report.
+
+    Returns:
+        list: One entry per benchmark present in both, with the slowdown ratio
+        and whether it exceeds `threshold`.
+    """
+    def key(result):
+        return result["name"], json.dumps(result["params"], sort_keys=True)
+
+    previous = {key(result): result for result in baseline.get("results", [])}
+    comparison = []
+    for result in report["results"]:
+        old = previous.get(key(result))
+        if not old or not old["mean_ms"]:
+            continue
+        ratio = result["mean_ms"] / old["mean_ms"]
+        comparison.append({
+            "name": result["name"],
+            "params": result["params"],
+            "baseline_mean_ms": old["mean_ms"],
+            "mean_ms": result["mean_ms"],
+            "ratio": round(ratio, 3),
+            "regression": ratio > threshold,
+        })
+    return comparison
+
+
+def run(segments: List[int], repeats: int, include_endpoints: bool = True) -> dict:
+    results = []
+    for count in segments:
+        results.extend(bench_stages(count, repeats))
+        if include_endpoints:
+            results.extend(bench_endpoints(count, repeats))
+    return {
+        "benchmark": "pipeline",
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeats": repeats,
+        "results": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--segments", type=int, nargs="+", default=[600],
+                        help="Transcript sizes (caption segments) to benchmark")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--no-endpoints", action="store_true",
+                        help="Only benchmark the chatbot stages")
+    parser.add_argument("--output", default=None, help="Write JSON results here")
+    parser.add_argument("--baseline", default=None, help="Earlier JSON results to compare with")
+    parser.add_argument("--threshold", type=float, default=1.2,
+                        help="Slowdown ratio counted as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args(argv)
+
+    report = run(args.segments, args.repeats, include_endpoints=not args.no_endpoints)
+    for result in report["results"]:
+        print(f"⏱️ {result['name']:<40} mean {result['mean_ms']:>9.3f}ms  "
+              f"p95 {result['p95_ms']:>9.3f}ms  ({result['params']})")
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            report["comparison"] = compare(report, json.load(f), args.threshold)
+        regressions = [c for c in report["comparison"] if c["regression"]]
+        for item in regressions:
+            print(f"🐢 Regression: {item['name']} {item['baseline_mean_ms']}ms -> "
+                  f"{item['mean_ms']}ms (x{item['ratio']})")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+    return report
+
+
+if __name__ == "__main__":
+    main()
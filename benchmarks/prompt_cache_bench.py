@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Prompt tokens a provider-side prompt cache would save, measured with
+SimulatedPromptCache.
+
+Users ask questions drawn from a pool with Zipf-like popularity (a few
+questions, like "what is the video about?", are asked far more than the
+rest). Every prompt is a stable prefix (instructions + retrieved context)
+and a per-question suffix; questions that retrieve the same chunks share the
+whole prefix. Two videos are measured: a long one answered from retrieved
+chunks and a short one answered from its full transcript (where every
+question shares the prefix).
+
+Reported per video and minimum cacheable prefix size: prefix share of the
+prompt tokens, cache hit rate, prompt tokens billed without and with the
+cache, and the share saved.
+
+Usage:
+    python -m benchmarks.prompt_cache_bench --questions 200 --min-tokens 0 1024 --output cache.json
+"""
+
+import argparse
+import json
+import os
+import random
+from typing import List
+
+# Keep benchmark output readable; must be set before config is imported
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from benchmarks.fakes import install_fakes  # noqa: E402
+
+QUESTION_POOL = [
+    "What is the video about?",
+    "Summarize the main points",
+    "What are the key takeaways?",
+    "Who is the speaker?",
+] + [f"What is said about marker{n}?" for n in range(0, 500, 9)]
+
+
+def sample_questions(count: int, seed: int = 0, skew: float = 1.1) -> List[str]:
+    """Questions with Zipf-like popularity (rank r is asked ~1/r^skew as often)"""
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) ** skew for rank in range(len(QUESTION_POOL))]
+    return rng.choices(QUESTION_POOL, weights=weights, k=count)
+
+
+def bench_video(name: str, segments: int, questions: List[str], min_tokens: int) -> dict:
+    from main import YouTubeRAGChatbot
+    from utils import SimulatedPromptCache
+
+    cache = SimulatedPromptCache(ttl_seconds=3600, min_tokens=min_tokens)
+    pool = install_fakes(segments_per_video=segments)
+    pool.set_clients(prompt_cache=cache)
+    chatbot = YouTubeRAGChatbot(clients=pool)
+    chatbot.process_video(f"{name[:4]}{segments % 10 ** 7:07d}")
+
+    for question in questions:
+        chatbot.ask(question)
+
+    stats = cache.get_stats()
+    return {
+        "name": name,
+        "params": {"segments": segments, "questions": len(questions), "min_tokens": min_tokens,
+                   "direct_context": chatbot.direct_context is not None},
+        "prefix_share": round(stats["prefix_tokens"] / stats["prompt_tokens"], 4)
+        if stats["prompt_tokens"] else 0.0,
+        "saved_share": round(stats["billed_tokens_saved"] / stats["prompt_tokens"], 4)
+        if stats["prompt_tokens"] else 0.0,
+        **stats,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--questions", type=int, default=200, help="Questions asked per video")
+    parser.add_argument("--min-tokens", type=int, nargs="+", default=[0, 1024],
+                        help="Minimum cacheable prefix sizes to compare")
+    parser.add_argument("--indexed-segments", type=int, default=600,
+                        help="Caption segments of the video answered from retrieved chunks")
+    parser.add_argument("--direct-segments", type=int, default=60,
+                        help="Caption segments of the video answered from its full transcript")
+    parser.add_argument("--output", default=None, help="Write JSON results here")
+    args = parser.parse_args(argv)
+
+    questions = sample_questions(args.questions)
+    results = []
+    for min_tokens in args.min_tokens:
+        results.append(bench_video("indexed", args.indexed_segments, questions, min_tokens))
+        results.append(bench_video("direct", args.direct_segments, questions, min_tokens))
+
+    for result in results:
+        print(f"🗄️ {result['name']:<8} min {result['params']['min_tokens']:>5} tokens  "
+              f"prefix {result['prefix_share']:.0%}  hits {result['hit_rate']:.0%}  "
+              f"billed {result['prompt_tokens']:>8} -> {result['billed_prompt_tokens']:>8} tokens  "
+              f"saved {result['saved_share']:.0%}")
+
+    report = {"benchmark": "prompt_cache", "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Latency, recall and diversity of the retrieval modes: vector, hybrid
+(BM25 + vector), hybrid with MMR (with and without the time-diversity
+penalty) and lexical-only.
+
+Each synthetic video is indexed once with the fakes; then every mode answers
+the same queries through YouTubeRAGChatbot._retrieve. Two query sets are used:
+
+- exact: an identifier that appears in one caption segment only
+  ("what is said about marker123?"), the case keyword search exists for;
+- topical: a handful of words taken from one chunk.
+
+Recall@k is the fraction of queries whose source chunk is among the k
+results. Overlapping pairs counts result pairs whose time ranges overlap
+(near-duplicate context), and time span is how far apart in the video the
+first and last result start, i.e. how much of the video one retrieval covers.
+Embedding calls per query show what lexical-only lookup saves, and chunks
+per query what adaptive k saves (k is the maximum for adaptive retrieval);
+hybrid_mmr_cutoff adds the opt-in similarity cutoff to it.
+
+Usage:
+    python -m benchmarks.retrieval_bench --segments 60 600 2400 --output retrieval.json
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+from typing import List
+
+# Keep benchmark output readable; must be set before config is imported
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from benchmarks.fakes import install_fakes  # noqa: E402
+from benchmarks.stats import summarize  # noqa: E402
+
+_SIMILARITY = {"RETRIEVAL_SEARCH_TYPE": "similarity", "ADAPTIVE_RETRIEVAL": False}
+_MMR = {"RETRIEVAL_SEARCH_TYPE": "mmr", "TIME_DIVERSITY_PENALTY": 0.0, "ADAPTIVE_RETRIEVAL": False}
+MODES = {
+    "vector": {**_SIMILARITY, "HYBRID_RETRIEVAL": False},
+    "vector_mmr": {**_MMR, "HYBRID_RETRIEVAL": False},
+    "hybrid": {**_SIMILARITY, "HYBRID_RETRIEVAL": True, "LEXICAL_ONLY_MAX_CHUNKS": 0},
+    "hybrid_mmr": {**_MMR, "HYBRID_RETRIEVAL": True, "LEXICAL_ONLY_MAX_CHUNKS": 0},
+    "hybrid_mmr_time": {**_MMR, "TIME_DIVERSITY_PENALTY": 0.3, "HYBRID_RETRIEVAL": True,
+                        "LEXICAL_ONLY_MAX_CHUNKS": 0},
+    "hybrid_mmr_adaptive": {**_MMR, "ADAPTIVE_RETRIEVAL": True, "HYBRID_RETRIEVAL": True,
+                            "LEXICAL_ONLY_MAX_CHUNKS": 0},
+    # The opt-in similarity cutoff; off by default until it matches hybrid_mmr recall
+    "hybrid_mmr_cutoff": {**_MMR, "ADAPTIVE_RETRIEVAL": True, "HYBRID_RETRIEVAL": True,
+                          "LEXICAL_ONLY_MAX_CHUNKS": 0, "RETRIEVAL_MIN_SCORE_RATIO": 0.85,
+                          "RETRIEVAL_MAX_SCORE_GAP": 0.08},
+    "lexical_only": {**_SIMILARITY, "HYBRID_RETRIEVAL": True, "LEXICAL_ONLY_MAX_CHUNKS": 10 ** 9},
+}
+
+
+def make_queries(chatbot, count: int, seed: int = 0) -> dict:
+    """Queries with the docstore ids of the chunks that answer them"""
+    rng = random.Random(seed)
+    docstore = chatbot.vector_store.docstore._dict
+    doc_ids = list(chatbot.vector_store.index_to_docstore_id.values())
+
+    exact, topical = [], []
+    for _ in range(count):
+        doc_id = rng.choice(doc_ids)
+        words = docstore[doc_id].page_content.split()
+        markers = [word for word in words if word.startswith("marker")]
+        marker = rng.choice(markers)
+        relevant = {other for other in doc_ids
+                    if marker in docstore[other].page_content.split()}
+        exact.append((f"What is said about {marker}?", relevant))
+
+        start = rng.randrange(max(len(words) - 8, 1))
+        topical.append((" ".join(words[start:start + 8]), {doc_id}))
+    return {"exact": exact, "topical": topical}
+
+
+def bench_video(segments: int, queries: int, k: int, embedding_latency: float) -> List[dict]:
+    from main import YouTubeRAGChatbot
+
+    pool = install_fakes(segments_per_video=segments, embedding_latency=embedding_latency)
+    chatbot = YouTubeRAGChatbot(clients=pool)
+    chatbot.config.RETRIEVAL_K = k
+    # Always index, so short videos are measured too (they would otherwise be
+    # answered from the whole transcript, without retrieval)
+    chatbot.config.DIRECT_CONTEXT_MAX_TOKENS = 0
+    chatbot.process_video(f"r{segments % 10 ** 6:06d}vid0")
+    query_sets = make_queries(chatbot, queries)
+    chunk_count = len(chatbot.vector_store.index_to_docstore_id)
+
+    build_started_at = time.perf_counter()
+    chatbot.lexical_index = None
+    chatbot.get_lexical_index()
+    bm25_build_ms = (time.perf_counter() - build_started_at) * 1000
+
+    results = []
+    for mode, overrides in MODES.items():
+        for name, value in overrides.items():
+            setattr(chatbot.config, name, value)
+        for query_set, items in query_sets.items():
+            chatbot._retrieve(items[0][0])  # Warm up
+            embedding_calls = pool.embedding_model.calls
+            samples, hits, overlapping, spans, chunks = [], 0, 0, 0.0, 0
+            for question, relevant in items:
+                started_at = time.perf_counter()
+                docs = chatbot._retrieve(question)
+                samples.append(time.perf_counter() - started_at)
+                chunks += len(docs)
+                retrieved = {doc_id for doc_id, doc in chatbot.vector_store.docstore._dict.items()
+                             if any(doc is result for result in docs)}
+                hits += bool(retrieved & relevant)
+                times = sorted((doc.metadata.get("start_time", 0), doc.metadata.get("end_time", 0))
+                               for doc in docs)
+                overlapping += sum(later[0] < earlier[1] for i, earlier in enumerate(times)
+                                   for later in times[i + 1:])
+                spans += times[-1][0] - times[0][0] if times else 0.0
+            results.append({
+                "name": f"{mode}/{query_set}",
+                "params": {"segments": segments, "chunks": chunk_count, "k": k},
+                f"recall_at_{k}": round(hits / len(items), 4),
+                "chunks_per_query": round(chunks / len(items), 3),
+                "overlapping_pairs": round(overlapping / len(items), 3),
+                "time_span_s": round(spans / len(items), 1),
+                "embedding_calls_per_query": round(
+                    (pool.embedding_model.calls - embedding_calls) / len(items), 3),
+                "bm25_build_ms": round(bm25_build_ms, 3),
+                **summarize(samples),
+            })
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--segments", type=int, nargs="+", default=[60, 600, 2400],
+                        help="Transcript sizes (caption segments) to benchmark")
+    parser.add_argument("--queries", type=int, default=200, help="Queries per query set")
+    parser.add_argument("--k", type=int, default=4, help="Chunks retrieved per query")
+    parser.add_argument("--embedding-latency", type=float, default=0.0,
+                        help="Simulated embedding API latency in seconds")
+    parser.add_argument("--output", default=None, help="Write JSON results here")
+    args = parser.parse_args(argv)
+
+    results = []
+    for segments in args.segments:
+        results.extend(bench_video(segments, args.queries, args.k, args.embedding_latency))
+
+    for result in results:
+        print(f"🔎 {result['name']:<30} chunks {result['params']['chunks']:>5}  "
+              f"recall@{args.k} {result[f'recall_at_{args.k}']:.2f}  "
+              f"k {result['chunks_per_query']:.2f}  "
+              f"overlaps {result['overlapping_pairs']:.2f}  span {result['time_span_s']:>7.1f}s  "
+              f"p50 {result['p50_ms']:>8.3f}ms  p95 {result['p95_ms']:>8.3f}ms  "
+              f"embeds/query {result['embedding_calls_per_query']}")
+
+    report = {"benchmark": "retrieval", "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
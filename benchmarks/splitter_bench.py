@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Character splitting vs. packing whole caption segments into token budgets.
+
+Both splitters cut the same synthetic transcripts, whose segments vary in
+length the way real captions do (2 to 25 words). Reported per splitter and
+transcript size: split time (including timestamp metadata), chunks, chunk
+size in tokens (p5/p50/p95 and coefficient of variation) and the share of
+chunk edges that fall inside a caption segment, where a chunk's timestamps
+claim a whole segment it holds only part of.
+
+Usage:
+    python -m benchmarks.splitter_bench --segments 600 2400 9600 --output splitter.json
+"""
+
+import argparse
+import json
+import os
+import random
+
+# Keep benchmark output readable; must be set before config is imported
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from benchmarks.fakes import VOCABULARY, install_fakes  # noqa: E402
+from benchmarks.stats import summarize, time_calls  # noqa: E402
+
+
+def make_captions(count: int, seed: int = 0):
+    """Caption segments of 2 to 25 words, one after another"""
+    from utils import CompactTranscript
+
+    rng = random.Random(seed)
+    segments, start = [], 0.0
+    for i in range(count):
+        words = rng.randint(2, 25)
+        duration = round(words * 0.4, 2)
+        text = " ".join(rng.choice(VOCABULARY) for _ in range(words)) + f" marker{i}"
+        segments.append({"text": text, "start": start, "duration": duration})
+        start += duration
+    return CompactTranscript.from_segments(segments)
+
+
+def chunk_stats(chunks, transcript) -> dict:
+    import numpy as np
+    from utils import count_tokens_batch
+
+    tokens = np.array(count_tokens_batch([chunk.page_content for chunk in chunks]), dtype=float)
+    boundaries = set(transcript.char_offsets.tolist())
+    edges = inside = 0
+    for chunk in chunks:
+        start = chunk.metadata["start_index"]
+        end = start + len(chunk.page_content)
+        edges += 2
+        inside += (start not in boundaries) + (end + 1 not in boundaries)
+    return {
+        "chunks": len(chunks),
+        "tokens_p5": float(np.percentile(tokens, 5)),
+        "tokens_p50": float(np.percentile(tokens, 50)),
+        "tokens_p95": float(np.percentile(tokens, 95)),
+        "tokens_cv": round(float(tokens.std() / tokens.mean()), 4),
+        "edges_inside_segments": round(inside / edges, 4),
+    }
+
+
+def bench_transcript(segments: int, repeats: int) -> list:
+    from main import YouTubeRAGChatbot
+
+    chatbot = YouTubeRAGChatbot(clients=install_fakes())
+    transcript = make_captions(segments)
+    text = transcript.text
+
+    results = []
+    for name, by_segments in (("characters", False), ("segments", True)):
+        chatbot.config.SEGMENT_CHUNKING = by_segments
+        samples = time_calls(lambda: chatbot.process_transcript_with_timestamps(text, transcript),
+                             repeats)
+        chunks = chatbot.process_transcript_with_timestamps(text, transcript)
+        results.append({"name": name, "params": {"segments": segments},
+                        **chunk_stats(chunks, transcript), **summarize(samples)})
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--segments", type=int, nargs="+", default=[600, 2400, 9600],
+                        help="Caption segments per transcript")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed runs per measurement")
+    parser.add_argument("--output", default=None, help="Write JSON results here")
+    args = parser.parse_args(argv)
+
+    results = []
+    for segments in args.segments:
+        results.extend(bench_transcript(segments, args.repeats))
+
+    for result in results:
+        print(f"✂️ {result['name']:<10} segments {result['params']['segments']:>5}  "
+              f"p50 {result['p50_ms']:>8.2f}ms  {result['chunks']:>5} chunks  "
+              f"tokens p5/p50/p95 {result['tokens_p5']:.0f}/{result['tokens_p50']:.0f}/"
+              f"{result['tokens_p95']:.0f} (cv {result['tokens_cv']:.2f})  "
+              f"edges inside segments {result['edges_inside_segments']:.0%}")
+
+    report = {"benchmark": "splitter", "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
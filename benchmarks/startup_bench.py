@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Measure API cold start: import-time profile plus time until /health answers.
+
+The import profile runs `python -X importtime -c "import backend.app"` in a
+fresh interpreter and ranks modules by cumulative import time. The startup
+benchmark boots uvicorn on the real app (no fakes needed: models are only
+created on first use) and polls /health until it responds, repeating a few
+times; the run fails if the median exceeds the budget.
+
+Usage:
+    python -m benchmarks.startup_bench --budget-ms 2000 --output startup.json
+"""
+
+import argparse
+import json
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def _env(store_dir: str) -> dict:
+    return dict(os.environ, INDEX_STORE_DIR=store_dir, LOG_LEVEL="WARNING",
+                GOOGLE_API_KEY=os.environ.get("GOOGLE_API_KEY", "startup-benchmark"))
+
+
+def profile_imports(module: str = "backend.app", top: int = 20) -> dict:
+    """
+    Import `module` in a fresh interpreter with -X importtime.
+
+    Returns:
+        dict: Total import time and the `top` slowest modules by cumulative
+        time, plus the slowest top-level packages.
+    """
+    with tempfile.TemporaryDirectory() as store_dir:
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=ROOT_DIR, env=_env(store_dir), capture_output=True, text=True, check=True)
+
+    modules = []
+    for line in completed.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append({
+                "module": name,
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cumulative_us) / 1000,
+                "depth": len(indent) // 2,
+            })
+
+    total_ms = sum(m["self_ms"] for m in modules)
+    packages = {}
+    for entry in modules:
+        package = entry["module"].split(".")[0]
+        packages[package] = packages.get(package, 0.0) + entry["self_ms"]
+
+    return {
+        "module": module,
+        "total_ms": round(total_ms, 1),
+        "slowest_modules": sorted(modules, key=lambda m: -m["cumulative_ms"])[:top],
+        "slowest_packages": [
+            {"package": name, "self_ms": round(ms, 1)}
+            for name, ms in sorted(packages.items(), key=lambda item: -item[1])[:top]
+        ],
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_to_health(timeout: float = 60.0) -> float:
+    """Seconds from spawning uvicorn until GET /health returns 200"""
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}/health"
+    with tempfile.TemporaryDirectory() as store_dir:
+        started_at = time.perf_counter()
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "backend.app:app", "--app-dir", ROOT_DIR,
+             "--port", str(port), "--log-level", "warning"],
+            cwd=ROOT_DIR, env=_env(store_dir),
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            with httpx.Client(timeout=1.0) as client:
+                while time.perf_counter() - started_at < timeout:
+                    try:
+                        if client.get(url).status_code == 200:
+                            return time.perf_counter() - started_at
+                    except httpx.HTTPError:
+                        pass
+                    if server.poll() is not None:
+                        raise RuntimeError("Server exited before becoming healthy")
+                    time.sleep(0.005)
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+    raise RuntimeError(f"/health did not answer within {timeout}s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="Cold starts to measure")
+    parser.add_argument("--budget-ms", type=float, default=2000.0,
+                        help="Maximum acceptable median time to a healthy /health")
+    parser.add_argument("--top", type=int, default=15, help="Slowest imports to report")
+    parser.add_argument("--output", default=None, help="Write JSON results here")
+    args = parser.parse_args(argv)
+
+    imports = profile_imports(top=args.top)
+    print(f"📦 import backend.app: {imports['total_ms']}ms")
+    for entry in imports["slowest_packages"][:10]:
+        print(f"   {entry['package']:<28} {entry['self_ms']:>8.1f}ms")
+
+    startups = [time_to_health() * 1000 for _ in range(args.runs)]
+    median_ms = statistics.median(startups)
+    within_budget = median_ms <= args.budget_ms
+    print(f"🚀 Healthy after {median_ms:.0f}ms (median of {args.runs}, budget {args.budget_ms:.0f}ms) "
+          f"{'✅' if within_budget else '❌'}")
+
+    report = {
+        "benchmark": "startup",
+        "imports": imports,
+        "time_to_health_ms": {
+            "runs": [round(ms, 1) for ms in startups],
+            "median": round(median_ms, 1),
+            "max": round(max(startups), 1),
+        },
+        "budget_ms": args.budget_ms,
+        "within_budget": within_budget,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if not within_budget:
+        sys.exit(1)
+    return report
+
+
+if __name__ == "__main__":
+    main()
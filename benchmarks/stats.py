@@ -0,0 +1,36 @@
+"""
+Timing helpers shared by the benchmarks.
+"""
+
+import time
+from typing import Callable, List
+
+import numpy as np
+
+
+def summarize(samples: List[float]) -> dict:
+    """Latency percentiles (in ms) for a list of durations in seconds"""
+    if not samples:
+        return {"runs": 0, "mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0,
+                "p99_ms": 0.0, "min_ms": 0.0, "max_ms": 0.0}
+    ms = np.asarray(samples) * 1000
+    return {
+        "runs": len(samples),
+        "mean_ms": round(float(ms.mean()), 3),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "min_ms": round(float(ms.min()), 3),
+        "max_ms": round(float(ms.max()), 3),
+    }
+
+
+def time_calls(func: Callable, repeats: int, setup: Callable = None) -> List[float]:
+    """Run func `repeats` times (calling setup first, untimed) and return durations"""
+    samples = []
+    for _ in range(repeats):
+        args = setup() if setup else ()
+        started_at = time.perf_counter()
+        func(*args)
+        samples.append(time.perf_counter() - started_at)
+    return samples
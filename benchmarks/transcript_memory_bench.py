@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Memory held by a video's caption segments, per hour of video.
+
+Compares a list of TranscriptSegment tuples (a string and two floats per
+segment, as transcripts were kept before) with CompactTranscript (one UTF-8
+buffer plus offset and time arrays), measured with tracemalloc after the
+segments are built. The compact arrays are then saved and loaded back,
+copied into memory and memory-mapped; a mapped transcript only allocates
+its (tiny) array headers until pages are read.
+
+Usage:
+    python -m benchmarks.transcript_memory_bench --hours 1 4 --output transcript_memory.json
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+# Keep benchmark output readable; must be set before config is imported
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from benchmarks.fakes import make_segments  # noqa: E402
+from benchmarks.stats import summarize  # noqa: E402
+
+# Typical auto-generated captions: one ~4 second segment at a time
+SEGMENT_SECONDS = 4.0
+
+
+def _retained(build) -> tuple:
+    """(result, bytes still allocated after build(), peak bytes while building)"""
+    tracemalloc.start()
+    try:
+        result = build()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, current, peak
+
+
+def bench_hours(hours: float, repeats: int) -> list:
+    from utils import CompactTranscript, TranscriptSegment
+
+    count = int(hours * 3600 / SEGMENT_SECONDS)
+    video_id = f"mem{count:08d}"
+
+    def as_tuples():
+        return [TranscriptSegment(item.text, item.start, item.duration)
+                for item in make_segments(video_id, count, segment_seconds=SEGMENT_SECONDS)]
+
+    def as_compact():
+        return CompactTranscript.from_segments(
+            make_segments(video_id, count, segment_seconds=SEGMENT_SECONDS))
+
+    params = {"hours": hours, "segments": count}
+    tuples, tuples_bytes, tuples_peak = _retained(as_tuples)
+    compact, compact_bytes, compact_peak = _retained(as_compact)
+    assert compact.text == " ".join(item.text for item in tuples)
+    results = [
+        {"name": "tuples", "params": params, "bytes": tuples_bytes, "peak_bytes": tuples_peak},
+        {"name": "compact", "params": params, "bytes": compact_bytes, "peak_bytes": compact_peak},
+    ]
+
+    with tempfile.TemporaryDirectory() as directory:
+        compact.save(directory)
+        for name, mmap in (("loaded", False), ("mmap", True)):
+            samples = []
+            for _ in range(repeats):
+                started_at = time.perf_counter()
+                CompactTranscript.load(directory, mmap=mmap)
+                samples.append(time.perf_counter() - started_at)
+            loaded, loaded_bytes, loaded_peak = _retained(
+                lambda: CompactTranscript.load(directory, mmap=mmap))
+            results.append({"name": name, "params": params, "bytes": loaded_bytes,
+                            "peak_bytes": loaded_peak, "load": summarize(samples)})
+            del loaded
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--hours", type=float, nargs="+", default=[1.0, 4.0],
+                        help="Video lengths in hours")
+    parser.add_argument("--repeats", type=int, default=20, help="Timed loads per measurement")
+    parser.add_argument("--output", default=None, help="Write JSON results here")
+    args = parser.parse_args(argv)
+
+    results = []
+    for hours in args.hours:
+        results.extend(bench_hours(hours, args.repeats))
+
+    for result in results:
+        per_hour = result["bytes"] / result["params"]["hours"]
+        load = (f"  load p50 {result['load']['p50_ms']:.3f}ms" if "load" in result else "")
+        print(f"🧠 {result['name']:<8} {result['params']['hours']:>4g}h "
+              f"({result['params']['segments']:>5} segments)  "
+              f"{result['bytes'] / 1024:>9.1f} KiB  ({per_hour / 1024:>8.1f} KiB/hour)  "
+              f"peak {result['peak_bytes'] / 1024:>9.1f} KiB{load}")
+
+    report = {"benchmark": "transcript_memory", "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
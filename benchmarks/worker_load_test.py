@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Compare chat throughput of 1 vs N uvicorn workers sharing one index store.
+
+Each run boots benchmarks.fake_app under uvicorn with a CPU-bound fake LLM,
+ingests a few videos (each lands on whichever worker accepts the request),
+then drives concurrent /api/chat traffic across all of them. Any worker must
+answer for any video, so the run also checks the shared registry works.
+
+Usage:
+    python -m benchmarks.worker_load_test --workers 1 4 --duration 15
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List
+
+import httpx
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_server(workers: int, port: int, store_dir: str, llm_cpu_ms: float) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        INDEX_STORE_DIR=store_dir,
+        PARTIAL_READY_CHUNKS="0",  # Index fully before /api/process returns
+        FAKE_LLM_CPU_MS=str(llm_cpu_ms),
+    )
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "benchmarks.fake_app:app",
+         "--app-dir", ROOT_DIR, "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=ROOT_DIR, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+
+def _wait_until_healthy(base_url: str, timeout: float = 60.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(base_url + "/", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server at {base_url} did not become healthy")
+
+
+async def _drive_chat(base_url: str, video_ids: List[str], concurrency: int,
+                      duration: float) -> dict:
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def user(client: httpx.AsyncClient, seed: int):
+        nonlocal errors
+        rng = random.Random(seed)
+        while time.perf_counter() < deadline:
+            payload = {
+                "video_id": rng.choice(video_ids),
+                "question": f"What does the video say about {rng.choice(['python', 'cache', 'tensor'])}?",
+            }
+            started_at = time.perf_counter()
+            try:
+                response = await client.post("/api/chat", json=payload)
+                if response.status_code != 200:
+                    errors += 1
+                    continue
+            except httpx.HTTPError:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started_at)
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60.0, limits=limits) as client:
+        started_at = time.perf_counter()
+        await asyncio.gather(*(user(client, seed) for seed in range(concurrency)))
+        elapsed = time.perf_counter() - started_at
+
+    latencies_ms = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        "p50_ms": round(float(np.percentile(latencies_ms, 50)), 2),
+        "p95_ms": round(float(np.percentile(latencies_ms, 95)), 2),
+        "p99_ms": round(float(np.percentile(latencies_ms, 99)), 2),
+    }
+
+
+def run_worker_benchmark(workers: int, videos: int = 4, concurrency: int = 16,
+                         duration: float = 10.0, llm_cpu_ms: float = 20.0) -> dict:
+    """Boot a server with the given worker count and measure chat throughput"""
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    with tempfile.TemporaryDirectory() as store_dir:
+        server = _start_server(workers, port, store_dir, llm_cpu_ms)
+        try:
+            _wait_until_healthy(base_url)
+            video_ids = [f"bench{i:06d}" for i in range(videos)]
+            for video_id in video_ids:
+                response = httpx.post(base_url + "/api/process",
+                                      json={"video_url": video_id}, timeout=120.0)
+                response.raise_for_status()
+
+            result = asyncio.run(_drive_chat(base_url, video_ids, concurrency, duration))
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+    result.update({"workers": workers, "videos": videos,
+                   "concurrency": concurrency, "llm_cpu_ms": llm_cpu_ms})
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--videos", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--llm-cpu-ms", type=float, default=20.0,
+                        help="CPU time the fake LLM burns per answer")
+    parser.add_argument("--output", default=None, help="Write JSON results here")
+    args = parser.parse_args(argv)
+
+    results = []
+    for workers in args.workers:
+        print(f"🏋️ Running {workers} worker(s)...")
+        result = run_worker_benchmark(workers, args.videos, args.concurrency,
+                                      args.duration, args.llm_cpu_ms)
+        print(f"   {result['throughput_rps']} req/s, p50 {result['p50_ms']}ms, "
+              f"p99 {result['p99_ms']}ms, {result['errors']} errors")
+        results.append(result)
+
+    baseline = results[0]["throughput_rps"] or 1.0
+    for result in results:
+        result["speedup"] = round(result["throughput_rps"] / baseline, 2)
+
+    report = {"benchmark": "worker_scaling", "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Bulk ingestion for YouTube RAG Chatbot
+Processes many videos concurrently with one shared client pool and embedding
+batcher, and reports throughput.
+
+Usage:
+    python bulk_ingest.py VIDEO_ID_OR_URL [...] [--file ids.txt] [--concurrency 4]
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, List, Optional
+
+from config import Config
+from utils import (ClientPool, DashboardAggregator, VideoSessionManager, get_client_pool,
+                   configure_rate_limit, configure_service, get_logger, setup_logging)
+from youtube_utils import extract_video_id, validate_video_id
+
+logger = get_logger("bulk_ingest")
+
+
+class BulkIngestor:
+    """
+    Ingest a list of videos with bounded concurrency.
+
+    Parameters:
+        config (Config): Configuration for the chatbots.
+        clients (ClientPool): Pool shared by every video (default: the shared pool).
+        concurrency (int): Maximum number of videos processed at once.
+        is_indexed (callable): Returns True for video ids that should be skipped.
+        on_processed (callable): Called with (video_id, chatbot) after each video.
+        claim (callable): Reserves a video before it is processed; False skips
+            it (e.g. another worker is ingesting it).
+        release (callable): Gives up a claim after processing failed.
+    """
+
+    def __init__(
+        self,
+        config: Config = None,
+        clients: ClientPool = None,
+        concurrency: Optional[int] = None,
+        is_indexed: Optional[Callable[[str], bool]] = None,
+        on_processed: Optional[Callable[[str, object], None]] = None,
+        claim: Optional[Callable[[str], bool]] = None,
+        release: Optional[Callable[[str], None]] = None,
+    ):
+        self.config = config or Config()
+        self.clients = clients or get_client_pool(self.config)
+        self.concurrency = max(concurrency or self.config.BULK_CONCURRENCY, 1)
+        self.is_indexed = is_indexed or (lambda video_id: False)
+        self.on_processed = on_processed
+        self.claim = claim
+        self.release = release
+        self._lock = threading.Lock()
+
+    def run(self, video_refs: Iterable[str], language_code: str = 'en',
+            translate_to_english: bool = True) -> dict:
+        """
+        Ingest every video id or URL and return a throughput report.
+
+        Invalid references, duplicates and already-indexed videos are skipped.
+        """
+        from main import YouTubeRAGChatbot
+
+        report = {
+            "requested": 0,
+            "processed": [],
+            "skipped": [],
+            "failed": [],
+            "total_chunks": 0,
+        }
+
+        video_ids = []
+        seen = set()
+        for ref in video_refs:
+            report["requested"] += 1
+            try:
+                video_id = extract_video_id(ref)
+            except ValueError as e:
+                report["failed"].append({"video": ref, "error": str(e)})
+                continue
+            if not validate_video_id(video_id):
+                report["failed"].append({"video": ref, "error": "Invalid video ID"})
+            elif video_id in seen or self.is_indexed(video_id):
+                report["skipped"].append(video_id)
+            else:
+                seen.add(video_id)
+                video_ids.append(video_id)
+
+        embedder_before = self.clients.embedder.get_stats()
+
+        def ingest(video_id: str):
+            if self.claim and not self.claim(video_id):
+                with self._lock:
+                    report["skipped"].append(video_id)
+                logger.info("⏭️ [%s] already indexed or being processed elsewhere", video_id)
+                return
+            try:
+                chatbot = YouTubeRAGChatbot(self.config, clients=self.clients)
+                chatbot.process_video(video_id, language_code, translate_to_english)
+                chunk_count = chatbot.index_status.get("indexed_chunks", 0)
+                if self.on_processed:
+                    self.on_processed(video_id, chatbot)
+                with self._lock:
+                    report["processed"].append(video_id)
+                    report["total_chunks"] += chunk_count
+                logger.info("✅ [%s] ingested (%d chunks)", video_id, chunk_count)
+            except Exception as e:
+                if self.release:
+                    try:
+                        self.release(video_id)
+                    except Exception as release_error:
+                        logger.warning("⚠️ [%s] could not release claim: %s", video_id, release_error)
+                with self._lock:
+                    report["failed"].append({"video": video_id, "error": str(e)})
+                logger.error("❌ [%s] ingestion failed: %s", video_id, e)
+
+        logger.info("🚚 Ingesting %d videos with concurrency %d", len(video_ids), self.concurrency)
+        started_at = time.time()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            list(executor.map(ingest, video_ids))
+        elapsed = time.time() - started_at
+
+        embedder_after = self.clients.embedder.get_stats()
+        api_calls = embedder_after["api_calls"] - embedder_before["api_calls"]
+        cache_hits = embedder_after["cache_hits"] - embedder_before["cache_hits"]
+        texts_embedded = embedder_after["texts_embedded"] - embedder_before["texts_embedded"]
+
+        report.update({
+            "elapsed_seconds": round(elapsed, 3),
+            "videos_per_minute": round(len(report["processed"]) / elapsed * 60, 2) if elapsed else 0.0,
+            "chunks_per_second": round(report["total_chunks"] / elapsed, 2) if elapsed else 0.0,
+            "embedding_api_calls": api_calls,
+            # One call per chunk is what the unbatched, uncached pipeline paid
+            "api_calls_saved_by_cache": cache_hits,
+            "api_calls_saved_by_batching": max(texts_embedded - api_calls, 0),
+        })
+        return report
+
+
+def configure_service_rate_limits(config: Config = None, youtube: Optional[float] = None,
+                                  embedding: Optional[float] = None, llm: Optional[float] = None):
+    """Apply per-service request rates and circuit breakers, falling back to the configured defaults"""
+    config = config or Config()
+    configure_rate_limit("youtube", youtube if youtube is not None else config.YOUTUBE_RATE_LIMIT)
+    configure_rate_limit("embedding", embedding if embedding is not None else config.EMBEDDING_RATE_LIMIT)
+    configure_rate_limit("llm", llm if llm is not None else config.LLM_RATE_LIMIT)
+    for service in ("youtube", "embedding", "llm"):
+        configure_service(service, failure_threshold=config.CIRCUIT_FAILURE_THRESHOLD,
+                          recovery_timeout=config.CIRCUIT_RECOVERY_TIMEOUT)
+
+
+def _store(manager, dashboard, video_id: str, chatbot, output_dir: Optional[str] = None):
+    """Publish a processed video to the shared index store and dashboard
+    (and optionally export it)"""
+    manager[video_id] = chatbot
+    try:
+        dashboard.record_video_processed(video_id, chatbot.get_video_analytics(video_id),
+                                         chatbot.analyze_video_sentiment(video_id))
+    except Exception as e:
+        logger.warning("⚠️ Failed to update dashboard for video %s: %s", video_id, e)
+    if output_dir:
+        chatbot.save(os.path.join(output_dir, video_id))
+
+
+def _read_video_refs(paths: List[str], files: List[str]) -> List[str]:
+    refs = list(paths)
+    for file_path in files:
+        with open(file_path) as f:
+            refs.extend(line.strip() for line in f
+                        if line.strip() and not line.lstrip().startswith('#'))
+    return refs
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(
+        description="Ingest many YouTube videos into the RAG index")
+    parser.add_argument("videos", nargs="*", help="Video ids or URLs")
+    parser.add_argument("--file", action="append", default=[],
+                        help="File with one video id or URL per line")
+    parser.add_argument("--language", default="en", help="Transcript language code")
+    parser.add_argument("--no-translate", action="store_true",
+                        help="Keep non-English transcripts untranslated")
+    parser.add_argument("--concurrency", type=int, default=None,
+                        help="Videos processed at once (default: BULK_CONCURRENCY)")
+    parser.add_argument("--youtube-rps", type=float, default=None,
+                        help="YouTube requests per second (0 = unlimited)")
+    parser.add_argument("--embedding-rps", type=float, default=None,
+                        help="Embedding requests per second (0 = unlimited)")
+    parser.add_argument("--output-dir", default=None,
+                        help="Also save a copy of each video's index under this directory")
+    parser.add_argument("--report", default=None, help="Write the JSON report to this path")
+    args = parser.parse_args(argv)
+
+    refs = _read_video_refs(args.videos, args.file)
+    if not refs:
+        parser.error("no videos given")
+
+    config = Config()
+    setup_logging(level=config.LOG_LEVEL, fmt="text", sample_rate=config.LOG_SAMPLE_RATE)
+    configure_service_rate_limits(config, youtube=args.youtube_rps,
+                                  embedding=args.embedding_rps)
+
+    from main import YouTubeRAGChatbot
+
+    # Indexes go to the same store and registry the API serves from; this
+    # process only writes them, so keep at most one resident
+    manager = VideoSessionManager(config.INDEX_STORE_DIR, loader=YouTubeRAGChatbot.load,
+                                  max_videos=1)
+    # The same dashboard totals the API keeps
+    dashboard = DashboardAggregator(manager.registry.db_path)
+    ingestor = BulkIngestor(
+        config, concurrency=args.concurrency,
+        is_indexed=lambda video_id: video_id in manager,
+        on_processed=lambda video_id, chatbot: _store(manager, dashboard, video_id, chatbot,
+                                                      args.output_dir),
+        claim=manager.claim,
+        release=manager.release,
+    )
+    report = ingestor.run(refs, args.language, not args.no_translate)
+
+    print("=" * 50)
+    print(f"📊 Processed {len(report['processed'])}, skipped {len(report['skipped'])}, "
+          f"failed {len(report['failed'])} in {report['elapsed_seconds']}s")
+    print(f"⚡ {report['videos_per_minute']} videos/min, {report['chunks_per_second']} chunks/sec")
+    print(f"💾 Embedding API calls: {report['embedding_api_calls']} "
+          f"(saved {report['api_calls_saved_by_batching']} by batching, "
+          f"{report['api_calls_saved_by_cache']} by cache)")
+
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@ Simple configuration for YouTube RAG Chatbot
 """
 
 import os
+import tempfile
 
 
 class Config:
@@ -23,9 +24,148 @@ class Config:
     # Text Processing Settings
     CHUNK_SIZE: int = 1000
     CHUNK_OVERLAP: int = 200
+    # Pack whole caption segments into chunks of up to CHUNK_TOKENS tokens,
+    # repeating up to CHUNK_OVERLAP_TOKENS of segments between neighbours.
+    # Translated transcripts no longer line up with their segments and are
+    # split by characters (CHUNK_SIZE / CHUNK_OVERLAP) instead
+    SEGMENT_CHUNKING: bool = os.getenv("SEGMENT_CHUNKING", "true").lower() == "true"
+    CHUNK_TOKENS: int = int(os.getenv("CHUNK_TOKENS", "250"))
+    CHUNK_OVERLAP_TOKENS: int = int(os.getenv("CHUNK_OVERLAP_TOKENS", "50"))
 
     # Retrieval Settings
     RETRIEVAL_K: int = 4
+    # Scale k by question type and stop early where candidate similarity
+    # drops off (RETRIEVAL_K then only applies to general questions)
+    ADAPTIVE_RETRIEVAL: bool = os.getenv("ADAPTIVE_RETRIEVAL", "true").lower() == "true"
+    RETRIEVAL_K_FACTUAL: int = int(os.getenv("RETRIEVAL_K_FACTUAL", "2"))
+    RETRIEVAL_K_SUMMARY: int = int(os.getenv("RETRIEVAL_K_SUMMARY", "10"))
+    RETRIEVAL_MIN_K: int = int(os.getenv("RETRIEVAL_MIN_K", "1"))
+    # Stop at a candidate below this fraction of the best cosine similarity,
+    # or this far below the previous candidate (0 disables either check).
+    # Off by default: cutting fused hybrid candidates by raw cosine drops
+    # keyword matches (see benchmarks/retrieval_bench.py)
+    RETRIEVAL_MIN_SCORE_RATIO: float = float(os.getenv("RETRIEVAL_MIN_SCORE_RATIO", "0"))
+    RETRIEVAL_MAX_SCORE_GAP: float = float(os.getenv("RETRIEVAL_MAX_SCORE_GAP", "0"))
+    # "mmr" picks diverse chunks from the candidates, "similarity" the top k
+    RETRIEVAL_SEARCH_TYPE: str = os.getenv("RETRIEVAL_SEARCH_TYPE", "mmr")
+    # 1 = pure relevance, 0 = pure diversity
+    MMR_LAMBDA: float = float(os.getenv("MMR_LAMBDA", "0.7"))
+    # Penalty for picking chunks close in time to ones already picked (0 = off),
+    # decaying over TIME_DIVERSITY_SCALE seconds
+    TIME_DIVERSITY_PENALTY: float = float(os.getenv("TIME_DIVERSITY_PENALTY", "0"))
+    TIME_DIVERSITY_SCALE: float = float(os.getenv("TIME_DIVERSITY_SCALE", "60"))
+    # Token budget for retrieved context in each prompt (0 = unlimited);
+    # overlapping chunks are merged before the budget is applied
+    CONTEXT_MAX_TOKENS: int = int(os.getenv("CONTEXT_MAX_TOKENS", "1500"))
+    # Fuse BM25 keyword matches with vector search (reciprocal rank fusion)
+    HYBRID_RETRIEVAL: bool = os.getenv("HYBRID_RETRIEVAL", "true").lower() == "true"
+    # Candidates taken from each retriever before fusion and MMR
+    HYBRID_FETCH_K: int = int(os.getenv("HYBRID_FETCH_K", "20"))
+    RRF_K: int = int(os.getenv("RRF_K", "60"))
+    # Videos with at most this many chunks are searched by keywords alone
+    # (no query embedding) when enough chunks match
+    LEXICAL_ONLY_MAX_CHUNKS: int = int(os.getenv("LEXICAL_ONLY_MAX_CHUNKS", "10"))
+
+    # Prompt Cache Settings
+    # How the stable prompt prefix (instructions + retrieved context) is
+    # reused: "none", "simulated" (sends everything, reports what a provider
+    # cache would save) or "gemini" (Gemini context caching)
+    PROMPT_CACHE: str = os.getenv("PROMPT_CACHE", "none")
+    PROMPT_CACHE_TTL_SECONDS: float = float(os.getenv("PROMPT_CACHE_TTL_SECONDS", "300"))
+    # Shorter prefixes are not cached (the provider minimum depends on the model)
+    PROMPT_CACHE_MIN_TOKENS: int = int(os.getenv("PROMPT_CACHE_MIN_TOKENS", "1024"))
+    # Share of the input price billed for cached tokens
+    PROMPT_CACHE_CACHED_TOKEN_RATE: float = float(os.getenv("PROMPT_CACHE_CACHED_TOKEN_RATE", "0.25"))
+
+    # Direct Context Settings
+    # Transcripts up to this many tokens are sent whole to the LLM instead of
+    # being chunked, embedded and indexed (0 = always index)
+    DIRECT_CONTEXT_MAX_TOKENS: int = int(os.getenv("DIRECT_CONTEXT_MAX_TOKENS", "4000"))
+
+    # Conversation Memory Settings
+    # Requests with a session_id get the earlier turns of that session; the
+    # most recent turns are kept verbatim, older ones folded into a summary
+    CONVERSATION_TTL_SECONDS: float = float(os.getenv("CONVERSATION_TTL_SECONDS", "1800"))
+    CONVERSATION_MAX_SESSIONS: int = int(os.getenv("CONVERSATION_MAX_SESSIONS", "10000"))
+    CONVERSATION_MAX_TOKENS: int = int(os.getenv("CONVERSATION_MAX_TOKENS", "1000"))
+    CONVERSATION_RECENT_TURNS: int = int(os.getenv("CONVERSATION_RECENT_TURNS", "3"))
+    # Rewrite follow-up questions ("explain the second point") into
+    # standalone ones before retrieval
+    QUERY_REWRITE: bool = os.getenv("QUERY_REWRITE", "true").lower() == "true"
+
+    # Progressive Indexing Settings
+    # Number of chunks that must be indexed before a video accepts questions
+    PARTIAL_READY_CHUNKS: int = int(os.getenv("PARTIAL_READY_CHUNKS", "20"))
+    # Number of chunks embedded per batch while the index keeps growing
+    INDEX_BATCH_SIZE: int = int(os.getenv("INDEX_BATCH_SIZE", "20"))
+
+    # Embedding Batching Settings
+    EMBEDDING_BATCH_SIZE: int = int(os.getenv("EMBEDDING_BATCH_SIZE", "50"))
+    EMBEDDING_CACHE_SIZE: int = int(os.getenv("EMBEDDING_CACHE_SIZE", "2000"))
+
+    # Batch Question Settings
+    # LLM calls in flight for one batch of questions, and most questions per batch
+    BATCH_MAX_CONCURRENCY: int = int(os.getenv("BATCH_MAX_CONCURRENCY", "4"))
+    BATCH_MAX_QUESTIONS: int = int(os.getenv("BATCH_MAX_QUESTIONS", "20"))
+
+    # Chapter Settings
+    # Chapters start where the similarity between neighbouring chunks dips
+    # (deeper than mean + CHAPTER_CUTOFF standard deviations), with at least
+    # CHAPTER_MIN_CHUNKS chunks each
+    CHAPTER_MIN_CHUNKS: int = int(os.getenv("CHAPTER_MIN_CHUNKS", "3"))
+    CHAPTER_WINDOW: int = int(os.getenv("CHAPTER_WINDOW", "2"))
+    CHAPTER_CUTOFF: float = float(os.getenv("CHAPTER_CUTOFF", "0.5"))
+    CHAPTER_MAX_CHAPTERS: int = int(os.getenv("CHAPTER_MAX_CHAPTERS", "30"))
+    # Answer "where does it talk about X" from the chapters, without an LLM
+    # call, when the best chapter is at least this similar to the question
+    # (cosine; unrelated text still scores around 0.3-0.4 with Gemini embeddings)
+    CHAPTER_NAVIGATION: bool = os.getenv("CHAPTER_NAVIGATION", "true").lower() == "true"
+    CHAPTER_NAVIGATION_K: int = int(os.getenv("CHAPTER_NAVIGATION_K", "2"))
+    CHAPTER_MIN_SCORE: float = float(os.getenv("CHAPTER_MIN_SCORE", "0.5"))
+
+    # Precomputed Artifact Settings
+    # Compute each video's summary and sentiment in the background once it is
+    # fully indexed (and again after a reindex), so reading them is a lookup.
+    # Costs 4 LLM calls per video; when off they are computed on the first
+    # read and then stored
+    PRECOMPUTE_ARTIFACTS: bool = os.getenv("PRECOMPUTE_ARTIFACTS", "true").lower() == "true"
+
+    # Bulk Ingestion Settings
+    BULK_CONCURRENCY: int = int(os.getenv("BULK_CONCURRENCY", "4"))
+    # Also precompute artifacts for bulk backfills (with PRECOMPUTE_ARTIFACTS);
+    # off by default so a backfill does not add 4 LLM calls per video; those
+    # videos compute them on first read
+    BULK_PRECOMPUTE_ARTIFACTS: bool = os.getenv("BULK_PRECOMPUTE_ARTIFACTS", "false").lower() == "true"
+    # Requests per second per service (0 = unlimited)
+    YOUTUBE_RATE_LIMIT: float = float(os.getenv("YOUTUBE_RATE_LIMIT", "0"))
+    EMBEDDING_RATE_LIMIT: float = float(os.getenv("EMBEDDING_RATE_LIMIT", "0"))
+    LLM_RATE_LIMIT: float = float(os.getenv("LLM_RATE_LIMIT", "0"))
+    # Consecutive failures that open a service's circuit breaker (0 = never)
+    CIRCUIT_FAILURE_THRESHOLD: int = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+    CIRCUIT_RECOVERY_TIMEOUT: float = float(os.getenv("CIRCUIT_RECOVERY_TIMEOUT", "30"))
+
+    # Instrumentation Settings
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    # Add a Server-Timing header with per-stage durations to API responses
+    SERVER_TIMING_HEADER: bool = os.getenv("SERVER_TIMING_HEADER", "false").lower() == "true"
+
+    # Logging Settings
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "json")  # "json" or "text"
+    # Fraction of DEBUG/INFO records kept (warnings and errors are never sampled)
+    LOG_SAMPLE_RATE: float = float(os.getenv("LOG_SAMPLE_RATE", "1.0"))
+
+    # Session Memory Settings (0 = unlimited)
+    SESSION_MAX_VIDEOS: int = int(os.getenv("SESSION_MAX_VIDEOS", "20"))
+    SESSION_MAX_BYTES: int = int(os.getenv("SESSION_MAX_BYTES", str(1024 * 1024 * 1024)))
+
+    # Shared Index Storage Settings
+    # Saved indexes plus the SQLite registry of processed videos. Point every
+    # worker (and host, via a shared volume) at the same directory.
+    INDEX_STORE_DIR: str = os.getenv(
+        "INDEX_STORE_DIR", os.path.join(tempfile.gettempdir(), "youtube-chatbot-indexes"))
+    # Replaced index versions stay on disk this long, for workers still loading them
+    INDEX_RETAIN_SECONDS: float = float(os.getenv("INDEX_RETAIN_SECONDS", "300"))
 
     @classmethod
     def validate(cls) -> bool:
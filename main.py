@@ -2,59 +2,128 @@
 Main application for YouTube RAG Chatbot
 """
 
-from typing import Optional, List
+from typing import Callable, Optional, List
+from operator import itemgetter
+import contextlib
+import contextvars
+import difflib
+import hashlib
+import os
+import pickle
+import re
+import textwrap
+import threading
 import time
 from config import Config
-from utils import embedding_retry, youtube_transcript_retry
-from youtube_transcript_api import YouTubeTranscriptApi
-from youtube_transcript_api.proxies import WebshareProxyConfig
-from youtube_transcript_api._errors import TranscriptsDisabled, NoTranscriptFound
-from deep_translator import GoogleTranslator
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_google_genai import GoogleGenerativeAIEmbeddings, ChatGoogleGenerativeAI
-from langchain_community.vectorstores import FAISS
-from langchain_core.prompts import PromptTemplate
-from langchain_core.runnables import RunnableParallel, RunnablePassthrough, RunnableLambda
-from langchain_core.output_parsers import StrOutputParser
+from utils import (youtube_transcript_retry, llm_retry, ClientPool, get_client_pool, span, incr,
+                   get_logger, setup_logging, BM25Index, reciprocal_rank_fusion, count_tokens, pack_context,
+                   mmr_select, classify_query, score_cutoff, FACTUAL_QUERY, SUMMARY_QUERY,
+                   GENERAL_QUERY, is_follow_up, format_turns, ChapterIndex, is_navigation_query,
+                   CompactTranscript, SegmentSplitter)
 from dotenv import load_dotenv
-import os
+
+# LangChain, FAISS, the translator and the YouTube client are imported where
+# they are first used, so importing this module (and starting the API) is fast
 
 load_dotenv()  # Load variables from .env file
 
-proxy_username = os.getenv("PROXY_USERNAME")
-proxy_password = os.getenv("PROXY_PASSWORD")
+logger = get_logger("main")
+
+
+QUERY_REWRITE_PROMPT = textwrap.dedent("""
+    Rewrite the follow-up question as a standalone question about the video,
+    using the conversation to resolve references like "it" or "the second point".
+    Reply with the question only.
+
+    Conversation:
+    {history}
+
+    Follow-up question: {question}
+    Standalone question:
+""").strip()
+
+CONVERSATION_SUMMARY_PROMPT = textwrap.dedent("""
+    Update the summary of a conversation about a video with the turns below.
+    Keep the topics asked about and the key facts of the answers, in at most
+    100 words. Reply with the summary only.
+
+    Summary so far: {summary}
+
+    New turns:
+    {turns}
+
+    Updated summary:
+""").strip()
+
+# Questions behind the structured summary, one LLM call each
+SUMMARY_QUESTIONS = {
+    "brief_summary": "Provide a brief 30-word summary of this video.",
+    "detailed_summary": "Provide a detailed 200-word summary covering all main points.",
+    "key_takeaways": "List the top 5 key takeaways from this video in bullet points.",
+    "technical_concepts": "What technical concepts or terminology are explained in this video?",
+}
 
+# Bump when the precomputed artifacts change shape or wording, so stored ones
+# count as stale
+ARTIFACTS_FORMAT = 1
 
-def simple_translate_text(text: str, source_lang: str, target_lang: str = 'en') -> str:
-    """Simple translation function using Google Translator with chunking and better error handling"""
+# Sentiment keywords: a word counts when it contains any of them
+_POSITIVE_WORDS = re.compile(r"\S*(?:good|great|excellent|amazing|wonderful|love|like|best|"
+                             r"awesome|fantastic)\S*")
+_NEGATIVE_WORDS = re.compile(r"\S*(?:bad|terrible|awful|hate|worst|horrible|disappointing|"
+                             r"sad|angry|frustrated)\S*")
+_EDUCATIONAL_WORDS = re.compile(r"\S*(?:learn|tutorial|guide|explain|understand|concept|"
+                                r"example|demonstration)\S*")
+
+# Per-question numbers (k, tokens) collected by the chain steps; a dict shared
+# by reference, so steps run in copied contexts (parallel branches) fill it too
+_question_stats = contextvars.ContextVar("question_stats", default=None)
+
+
+def _note_question_stats(**values):
+    """Record values for the question being answered, if one is tracked"""
+    stats = _question_stats.get()
+    if stats is not None:
+        stats.update(values)
+
+
+def simple_translate_text(text: str, source_lang: str, target_lang: str = 'en',
+                          translator=None, delay: float = 0.5) -> str:
+    """Simple translation function using Google Translator with chunking and better error handling.
+
+    Pass `translator` (anything with a translate(text) method) to use another
+    backend; `delay` is the pause between chunk requests.
+    """
     try:
-        print(
+        logger.info(
             f"🔄 Translating {len(text)} characters from {source_lang} to {target_lang}...")
 
         # Split into smaller chunks for better translation success
         chunk_size = 1000  # Smaller chunks for better reliability
         chunks = [text[i:i+chunk_size]
                   for i in range(0, len(text), chunk_size)]
-        print(f"📦 Split into {len(chunks)} chunks")
+        logger.info(f"📦 Split into {len(chunks)} chunks")
 
         # Translate chunks
         translated_chunks = []
-        translator = GoogleTranslator(source=source_lang, target=target_lang)
+        if translator is None:
+            from deep_translator import GoogleTranslator
+            translator = GoogleTranslator(source=source_lang, target=target_lang)
 
         successful_translations = 0
 
         for i, chunk in enumerate(chunks):
             try:
-                print(f"  🔄 Translating chunk {i+1}/{len(chunks)}...")
+                logger.debug("🔄 Translating chunk %d/%d", i + 1, len(chunks))
                 translated = translator.translate(chunk)
 
                 # Check if translation actually happened (not same as original)
                 if translated and translated != chunk and len(translated.strip()) > 0:
                     translated_chunks.append(translated)
                     successful_translations += 1
-                    print(f"    ✅ Chunk {i+1} translated successfully")
+                    logger.debug("✅ Chunk %d translated", i + 1)
                 else:
-                    print(
+                    logger.warning(
                         f"    ⚠️ Chunk {i+1} translation may have failed (same as original)")
                     # Try a different approach - translate smaller piece
                     small_piece = chunk[:200]  # First 200 chars
@@ -69,40 +138,41 @@ def simple_translate_text(text: str, source_lang: str, target_lang: str = 'en')
                     except:
                         translated_chunks.append(chunk)  # Keep original
 
-                time.sleep(0.5)  # Longer delay to avoid rate limiting
+                if delay:
+                    time.sleep(delay)  # Longer delay to avoid rate limiting
 
             except Exception as chunk_error:
-                print(f"    ❌ Chunk {i+1} failed: {chunk_error}")
+                logger.warning("❌ Chunk %d translation failed: %s", i + 1, chunk_error)
                 # Keep original if translation fails
                 translated_chunks.append(chunk)
 
         translated_text = " ".join(translated_chunks)
-        print(f"✅ Translation completed: {len(translated_text)} characters")
-        print(
+        logger.info(f"✅ Translation completed: {len(translated_text)} characters")
+        logger.info(
             f"📊 Successfully translated {successful_translations}/{len(chunks)} chunks")
 
         # If no chunks were successfully translated, try translating the whole text at once
         if successful_translations == 0:
-            print(
+            logger.warning(
                 f"⚠️ No chunks translated successfully, trying full text translation...")
             try:
                 full_translated = translator.translate(
                     text[:4000])  # Try first 4000 chars
                 if full_translated and full_translated != text[:4000]:
-                    print(f"✅ Full text translation successful!")
+                    logger.info(f"✅ Full text translation successful!")
                     # Add rest as original
                     return full_translated + " " + text[4000:]
                 else:
-                    print(f"❌ Full text translation also failed")
+                    logger.error(f"❌ Full text translation also failed")
                     return text
             except Exception as full_error:
-                print(f"❌ Full text translation error: {full_error}")
+                logger.error(f"❌ Full text translation error: {full_error}")
                 return text
 
         return translated_text
 
     except Exception as e:
-        print(f"❌ Translation failed: {e}")
+        logger.error(f"❌ Translation failed: {e}")
         return text  # Return original text if translation fails
 
 
@@ -112,51 +182,66 @@ class YouTubeRAGChatbot:
     Enhanced with multi-video support and analytics.
     """
 
-    def __init__(self, config: Config = None):
-        """Initialize the chatbot with configuration"""
+    def __init__(self, config: Config = None, clients: ClientPool = None):
+        """Initialize the chatbot with configuration.
+
+        Model clients come from the shared pool for this configuration unless
+        an explicit ClientPool is passed.
+        """
         self.config = config or Config()
         self.config.validate()
+        self.clients = clients or get_client_pool(self.config)
 
         # Initialize components
         self.ytt_api = None
         self.embedding_model = None
+        self.embedder = None
         self.llm = None
         self.vector_store = None
+        self.lexical_index = None  # BM25 over the indexed chunks; None when stale
+        self.chapter_index = None  # Topical chapters of the indexed chunks; None when stale
         self.rag_chain = None
+        self.answer_chain = None
+
+        # Short transcripts are used whole instead of being indexed
+        self.direct_context = None
+        self._segment_index = None  # BM25 over caption segments, for direct-context timestamps
 
         # Multi-video support
         self.processed_videos = {}  # Store video metadata
         self.video_analytics = {}   # Store analytics data
         self.current_video_id = None
-        self.raw_transcript_data = []  # Store raw transcript with timestamps
+        # Caption segments with timestamps, stored compactly
+        self.raw_transcript_data = CompactTranscript.from_segments([])
+        self._splitters = {}  # Chunk settings -> splitter, built once (see _get_splitter)
+
+        # Progressive indexing state
+        self.index_status = {"state": "empty"}
+        self._pending_chunks = []
+        self._resume_chunks = []  # Pending chunks of a saved partial index (see continue_indexing)
+        self._processing_started_at = 0.0
+        self._index_lock = threading.Lock()
+        self._index_read_only = False  # Memory-mapped by load(); copied before edits
+
+        # Summary and sentiment computed once per index version (see precompute_artifacts)
+        self.artifacts = None
+        self._artifacts_lock = threading.Lock()
 
         self._setup_models()
 
     def _setup_models(self):
-        """Set up the embedding and LLM models"""
-        # Set up YouTube API with proxy support for better reliability
-        self.ytt_api = YouTubeTranscriptApi(
-            proxy_config=WebshareProxyConfig(
-                proxy_username=proxy_username,
-                proxy_password=proxy_password,
-            )
-        )
-
-        # Set up embedding model
-        self.embedding_model = GoogleGenerativeAIEmbeddings(
-            model=self.config.EMBEDDING_MODEL
-        )
-
-        # Set up LLM
-        self.llm = ChatGoogleGenerativeAI(
-            model=self.config.LLM_MODEL,
-            temperature=self.config.LLM_TEMPERATURE
-    
-        )
+        """Set up the embedding and LLM models from the client pool"""
+        self.ytt_api = self.clients.ytt_api
+        self.embedding_model = self.clients.embedding_model
+        self.embedder = self.clients.embedder
+        self.llm = self.clients.llm
+        self.prompt_cache = self.clients.prompt_cache
 
     def extract_transcript(self, video_id: str) -> str:
         """Extract transcript from YouTube video with retry support"""
-        print(f"📥 Extracting transcript for video: {video_id}")
+        from youtube_transcript_api._errors import TranscriptsDisabled, NoTranscriptFound
+
+        logger.info(f"📥 Extracting transcript for video: {video_id}")
 
         try:
             # ✅ Primary method with retry
@@ -165,8 +250,8 @@ class YouTubeRAGChatbot:
             )
 
             # Newer versions return transcript segments with `.text` attribute
-            full_transcript = " ".join(chunk.text for chunk in transcript_data)
-            print(f"✅ Transcript extracted: {len(full_transcript)} characters")
+            full_transcript = CompactTranscript.from_segments(transcript_data).text
+            logger.info(f"✅ Transcript extracted: {len(full_transcript)} characters")
             return full_transcript
 
         except TranscriptsDisabled:
@@ -174,11 +259,11 @@ class YouTubeRAGChatbot:
         except NoTranscriptFound:
             raise ValueError("❗ Transcript not found in English")
         except Exception as e:
-            print(f"⚠️ Primary fetch failed due to: {e}")
+            logger.warning(f"⚠️ Primary fetch failed due to: {e}")
 
     def get_available_transcripts(self, video_id: str) -> List[dict]:
         """Get all available transcripts for a video with language information"""
-        print(f"🔍 Checking available transcripts for video: {video_id}")
+        logger.info(f"🔍 Checking available transcripts for video: {video_id}")
 
         try:
             # Get transcript list (available languages) - using instance method with retry
@@ -196,71 +281,80 @@ class YouTubeRAGChatbot:
                 }
                 available_transcripts.append(transcript_info)
 
-            print(
+            logger.info(
                 f"✅ Found {len(available_transcripts)} available transcripts")
             return available_transcripts
 
         except Exception as e:
-            print(f"❌ Failed to get transcript list: {e}")
+            logger.error(f"❌ Failed to get transcript list: {e}")
             return []
 
     def extract_transcript_by_language(self, video_id: str, language_code: str = 'en', translate_to_english: bool = True) -> tuple:
         """Extract transcript in specific language with timestamps, with simple translation fallback"""
-        print(
+        logger.info(
             f"📥 Extracting transcript for video: {video_id}, language: {language_code}")
 
         try:
             # Get transcript list using instance method with retry
-            transcript_list = youtube_transcript_retry(
-                self.ytt_api.list, video_id)
+            with span("fetch"):
+                transcript_list = youtube_transcript_retry(
+                    self.ytt_api.list, video_id)
 
             # Try to get the requested language
             try:
                 transcript = transcript_list.find_transcript([language_code])
-                print(f"✅ Found {language_code} transcript")
+                logger.info(f"✅ Found {language_code} transcript")
             except Exception as find_error:
-                print(
+                logger.error(
                     f"❌ Could not find {language_code} transcript: {find_error}")
                 raise ValueError(
                     f"Failed to get transcript in {language_code}")
 
             # Fetch the actual transcript data with retry
-            transcript_data = youtube_transcript_retry(transcript.fetch)
+            with span("fetch"):
+                fetched = youtube_transcript_retry(transcript.fetch)
 
-            # Store the raw transcript data with timestamps for later use
+            # Keep the segments compactly (instead of one object per segment)
+            # for timestamps, alignment and analysis
+            transcript_data = CompactTranscript.from_segments(fetched)
             self.raw_transcript_data = transcript_data
-
-            # Extract text from transcript segments
-            full_transcript = " ".join(item.text for item in transcript_data)
-            print(
+            full_transcript = transcript_data.text
+            logger.info(
                 f"✅ Original transcript extracted: {len(full_transcript)} characters")
 
             # If English or no translation needed, return as is
             if language_code == 'en' or not translate_to_english:
-                print(f"ℹ️ No translation needed")
+                logger.info(f"ℹ️ No translation needed")
                 return full_transcript, transcript_data
 
             # Use Google Translator directly
-            print(f"🔄 Using Google Translator...")
-            translated_text = simple_translate_text(
-                full_transcript, language_code, 'en')
+            logger.info(f"🔄 Using Google Translator...")
+            with span("translate"):
+                translated_text = simple_translate_text(
+                    full_transcript, language_code, 'en',
+                    translator=self.clients.get_translator(language_code, 'en'),
+                    delay=self.clients.translation_delay)
 
             # For translated text, we'll keep the original timestamps but with translated text
             # This is a simplified approach - in practice you'd need more sophisticated alignment
             return translated_text, transcript_data
 
         except Exception as e:
-            print(f"❌ Failed to extract transcript by language: {e}")
+            logger.error(f"❌ Failed to extract transcript by language: {e}")
             raise ValueError(f"Failed to extract transcript: {e}")
 
-    def process_video(self, video_id: str, language_code: str = 'en', translate_to_english: bool = True):
-        """Complete pipeline to process a YouTube video with language selection"""
-        print(
+    def process_video(self, video_id: str, language_code: str = 'en', translate_to_english: bool = True,
+                      partial_ready_chunks: Optional[int] = None):
+        """Complete pipeline to process a YouTube video with language selection.
+
+        When partial_ready_chunks is set, the method returns as soon as that many
+        chunks are indexed and the video is "partial"; call continue_indexing()
+        to embed the remaining chunks.
+        """
+        logger.info(
             f"🚀 Processing YouTube video: {video_id} (language: {language_code})")
-        print("=" * 50)
 
-        import time
-        start_time = time.time()
+        self._processing_started_at = time.time()
 
         # Extract transcript by language (now returns transcript and timestamp data)
         transcript, transcript_data = self.extract_transcript_by_language(
@@ -276,181 +370,934 @@ class YouTubeRAGChatbot:
         }
         self.current_video_id = video_id
 
+        # Initialize analytics (processing_time is set once indexing completes)
+        self.video_analytics[video_id] = {
+            "processing_time": 0.0,
+            "chunk_count": 0,
+            "questions_asked": 0,
+            "topics_discussed": [],
+            "sentiment_scores": [],
+            "engagement_score": 0.0
+        }
+
+        token_count = count_tokens(transcript)
+        if 0 < token_count <= self.config.DIRECT_CONTEXT_MAX_TOKENS:
+            self._use_direct_context(transcript, transcript_data, token_count)
+            self.setup_rag_chain()
+            self._finish_indexing()
+            return self
+
+        return self._build_index(transcript, transcript_data, partial_ready_chunks)
+
+    def _use_direct_context(self, transcript: str, transcript_data: List, token_count: int):
+        """Answer from the whole transcript: no chunking, embeddings or vector index"""
+        logger.info("📄 Transcript fits the context budget; skipping indexing",
+                    extra={"video_id": self.current_video_id, "tokens": token_count})
+
+        total_seconds = 0.0
+        if transcript_data:
+            last_segment = transcript_data[-1]
+            total_seconds = last_segment.start + last_segment.duration
+
+        with self._index_lock:
+            self.vector_store = None
+            self.lexical_index = None
+            self.chapter_index = None
+            self.direct_context = transcript
+            self._segment_index = None
+        self._pending_chunks = []
+        self.index_status = {
+            "state": "processing",
+            "mode": "direct",
+            "context_tokens": token_count,
+            "indexed_chunks": 0,
+            "total_chunks": 0,
+            "indexed_seconds": total_seconds,
+            "total_seconds": total_seconds,
+        }
+        incr("direct_context_videos_total")
+
+    def _build_index(self, transcript: str, transcript_data: List,
+                     partial_ready_chunks: Optional[int] = None):
+        """Split, embed and index a transcript (see process_video)"""
+        self.direct_context = None
+        self._segment_index = None
+
         # Process transcript with timestamps
-        chunks = self.process_transcript_with_timestamps(
-            transcript, transcript_data)
+        with span("split"):
+            chunks = self.process_transcript_with_timestamps(
+                transcript, transcript_data)
+        if self.current_video_id in self.video_analytics:
+            self.video_analytics[self.current_video_id]["chunk_count"] = len(chunks)
+
+        total_seconds = 0.0
+        if transcript_data:
+            last_segment = transcript_data[-1]
+            total_seconds = last_segment.start + last_segment.duration
+
+        self._pending_chunks = list(chunks)
+        self.index_status = {
+            "state": "processing",
+            "indexed_chunks": 0,
+            "total_chunks": len(chunks),
+            "indexed_seconds": 0.0,
+            "total_seconds": total_seconds,
+        }
 
-        # Generate embeddings
-        texts, embeddings = self.generate_embeddings(chunks)
+        # Index the first batch (or everything) before accepting questions
+        ready_after = partial_ready_chunks or len(chunks)
+        while self._pending_chunks and (
+                self.vector_store is None or self.index_status["indexed_chunks"] < ready_after):
+            batch_size = min(self.config.INDEX_BATCH_SIZE,
+                             ready_after - self.index_status["indexed_chunks"])
+            self._index_next_batch(max(batch_size, 1))
 
-        # Create vector store
-        self.create_vector_store(texts, embeddings)
+        if self.vector_store is None:
+            self.index_status["state"] = "failed"
+            raise ValueError("Failed to embed any transcript chunks")
 
         # Setup RAG chain
         self.setup_rag_chain()
 
-        # Initialize analytics
-        processing_time = time.time() - start_time
-        self.video_analytics[video_id] = {
-            "processing_time": processing_time,
-            "chunk_count": len(chunks),
-            "questions_asked": 0,
-            "topics_discussed": [],
-            "sentiment_scores": [],
-            "engagement_score": 0.0
-        }
+        if self._pending_chunks:
+            self.index_status["state"] = "partial"
+            logger.info(
+                f"⚡ Video partially ready: {self.get_coverage():.0%} of the video indexed")
+            return self
+
+        self._finish_indexing()
+        return self
 
-        print("=" * 50)
-        print("🎯 Video processing complete! Ready for questions.")
+    def continue_indexing(self, on_batch: Optional[Callable[[], None]] = None):
+        """Embed the chunks left pending by a partial process_video() call.
+
+        Also resumes a partial index loaded from disk, whose pending chunks
+        were saved with it. on_batch is called after every embedded batch.
+        """
+        if not self._pending_chunks and self.index_status.get("state") == "partial":
+            if not self._resume_chunks:
+                raise ValueError("Saved partial index has no pending chunks to resume")
+            self._pending_chunks, self._resume_chunks = self._resume_chunks, []
+
+        while self._pending_chunks:
+            self._index_next_batch(self.config.INDEX_BATCH_SIZE)
+            if on_batch:
+                on_batch()
+            logger.debug(
+                "📈 Indexed %d/%d chunks", self.index_status['indexed_chunks'],
+                self.index_status['total_chunks'],
+                extra={"video_id": self.current_video_id, "coverage": round(self.get_coverage(), 4)})
+
+        self._finish_indexing()
         return self
 
+    def _index_next_batch(self, batch_size: int):
+        """Embed the next pending chunks and add them to the vector store"""
+        batch = self._pending_chunks[:batch_size]
+        texts, embeddings, metadatas = self._embed_chunks(batch)
+
+        if texts:
+            if self.vector_store is None:
+                self.create_vector_store(texts, embeddings, metadatas)
+            else:
+                with span("index"), self._index_lock:
+                    self._make_index_writable()
+                    self.vector_store.add_embeddings(
+                        list(zip(texts, embeddings)), metadatas=metadatas)
+                    self.lexical_index = None
+                    self.chapter_index = None
+            incr("chunks_indexed_total", len(texts))
+
+        del self._pending_chunks[:len(batch)]
+        self.index_status["indexed_chunks"] += len(texts)
+        if batch:
+            self.index_status["indexed_seconds"] = max(
+                self.index_status["indexed_seconds"],
+                max(chunk.metadata.get('end_time', 0) for chunk in batch))
+
+    def _make_index_writable(self):
+        """Swap a memory-mapped (read-only) index for a private copy before editing it"""
+        if self._index_read_only:
+            import faiss
+            self.vector_store.index = faiss.clone_index(self.vector_store.index)
+            self._index_read_only = False
+
+    def _finish_indexing(self):
+        """Mark the current video as fully indexed and record processing time"""
+        self.index_status["state"] = "ready"
+        self.index_status["indexed_seconds"] = self.index_status["total_seconds"]
+        if self.current_video_id in self.video_analytics and self._processing_started_at:
+            # Unknown for an index resumed after loading; the saved value stays
+            self.video_analytics[self.current_video_id]["processing_time"] = (
+                time.time() - self._processing_started_at)
+        incr("videos_processed_total")
+        self.get_lexical_index()
+        self.get_chapter_index()
+
+        logger.info("🎯 Video processing complete! Ready for questions.",
+                    extra={"video_id": self.current_video_id,
+                           "chunks": self.index_status.get("indexed_chunks", 0)})
+
+    def get_coverage(self) -> float:
+        """Fraction of the video's duration that is currently indexed"""
+        total_seconds = self.index_status.get("total_seconds", 0)
+        if self.index_status.get("state") == "ready":
+            return 1.0
+        if not total_seconds:
+            return 0.0
+        return min(self.index_status.get("indexed_seconds", 0) / total_seconds, 1.0)
+
+    def get_index_status(self) -> dict:
+        """Get the indexing state and coverage of the current video"""
+        return {
+            **self.index_status,
+            "coverage": round(self.get_coverage(), 4),
+        }
+
+    @property
+    def is_fully_indexed(self) -> bool:
+        return self.index_status.get("state") == "ready"
+
+    @property
+    def is_indexing(self) -> bool:
+        """True while this instance still has chunks waiting to be embedded"""
+        return bool(self._pending_chunks)
+
+    def reindex(self, transcript_data: Optional[List] = None,
+                language_code: Optional[str] = None) -> dict:
+        """Update the index after the current video's transcript changed.
+
+        The new caption segments (fetched again unless transcript_data is given)
+        are diffed against the stored ones. Chunks cut from changed segments are
+        removed from the index by id, only the affected regions are re-split and
+        embedded, and every other chunk keeps its vector. Indexes built before
+        chunks carried segment ranges, and translated transcripts (whose text
+        does not line up with the caption segments), are rebuilt in full.
+
+        Returns a report with segment and chunk counts and the number of
+        embeddings saved compared to a full rebuild.
+        """
+        video_id = self.current_video_id
+        if video_id is None or (self.vector_store is None and self.direct_context is None):
+            raise ValueError("No video has been processed yet. Call process_video() first.")
+        if self.is_indexing:
+            raise ValueError("Video is still being indexed; reindex once it is ready")
+
+        started_at = time.time()
+        video_info = self.processed_videos.get(video_id, {})
+        language_code = language_code or video_info.get("language_code", "en")
+        translated = language_code != 'en' and video_info.get("translated", True)
+        embedder_before = self.embedder.get_stats()
+
+        old_segments = self.raw_transcript_data
+        if transcript_data is None:
+            _, transcript_data = self.extract_transcript_by_language(
+                video_id, language_code, translate_to_english=False)
+            self.raw_transcript_data = old_segments  # Replaced once the index is updated
+        new_segments = (transcript_data if isinstance(transcript_data, CompactTranscript)
+                        else CompactTranscript.from_segments(transcript_data))
+        if not new_segments:
+            raise ValueError("New transcript is empty")
+        if self.direct_context is not None:
+            return self._reindex_direct(new_segments, language_code, translated, started_at)
+
+        # Align segments by text; timing-only changes keep their chunks
+        matcher = difflib.SequenceMatcher(
+            None, old_segments.texts(), new_segments.texts(), autojunk=False)
+        old_to_new = {}
+        insert_points = []
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == "equal":
+                old_to_new.update(zip(range(i1, i2), range(j1, j2)))
+            elif tag == "insert":
+                insert_points.append(i1)
+
+        with self._index_lock:
+            docs = [(doc_id, self.vector_store.docstore._dict[doc_id])
+                    for doc_id in self.vector_store.index_to_docstore_id.values()]
+        full_rebuild = translated or any('first_segment' not in doc.metadata for _, doc in docs)
+
+        stale_ids, kept = [], []
+        for doc_id, doc in docs:
+            first, last = doc.metadata.get('first_segment'), doc.metadata.get('last_segment')
+            if (full_rebuild or first is None
+                    or any(index not in old_to_new for index in range(first, last + 1))
+                    or any(first < point <= last for point in insert_points)):
+                stale_ids.append(doc_id)
+            else:
+                kept.append((doc, old_to_new[first], old_to_new[last]))
+
+        # Character offset of each segment in the joined transcript
+        old_offsets = old_segments.char_offsets
+        new_offsets = new_segments.char_offsets
+
+        if full_rebuild:
+            transcript = new_segments.text
+            if translated:
+                with span("translate"):
+                    transcript = simple_translate_text(
+                        transcript, language_code, 'en',
+                        translator=self.clients.get_translator(language_code, 'en'),
+                        delay=self.clients.translation_delay)
+            with span("split"):
+                new_chunks = self.process_transcript_with_timestamps(transcript, new_segments)
+        else:
+            # Re-split every run of segments no kept chunk covers, plus one
+            # segment of context on each side (kept chunks may hold only part
+            # of their boundary segments)
+            covered = set()
+            for _, first, last in kept:
+                covered.update(range(first, last + 1))
+            runs = []
+            for index in range(len(new_segments)):
+                if index in covered:
+                    continue
+                if runs and runs[-1][1] == index - 1:
+                    runs[-1][1] = index
+                else:
+                    runs.append([index, index])
+
+            new_chunks = []
+            with span("split"):
+                for lo, hi in runs:
+                    lo, hi = max(lo - 1, 0), min(hi + 1, len(new_segments) - 1)
+                    region = new_segments[lo:hi + 1]
+                    new_chunks.extend(self.process_transcript_with_timestamps(
+                        region.text, region, segment_offset=lo, char_offset=int(new_offsets[lo])))
+
+        texts, embeddings, metadatas = self._embed_chunks(new_chunks)
+
+        with span("index"), self._index_lock:
+            self._make_index_writable()
+
+            # Kept chunks move to their new segment positions and pick up any timing fixes
+            for doc, first, last in kept:
+                segments = new_segments[first:last + 1]
+                if doc.metadata.get('start_index') is not None:
+                    doc.metadata['start_index'] += int(
+                        new_offsets[first] - old_offsets[doc.metadata['first_segment']])
+                doc.metadata.update({
+                    'timestamps': [{'start': item.start, 'end': item.start + item.duration,
+                                    'text_segment': item.text} for item in segments],
+                    'start_time': segments[0].start,
+                    'end_time': segments[-1].start + segments[-1].duration,
+                    'first_segment': first,
+                    'last_segment': last,
+                })
+            if stale_ids:
+                self.vector_store.delete(stale_ids)
+            if texts:
+                self.vector_store.add_embeddings(list(zip(texts, embeddings)), metadatas=metadatas)
+            self.lexical_index = None
+            self.chapter_index = None
+            chunk_count = len(self.vector_store.index_to_docstore_id)
+        incr("chunks_indexed_total", len(texts))
+        self.get_lexical_index()
+        self.get_chapter_index()
+
+        transcript = new_segments.text
+        self.raw_transcript_data = new_segments
+        video_info.update({
+            "transcript_length": len(transcript),
+            "word_count": len(transcript.split()),
+            "reindexed_at": time.time(),
+        })
+        if video_id in self.video_analytics:
+            self.video_analytics[video_id]["chunk_count"] = chunk_count
+        total_seconds = new_segments[-1].start + new_segments[-1].duration
+        self.index_status.update({
+            "indexed_chunks": chunk_count,
+            "total_chunks": chunk_count,
+            "indexed_seconds": total_seconds,
+            "total_seconds": total_seconds,
+        })
+
+        embedder_after = self.embedder.get_stats()
+        cache_hits = embedder_after["cache_hits"] - embedder_before["cache_hits"]
+        report = {
+            "video_id": video_id,
+            "mode": "full" if full_rebuild else "incremental",
+            "segments_unchanged": len(old_to_new),
+            "segments_added": len(new_segments) - len(old_to_new),
+            "segments_removed": len(old_segments) - len(old_to_new),
+            "chunks_reused": len(kept),
+            "chunks_removed": len(stale_ids),
+            "chunks_added": len(texts),
+            "chunk_count": chunk_count,
+            "embedding_api_calls": embedder_after["api_calls"] - embedder_before["api_calls"],
+            "embeddings_computed": len(new_chunks) - cache_hits,
+            "embeddings_saved": len(kept) + cache_hits,
+            "elapsed_seconds": round(time.time() - started_at, 3),
+        }
+        logger.info("🔁 Reindexed video: %d chunks reused, %d re-embedded",
+                    len(kept), report["embeddings_computed"], extra=report)
+        return report
+
+    def _reindex_direct(self, new_segments: CompactTranscript, language_code: str, translated: bool,
+                        started_at: float) -> dict:
+        """reindex() for a direct-context video: swap in the new transcript, or
+        build the index if it no longer fits the context budget"""
+        video_id = self.current_video_id
+        transcript = new_segments.text
+        if translated:
+            with span("translate"):
+                transcript = simple_translate_text(
+                    transcript, language_code, 'en',
+                    translator=self.clients.get_translator(language_code, 'en'),
+                    delay=self.clients.translation_delay)
+
+        embedder_before = self.embedder.get_stats()
+        self.raw_transcript_data = new_segments
+        token_count = count_tokens(transcript)
+        if 0 < token_count <= self.config.DIRECT_CONTEXT_MAX_TOKENS:
+            self._use_direct_context(transcript, new_segments, token_count)
+            self.index_status["state"] = "ready"
+        else:
+            self._processing_started_at = started_at
+            self._build_index(transcript, new_segments)
+
+        self.processed_videos.get(video_id, {}).update({
+            "transcript_length": len(transcript),
+            "word_count": len(transcript.split()),
+            "reindexed_at": time.time(),
+        })
+        embedder_after = self.embedder.get_stats()
+        return {
+            "video_id": video_id,
+            "mode": "direct" if self.direct_context is not None else "full",
+            "context_tokens": token_count,
+            "chunk_count": self.index_status.get("indexed_chunks", 0),
+            "embedding_api_calls": embedder_after["api_calls"] - embedder_before["api_calls"],
+            "elapsed_seconds": round(time.time() - started_at, 3),
+        }
+
+    def _get_splitter(self, by_segments: bool):
+        """The segment or character splitter for the current chunk settings, built once"""
+        config = self.config
+        key = ((True, config.CHUNK_TOKENS, config.CHUNK_OVERLAP_TOKENS) if by_segments
+               else (False, config.CHUNK_SIZE, config.CHUNK_OVERLAP))
+        splitter = self._splitters.get(key)
+        if splitter is None:
+            if by_segments:
+                splitter = SegmentSplitter(config.CHUNK_TOKENS, config.CHUNK_OVERLAP_TOKENS)
+            else:
+                from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+                splitter = RecursiveCharacterTextSplitter(
+                    chunk_size=config.CHUNK_SIZE,
+                    chunk_overlap=config.CHUNK_OVERLAP,
+                    add_start_index=True
+                )
+            self._splitters[key] = splitter
+        return splitter
+
     def process_transcript(self, transcript: str) -> List:
         """Split transcript into chunks"""
-        print("✂️ Splitting transcript into chunks...")
+        logger.debug("✂️ Splitting transcript into chunks...")
 
-        splitter = RecursiveCharacterTextSplitter(
-            chunk_size=self.config.CHUNK_SIZE,
-            chunk_overlap=self.config.CHUNK_OVERLAP
-        )
-        chunks = splitter.create_documents([transcript])
+        chunks = self._get_splitter(by_segments=False).create_documents([transcript])
 
-        print(f"✅ Created {len(chunks)} chunks")
+        logger.info(f"✅ Created {len(chunks)} chunks")
         return chunks
 
-    def process_transcript_with_timestamps(self, transcript: str, transcript_data: List) -> List:
-        """Split transcript into chunks while preserving timestamp information"""
-        print("✂️ Splitting transcript into chunks with timestamps...")
-
-        # Create a mapping of text segments to timestamps
-        timestamp_map = {}
-        current_pos = 0
-
-        for item in transcript_data:
-            text = item.text
-            start_time = item.start
-            duration = item.duration
-            end_time = start_time + duration
-
-            # Map character positions to timestamps
-            text_start = current_pos
-            text_end = current_pos + len(text)
-
-            for pos in range(text_start, text_end + 1):
-                timestamp_map[pos] = {
-                    'start': start_time,
-                    'end': end_time,
-                    'text_segment': text
-                }
-
-            current_pos = text_end + 1  # +1 for space
+    @staticmethod
+    def _chunk_timestamps(segments) -> List[dict]:
+        """Unique timestamps of a chunk's segments, by start time"""
+        chunk_timestamps = []
+        seen_segments = set()
+        for item in segments:
+            segment_key = (item.start, item.start + item.duration)
+            if segment_key not in seen_segments:
+                chunk_timestamps.append({
+                    'start': item.start,
+                    'end': item.start + item.duration,
+                    'text_segment': item.text
+                })
+                seen_segments.add(segment_key)
+        chunk_timestamps.sort(key=lambda x: x['start'])
+        return chunk_timestamps
+
+    def process_transcript_with_timestamps(self, transcript: str, transcript_data,
+                                           segment_offset: int = 0, char_offset: int = 0) -> List:
+        """Split transcript into chunks while preserving timestamp information.
+
+        Each chunk also records the range of caption segments it was cut from
+        (first_segment/last_segment) so reindex() can tell which chunks a change
+        touches, and its character offset in the transcript (start_index) so
+        overlapping chunks can be merged when packing the prompt. When splitting
+        part of a transcript, segment_offset and char_offset locate that part.
+
+        transcript_data is a CompactTranscript (or a list of segments). When
+        transcript is its text (not a translation), chunks are packed from whole
+        segments up to CHUNK_TOKENS (see SegmentSplitter); otherwise the text is
+        split by characters and chunk positions are mapped to segments by binary
+        search over their character offsets.
+        """
+        logger.debug("✂️ Splitting transcript into chunks with timestamps...")
+
+        if not isinstance(transcript_data, CompactTranscript):
+            transcript_data = CompactTranscript.from_segments(transcript_data)
+
+        if self.config.SEGMENT_CHUNKING and transcript == transcript_data.text:
+            return self._split_segments(transcript_data, segment_offset, char_offset)
 
         # Split transcript into chunks
-        splitter = RecursiveCharacterTextSplitter(
-            chunk_size=self.config.CHUNK_SIZE,
-            chunk_overlap=self.config.CHUNK_OVERLAP
-        )
-        chunks = splitter.create_documents([transcript])
+        chunks = self._get_splitter(by_segments=False).create_documents([transcript])
+
+        # Segments under the first and last character of every chunk
+        import numpy as np
+
+        chunk_starts = np.array([chunk.metadata.get('start_index', -1) for chunk in chunks],
+                                dtype=np.int64)
+        chunk_ends = np.minimum(chunk_starts + [len(chunk.page_content) for chunk in chunks],
+                                len(transcript)) - 1
+        first_segments = transcript_data.segments_at(chunk_starts)
+        # Translated text can run past the original segments; clamp to the last one
+        last_segments = np.where(
+            (transcript_data.segments_at(chunk_ends) < 0) & (first_segments >= 0),
+            len(transcript_data) - 1, transcript_data.segments_at(chunk_ends))
 
         # Add timestamp metadata to each chunk
         enhanced_chunks = []
-        for chunk in chunks:
-            chunk_text = chunk.page_content
-            chunk_start_pos = transcript.find(chunk_text)
-
+        for chunk, chunk_start_pos, first, last in zip(
+                chunks, chunk_starts, first_segments, last_segments):
             if chunk_start_pos != -1:
-                # Find timestamps for this chunk
-                chunk_timestamps = []
-                chunk_end_pos = chunk_start_pos + len(chunk_text)
-
-                # Collect unique timestamps that overlap with this chunk
-                seen_segments = set()
-                for pos in range(chunk_start_pos, min(chunk_end_pos, len(transcript))):
-                    if pos in timestamp_map:
-                        segment_key = (
-                            timestamp_map[pos]['start'], timestamp_map[pos]['end'])
-                        if segment_key not in seen_segments:
-                            chunk_timestamps.append({
-                                'start': timestamp_map[pos]['start'],
-                                'end': timestamp_map[pos]['end'],
-                                'text_segment': timestamp_map[pos]['text_segment']
-                            })
-                            seen_segments.add(segment_key)
-
-                # Sort timestamps by start time
-                chunk_timestamps.sort(key=lambda x: x['start'])
+                segments = transcript_data[int(first):int(last) + 1] if first >= 0 else []
+                chunk_timestamps = self._chunk_timestamps(segments)
 
                 # Add metadata to chunk
                 chunk.metadata = {
                     'timestamps': chunk_timestamps,
                     'start_time': chunk_timestamps[0]['start'] if chunk_timestamps else 0,
-                    'end_time': chunk_timestamps[-1]['end'] if chunk_timestamps else 0
+                    'end_time': chunk_timestamps[-1]['end'] if chunk_timestamps else 0,
+                    'first_segment': int(first) + segment_offset if first >= 0 else None,
+                    'last_segment': int(last) + segment_offset if first >= 0 else None,
+                    'start_index': int(chunk_start_pos) + char_offset
                 }
             else:
                 # Fallback if text not found
                 chunk.metadata = {
                     'timestamps': [],
                     'start_time': 0,
-                    'end_time': 0
+                    'end_time': 0,
+                    'first_segment': None,
+                    'last_segment': None
                 }
 
             enhanced_chunks.append(chunk)
 
-        print(
+        logger.info(
             f"✅ Created {len(enhanced_chunks)} chunks with timestamp metadata")
         return enhanced_chunks
 
+    def _split_segments(self, transcript_data: CompactTranscript, segment_offset: int = 0,
+                        char_offset: int = 0) -> List:
+        """Chunks of whole caption segments, with the same metadata as
+        process_transcript_with_timestamps()"""
+        from langchain_core.documents import Document
+
+        chunks = []
+        for chunk in self._get_splitter(by_segments=True).split(transcript_data):
+            segments = transcript_data[chunk.first_segment:chunk.last_segment + 1]
+            chunks.append(Document(page_content=chunk.text, metadata={
+                'timestamps': self._chunk_timestamps(segments),
+                'start_time': chunk.start_time,
+                'end_time': chunk.end_time,
+                'first_segment': chunk.first_segment + segment_offset,
+                'last_segment': chunk.last_segment + segment_offset,
+                'start_index': chunk.start_index + char_offset
+            }))
+
+        logger.info(f"✅ Created {len(chunks)} segment chunks with timestamp metadata")
+        return chunks
+
     def generate_embeddings(self, chunks: List) -> tuple:
         """Generate embeddings for chunks"""
-        print("🧠 Generating embeddings...")
+        texts, embeddings, _ = self._embed_chunks(chunks)
+        return texts, embeddings
 
-        valid_texts = []
-        valid_embeddings = []
+    def _embed_chunks(self, chunks: List) -> tuple:
+        """Generate embeddings for chunks, keeping texts and metadata aligned"""
+        logger.debug("🧠 Generating embeddings for %d chunks", len(chunks))
 
-        for idx, doc in enumerate(chunks):
-            try:
-                text = doc.page_content
-                embedding = embedding_retry(
-                    self.embedding_model.embed_query, text
-                )
-                valid_texts.append(text)
-                valid_embeddings.append(embedding)
+        with span("embed"):
+            vectors = self.embedder.embed_texts(
+                [doc.page_content for doc in chunks])
 
-                if (idx + 1) % 10 == 0 or (idx + 1) == len(chunks):
-                    print(f"✅ Embedded {idx + 1}/{len(chunks)} chunks")
+        valid_texts = []
+        valid_embeddings = []
+        valid_metadatas = []
 
-            except Exception as e:
-                print(f"❌ Skipped chunk {idx + 1}: {e}")
+        for doc, embedding in zip(chunks, vectors):
+            if embedding is None:
                 continue
+            valid_texts.append(doc.page_content)
+            valid_embeddings.append(embedding)
+            valid_metadatas.append(getattr(doc, 'metadata', None) or {})
 
-        print(f"✅ Successfully embedded {len(valid_embeddings)} chunks")
-        return valid_texts, valid_embeddings
+        logger.debug("✅ Embedded %d chunks", len(valid_embeddings))
+        return valid_texts, valid_embeddings, valid_metadatas
 
-    def create_vector_store(self, texts: List, embeddings: List):
+    def create_vector_store(self, texts: List, embeddings: List, metadatas: Optional[List[dict]] = None):
         """Create FAISS vector store"""
-        print("🗃️ Creating vector store...")
+        logger.debug("🗃️ Creating vector store...")
 
-        text_embedding_pairs = list(zip(texts, embeddings))
-        self.vector_store = FAISS.from_embeddings(
-            text_embeddings=text_embedding_pairs,
-            embedding=self.embedding_model
-        )
+        from langchain_community.vectorstores import FAISS
 
-        print("✅ Vector store created successfully")
+        text_embedding_pairs = list(zip(texts, embeddings))
+        with span("index"):
+            vector_store = FAISS.from_embeddings(
+                text_embeddings=text_embedding_pairs,
+                embedding=self.embedding_model,
+                metadatas=metadatas
+            )
+        with self._index_lock:
+            self.vector_store = vector_store
+            self.lexical_index = None
+            self.chapter_index = None
+
+        logger.debug("✅ Vector store created successfully")
+
+    def get_lexical_index(self) -> Optional[BM25Index]:
+        """BM25 index over the indexed chunks, rebuilt after the vector store changes"""
+        with self._index_lock:
+            if self.lexical_index is None and self.vector_store is not None:
+                doc_ids = list(self.vector_store.index_to_docstore_id.values())
+                docstore = self.vector_store.docstore
+                with span("bm25_build"):
+                    self.lexical_index = BM25Index(
+                        [docstore.search(doc_id).page_content for doc_id in doc_ids], doc_ids)
+            return self.lexical_index
+
+    def get_chapter_index(self) -> Optional[ChapterIndex]:
+        """Topical chapters of the indexed chunks, rebuilt after the vector store changes
+
+        Built once the video is fully indexed (None before that, and for
+        direct-context videos); the chapter titles become the video's
+        topics_discussed.
+        """
+        if not self.is_fully_indexed:
+            return None
+        with self._index_lock:
+            if self.chapter_index is None and self.vector_store is not None:
+                import numpy as np
+
+                docstore = self.vector_store.docstore
+                docs = {position: docstore.search(doc_id) for position, doc_id
+                        in self.vector_store.index_to_docstore_id.items()}
+                # Reindexed chunks are appended, so index order is not time order
+                positions = sorted(docs, key=lambda position: (
+                    docs[position].metadata.get('start_time', 0), position))
+                with span("chapters"):
+                    vectors = self.vector_store.index.reconstruct_batch(
+                        np.asarray(positions, dtype=np.int64))
+                    self.chapter_index = ChapterIndex.build(
+                        vectors,
+                        [docs[position].page_content for position in positions],
+                        [docs[position].metadata.get('start_time', 0) for position in positions],
+                        [docs[position].metadata.get('end_time', 0) for position in positions],
+                        min_chunks=self.config.CHAPTER_MIN_CHUNKS,
+                        window=self.config.CHAPTER_WINDOW,
+                        cutoff=self.config.CHAPTER_CUTOFF,
+                        max_chapters=self.config.CHAPTER_MAX_CHAPTERS,
+                    )
+                if self.current_video_id in self.video_analytics:
+                    self.video_analytics[self.current_video_id]["topics_discussed"] = list(
+                        self.chapter_index.titles)
+                logger.debug("📚 Split video into %d chapters", len(self.chapter_index),
+                             extra={"video_id": self.current_video_id})
+            return self.chapter_index
+
+    def get_chapters(self) -> List[dict]:
+        """Chapters of the current video in time order, with formatted time ranges"""
+        chapter_index = self.get_chapter_index()
+        if chapter_index is None:
+            return []
+        return [{**chapter, "formatted": self._format_time_range(
+                    chapter["start_time"], chapter["end_time"])}
+                for chapter in chapter_index.chapters()]
+
+    def navigate(self, question: str, query: Optional[str] = None) -> Optional[List[dict]]:
+        """Chapters answering a "where does it talk about X" question, best first
+
+        The question (or query, e.g. a rewritten follow-up) is embedded and
+        compared with every chapter centroid in one product. Returns None,
+        meaning "answer with RAG instead", for other kinds of questions,
+        videos without chapters, or when no chapter reaches CHAPTER_MIN_SCORE.
+        """
+        if not (self.config.CHAPTER_NAVIGATION and is_navigation_query(question)):
+            return None
+        chapter_index = self.get_chapter_index()
+        if chapter_index is None or not len(chapter_index):
+            return None
+
+        with span("navigate"):
+            query_embedding = self.embedder.embed_queries([query or question])[0]
+            hits = chapter_index.search(query_embedding, k=self.config.CHAPTER_NAVIGATION_K,
+                                        min_score=self.config.CHAPTER_MIN_SCORE)
+        if not hits:
+            return None
+
+        incr("navigation_answers_total")
+        _note_question_stats(query_type="navigation", k=len(hits), prompt_tokens=0, answer_tokens=0)
+        chapters = chapter_index.chapters()
+        return [{**chapters[i], "score": round(score, 4),
+                 "formatted": self._format_time_range(chapters[i]["start_time"], chapters[i]["end_time"])}
+                for i, score in hits]
+
+    @staticmethod
+    def _navigation_answer(chapters: List[dict]) -> str:
+        lines = [f"• {chapter['formatted']}: {chapter['title']}" for chapter in chapters]
+        return "📍 This is covered in these parts of the video:\n" + "\n".join(lines)
+
+    @staticmethod
+    def _format_time_range(start: float, end: float) -> str:
+        start_min, start_sec = divmod(int(start), 60)
+        end_min, end_sec = divmod(int(end), 60)
+        return f"{start_min:02d}:{start_sec:02d} - {end_min:02d}:{end_sec:02d}"
+
+    def _retrieve(self, question: str) -> List:
+        """Retrieve the chunks most relevant to a question (see _retrieve_many)"""
+        return self._retrieve_many([question])[0]
+
+    def _retrieve_many(self, questions: List[str]) -> List[List]:
+        """Retrieve the chunks most relevant to each question.
+
+        With hybrid retrieval, BM25 keyword matches and vector matches are
+        merged by reciprocal rank fusion, so exact names, numbers and jargon
+        are found even when the embedding misses them. Small videos with
+        enough keyword matches skip the query embedding entirely.
+
+        With adaptive retrieval, k depends on the kind of question (factual
+        lookups get a couple of chunks, summaries many) and, except for
+        summaries, stops early where the candidates' similarity to the
+        question drops off.
+
+        With RETRIEVAL_SEARCH_TYPE="mmr" the final k are picked from the
+        candidates by maximal marginal relevance (optionally penalizing chunks
+        close in time to earlier picks), so one retrieval covers more of the
+        video instead of several near-identical chunks.
+
+        All questions are embedded in one request and searched with one FAISS
+        call. The queries are embedded outside the index lock so that
+        background indexing only blocks the (fast) searches themselves.
+        """
+        plans = [self._retrieval_k(question) for question in questions]
+        results: List[Optional[List]] = [None] * len(questions)
+        with span("retrieve"):
+            if self.direct_context is not None:
+                for i, (question, (query_type, max_k)) in enumerate(zip(questions, plans)):
+                    _note_question_stats(query_type=query_type, k=1)
+                    results[i] = [self._direct_context_document(question, max_k)]
+                return results
+
+            fetch_k = max([self.config.HYBRID_FETCH_K] + [max_k for _, max_k in plans])
+            lexical_hits = [[] for _ in questions]
+            if self.config.HYBRID_RETRIEVAL:
+                lexical_index = self.get_lexical_index()
+                for i, (question, (query_type, max_k)) in enumerate(zip(questions, plans)):
+                    lexical_hits[i] = lexical_index.search(question, fetch_k)
+                    if (len(lexical_index) <= self.config.LEXICAL_ONLY_MAX_CHUNKS
+                            and len(lexical_hits[i]) >= min(max_k, len(lexical_index))):
+                        incr("lexical_only_retrievals_total")
+                        results[i] = self._lexical_only_documents(lexical_hits[i], query_type, max_k)
+
+            pending = [i for i, result in enumerate(results) if result is None]
+            if pending:
+                query_embeddings = self.embedder.embed_queries([questions[i] for i in pending])
+                vector_ids = self._vector_search_ids(query_embeddings, fetch_k)
+                for i, query_embedding, ids in zip(pending, query_embeddings, vector_ids):
+                    query_type, max_k = plans[i]
+                    results[i] = self._rank_candidates(query_embedding, ids, lexical_hits[i],
+                                                       query_type, max_k, fetch_k)
+            return results
+
+    def _lexical_only_documents(self, lexical_hits: List[tuple], query_type: str, max_k: int) -> List:
+        """The best keyword matches, without a query embedding"""
+        k = max_k
+        if self.config.ADAPTIVE_RETRIEVAL and query_type != SUMMARY_QUERY:
+            # BM25 scores have no fixed scale; only the ratio applies
+            k = score_cutoff([score for _, score in lexical_hits], max_k,
+                             self.config.RETRIEVAL_MIN_K,
+                             min_ratio=self.config.RETRIEVAL_MIN_SCORE_RATIO)
+        _note_question_stats(query_type=query_type, k=k)
+        return self._get_documents([doc_id for doc_id, _ in lexical_hits[:k]])
+
+    def _rank_candidates(self, query_embedding: List[float], vector_ids: List[str],
+                         lexical_hits: List[tuple], query_type: str, max_k: int,
+                         fetch_k: int) -> List:
+        """Fuse, cut off and diversify one question's candidates"""
+        if self.config.HYBRID_RETRIEVAL:
+            candidates = reciprocal_rank_fusion(
+                [vector_ids, [doc_id for doc_id, _ in lexical_hits]], k=self.config.RRF_K)
+            candidates = candidates[:fetch_k]
+        else:
+            candidates = [(doc_id, None) for doc_id in vector_ids]
+
+        use_mmr = self.config.RETRIEVAL_SEARCH_TYPE == "mmr" and len(candidates) > max_k
+        k = max_k
+        if candidates and (use_mmr or self.config.ADAPTIVE_RETRIEVAL):
+            candidates, vectors, start_times = self._candidate_vectors(candidates)
+            similarity = self._cosine_similarity(query_embedding, vectors)
+            # Summaries need coverage, not the chunks closest to the question
+            if self.config.ADAPTIVE_RETRIEVAL and query_type != SUMMARY_QUERY:
+                k = score_cutoff(similarity, max_k, self.config.RETRIEVAL_MIN_K,
+                                 min_ratio=self.config.RETRIEVAL_MIN_SCORE_RATIO,
+                                 max_gap=self.config.RETRIEVAL_MAX_SCORE_GAP)
+        _note_question_stats(query_type=query_type, k=k)
+
+        if use_mmr and len(candidates) > k:
+            ranked_ids = self._mmr_rerank(candidates, vectors, similarity, start_times, k)
+        else:
+            ranked_ids = [doc_id for doc_id, _ in candidates[:k]]
+        return self._get_documents(ranked_ids)
+
+    def _retrieval_k(self, question: str) -> tuple:
+        """(query type, most chunks to retrieve) for a question"""
+        if not self.config.ADAPTIVE_RETRIEVAL:
+            return GENERAL_QUERY, self.config.RETRIEVAL_K
+        query_type = classify_query(question)
+        if query_type == FACTUAL_QUERY:
+            return query_type, self.config.RETRIEVAL_K_FACTUAL
+        if query_type == SUMMARY_QUERY:
+            return query_type, self.config.RETRIEVAL_K_SUMMARY
+        return query_type, self.config.RETRIEVAL_K
+
+    def _get_documents(self, ranked_ids: List[str]) -> List:
+        """Documents for docstore ids, skipping ids removed meanwhile"""
+        with self._index_lock:
+            docstore = self.vector_store.docstore
+            return [docstore.search(doc_id) for doc_id in ranked_ids
+                    if doc_id in docstore._dict]
+
+    def _candidate_vectors(self, candidates: List[tuple]) -> tuple:
+        """(candidates still indexed, their vectors, their start times)"""
+        import numpy as np
+
+        with self._index_lock:
+            positions = {doc_id: position for position, doc_id
+                         in self.vector_store.index_to_docstore_id.items()}
+            candidates = [(doc_id, score) for doc_id, score in candidates if doc_id in positions]
+            vectors = self.vector_store.index.reconstruct_batch(
+                np.asarray([positions[doc_id] for doc_id, _ in candidates], dtype=np.int64))
+            docstore = self.vector_store.docstore
+            start_times = [docstore.search(doc_id).metadata.get('start_time', 0)
+                           for doc_id, _ in candidates]
+        return candidates, vectors, start_times
+
+    @staticmethod
+    def _cosine_similarity(query_embedding: List[float], vectors):
+        """Cosine similarity of each row of vectors to the query"""
+        import numpy as np
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, len(query))
+        norms = np.linalg.norm(vectors, axis=1) * (np.linalg.norm(query) or 1.0)
+        return vectors @ query / np.where(norms == 0, 1.0, norms)
+
+    def _mmr_rerank(self, candidates: List[tuple], vectors, similarity, start_times: List[float],
+                    k: int) -> List[str]:
+        """Pick k of the (doc_id, fused score or None) candidates by MMR"""
+        import numpy as np
+
+        with span("mmr"):
+            if candidates and candidates[0][1] is not None:
+                # Fused rank scores, scaled so the best candidate is 1
+                scores = np.asarray([score for _, score in candidates], dtype=np.float32)
+                relevance = scores / scores.max()
+            else:
+                relevance = similarity
+
+            picks = mmr_select(relevance, vectors, k, lambda_mult=self.config.MMR_LAMBDA,
+                               start_times=start_times,
+                               time_penalty=self.config.TIME_DIVERSITY_PENALTY,
+                               time_scale=self.config.TIME_DIVERSITY_SCALE)
+            return [candidates[pick][0] for pick in picks]
+
+    def _direct_context_document(self, question: str, k: int):
+        """The whole transcript as one document, with timestamps of the k
+        caption segments that best match the question (found by keywords)"""
+        from langchain_core.documents import Document
+
+        with self._index_lock:
+            if self._segment_index is None:
+                self._segment_index = BM25Index(self.raw_transcript_data.texts())
+            segment_index = self._segment_index
+        matches = sorted(position for position, _ in segment_index.search(question, k))
+        segments = [self.raw_transcript_data[position] for position in matches]
+        return Document(page_content=self.direct_context, metadata={
+            'timestamps': [{'start': item.start, 'end': item.start + item.duration,
+                            'text_segment': item.text} for item in segments],
+            'start_time': segments[0].start if segments else 0,
+            'end_time': segments[-1].start + segments[-1].duration if segments else 0,
+        })
+
+    def _vector_search_ids(self, query_embeddings: List[List[float]], k: int) -> List[List[str]]:
+        """Docstore ids of the k nearest chunks to each query, best first"""
+        import numpy as np
+
+        with self._index_lock:
+            index = self.vector_store.index
+            if not index.ntotal:
+                return [[] for _ in query_embeddings]
+            _, positions = index.search(
+                np.asarray(query_embeddings, dtype=np.float32), min(k, index.ntotal))
+            index_to_docstore_id = self.vector_store.index_to_docstore_id
+            return [[index_to_docstore_id[position] for position in row if position != -1]
+                    for row in positions]
+
+    def _generate(self, prompt: dict):
+        """Call the LLM (timed as its own stage) with the prompt's "prefix" and
+        "suffix"; the prompt cache decides whether the prefix is sent again"""
+        prefix, suffix = prompt["prefix"].to_string(), prompt["suffix"].to_string()
+        with span("llm"):
+            message = self.prompt_cache.generate(self.llm, prefix, suffix)
+
+        # Billed counts when the model reports them, estimates otherwise
+        usage = getattr(message, "usage_metadata", None) or {}
+        _note_question_stats(
+            prompt_tokens=usage.get("input_tokens") or count_tokens(prefix + suffix),
+            answer_tokens=usage.get("output_tokens") or count_tokens(str(getattr(message, "content", message))))
+        return message
+
+    @contextlib.contextmanager
+    def _track_question(self, question: str):
+        """Log latency, k and token usage of answering one question"""
+        stats = {}
+        token = _question_stats.set(stats)
+        started_at = time.perf_counter()
+        try:
+            yield stats
+        finally:
+            _question_stats.reset(token)
+            latency_ms = (time.perf_counter() - started_at) * 1000
+            incr("question_prompt_tokens_total", stats.get("prompt_tokens", 0))
+            incr("question_answer_tokens_total", stats.get("answer_tokens", 0))
+            logger.info("💬 Answered %s question with %s chunks: %s prompt + %s answer tokens in %.0fms",
+                        stats.get("query_type", "unknown"), stats.get("k", "?"),
+                        stats.get("prompt_tokens", "?"), stats.get("answer_tokens", "?"), latency_ms,
+                        extra={"video_id": self.current_video_id, "latency_ms": round(latency_ms, 1),
+                               "question_chars": len(question), **stats})
 
     def setup_rag_chain(self):
         """Set up the complete RAG chain"""
-        print("⛓️ Setting up RAG chain...")
+        from langchain_core.output_parsers import StrOutputParser
+        from langchain_core.prompts import PromptTemplate
+        from langchain_core.runnables import RunnableParallel, RunnablePassthrough, RunnableLambda
 
-        # Create retriever
-        retriever = self.vector_store.as_retriever(
-            search_type="similarity",
-            search_kwargs={"k": self.config.RETRIEVAL_K}
-        )
+        logger.debug("⛓️ Setting up RAG chain...")
+
+        # Create retriever (reads the live index, so it also sees chunks
+        # added by continue_indexing())
+        retriever = RunnableLambda(self._retrieve)
 
-        # Create prompt template
-        prompt = PromptTemplate(
-            template="""
-                                                You are an intelligent and articulate assistant who has watched the entire video and internalized its content. Based on that, answer the following user question in your own words, with clarity, precision, and relevance.
+        # Prompt templates: a stable prefix (instructions, then the retrieved
+        # context) that a provider-side prompt cache can reuse across
+        # questions, and a suffix with everything that changes per question.
+        # Dedented: indentation would be sent (and billed) with every question
+        prompt_prefix = PromptTemplate(
+            template=textwrap.dedent("""
+                You are an intelligent and articulate assistant who has watched the entire video and internalized its content. Based on that, answer the following user question in your own words, with clarity, precision, and relevance.
 
                 📌 OBJECTIVE:
                 Your goal is to provide clear, helpful, and engaging answers grounded in the video content — as if you’re summarizing or explaining it to a curious learner.
@@ -474,13 +1321,17 @@ class YouTubeRAGChatbot:
                 --- VIDEO TRANSCRIPT START ---
                 {context}
                 --- VIDEO TRANSCRIPT END ---
-
-                ❓ USER QUESTION:
+            """).strip() + "\n\n",
+            input_variables=["context"]
+        )
+        prompt_suffix = PromptTemplate(
+            template=textwrap.dedent("""
+                {history}❓ USER QUESTION:
                 {question}
 
                 💬 YOUR ANSWER:
-            """.strip(),
-            input_variables=["context", "question"]
+            """).strip(),
+            input_variables=["history", "question"]
         )
 
         # Format documents function
@@ -488,8 +1339,22 @@ class YouTubeRAGChatbot:
         def format_docs(docs):
             if not docs:
                 return "No relevant context found."
-
-            return "\n\n".join(doc.page_content for doc in docs)
+            if self.direct_context is not None:
+                return "\n\n".join(doc.page_content for doc in docs)
+
+            # Merge overlapping chunks and keep the context within its token
+            # budget, which scales with k under adaptive retrieval
+            budget = self.config.CONTEXT_MAX_TOKENS
+            if self.config.ADAPTIVE_RETRIEVAL and self.config.RETRIEVAL_K:
+                budget = -(-budget * len(docs) // self.config.RETRIEVAL_K)
+            context, stats = pack_context(docs, budget)
+            _note_question_stats(context_tokens=stats["tokens_after"])
+            incr("context_tokens_total", stats["tokens_after"])
+            incr("context_tokens_saved_total", stats["tokens_saved"])
+            logger.debug("📦 Packed %d chunks into %d spans: %d tokens (%d saved)",
+                         stats["chunks"], stats["spans"], stats["tokens_after"],
+                         stats["tokens_saved"], extra={"video_id": self.current_video_id})
+            return context
 
         # Enhanced format documents function with timestamps
         def format_docs_with_timestamps(docs):
@@ -536,20 +1401,72 @@ class YouTubeRAGChatbot:
             return context, timestamps_formatted
 
         # Create the complete RAG chain
-        self.rag_chain = (
+        # Answer from already retrieved documents: {"docs", "question", "history"}
+        self.answer_chain = (
             RunnableParallel({
-                'context': retriever | RunnableLambda(format_docs),
-                'question': RunnablePassthrough()
+                'prefix': {'context': itemgetter('docs') | RunnableLambda(format_docs)} | prompt_prefix,
+                'suffix': prompt_suffix,
             })
-            | prompt
-            | self.llm
+            | RunnableLambda(self._generate)
             | StrOutputParser()
         )
 
-        print("✅ RAG chain ready for questions!")
+        # Input: {"question", "retrieval_query", "history"} (see _chain_inputs)
+        self.rag_chain = (
+            RunnablePassthrough.assign(docs=itemgetter('retrieval_query') | retriever)
+            | self.answer_chain
+        )
+
+        logger.debug("✅ RAG chain ready for questions!")
+
+    def _chain_inputs(self, question: str, history: str = "") -> dict:
+        """RAG chain input for a question and the conversation so far"""
+        return {
+            "question": question,
+            "retrieval_query": self.rewrite_question(question, history),
+            "history": f"🗨️ CONVERSATION SO FAR:\n{history}\n\n" if history else "",
+        }
+
+    def rewrite_question(self, question: str, history: str) -> str:
+        """Standalone version of a follow-up question, used for retrieval.
+
+        Only questions that look like they refer back to the conversation
+        ("explain the second point more") are rewritten, with one short LLM
+        call; others are returned unchanged.
+        """
+        if not (history and self.config.QUERY_REWRITE and is_follow_up(question)):
+            return question
 
-    def ask(self, question: str) -> str:
-        """Ask a question about the processed video with analytics tracking"""
+        incr("query_rewrites_total")
+        try:
+            with span("query_rewrite"):
+                message = llm_retry(self.llm.invoke, QUERY_REWRITE_PROMPT.format(
+                    history=history, question=question))
+            rewritten = str(getattr(message, "content", message)).strip().strip('"')
+        except Exception as e:
+            logger.warning("⚠️ Query rewrite failed: %s", e, extra={"video_id": self.current_video_id})
+            rewritten = ""
+        if not rewritten:
+            # Searching with the previous question as well still finds its topic
+            previous = [line[len("User: "):] for line in history.splitlines() if line.startswith("User: ")]
+            rewritten = f"{previous[-1]} {question}" if previous else question
+        logger.debug("✏️ Rewrote follow-up question for retrieval: %r -> %r", question, rewritten,
+                     extra={"video_id": self.current_video_id})
+        return rewritten
+
+    def summarize_conversation(self, summary: str, turns: List[tuple]) -> str:
+        """Fold (question, answer) turns into a conversation summary with the LLM"""
+        with span("conversation_summary"):
+            message = llm_retry(self.llm.invoke, CONVERSATION_SUMMARY_PROMPT.format(
+                summary=summary or "(none)", turns=format_turns(turns)))
+        return str(getattr(message, "content", message)).strip()
+
+    def ask(self, question: str, history: str = "") -> str:
+        """Ask a question about the processed video with analytics tracking
+
+        history is the conversation so far (ConversationStore.get_history);
+        it is shown to the LLM and used to rewrite follow-up questions.
+        """
         if not self.rag_chain:
             raise ValueError(
                 "No video has been processed yet. Call process_video() first.")
@@ -559,63 +1476,126 @@ class YouTubeRAGChatbot:
             if self.current_video_id and self.current_video_id in self.video_analytics:
                 self.video_analytics[self.current_video_id]["questions_asked"] += 1
 
-            answer = self.rag_chain.invoke(question)
+            with self._track_question(question):
+                inputs = self._chain_inputs(question, history)
+                chapters = self.navigate(question, inputs["retrieval_query"])
+                if chapters:
+                    return self._navigation_answer(chapters)
+                answer = self.rag_chain.invoke(inputs)
             return answer.strip()
         except Exception as e:
             return f"Error generating answer: {e}"
 
-    def ask_with_timestamps(self, question: str) -> dict:
-        """Ask a question and return both answer and timestamp information"""
+    def ask_batch(self, questions: List[str], max_concurrency: Optional[int] = None) -> List[str]:
+        """Answer several questions about the processed video at once
+
+        Retrieval is shared: all questions are embedded in one request and
+        searched with one FAISS call. The LLM calls then go through the
+        answer chain's batch() with at most max_concurrency in flight
+        (default Config.BATCH_MAX_CONCURRENCY). A failed question gets an
+        error answer without failing the others.
+        """
         if not self.rag_chain:
             raise ValueError(
                 "No video has been processed yet. Call process_video() first.")
+        if not questions:
+            return []
+
+        if self.current_video_id and self.current_video_id in self.video_analytics:
+            self.video_analytics[self.current_video_id]["questions_asked"] += len(questions)
 
         try:
-            # Track question analytics
-            if self.current_video_id and self.current_video_id in self.video_analytics:
-                self.video_analytics[self.current_video_id]["questions_asked"] += 1
+            answers = self._answer_many(questions, max_concurrency)
+        except Exception as e:
+            return [f"Error generating answer: {e}"] * len(questions)
+        return [f"Error generating answer: {answer}" if isinstance(answer, Exception)
+                else answer for answer in answers]
 
-            # Get relevant documents first
-            retriever = self.vector_store.as_retriever(
-                search_type="similarity",
-                search_kwargs={"k": self.config.RETRIEVAL_K}
-            )
+    def _answer_many(self, questions: List[str], max_concurrency: Optional[int] = None) -> List:
+        """Answers (or the exceptions raised) for ask_batch(), without analytics"""
+        retrieved = self._retrieve_many(questions)
 
-            relevant_docs = retriever.invoke(question)
+        from langchain_core.runnables import RunnableLambda
 
-            # Extract timestamps from relevant documents
-            all_timestamps = []
-            for doc in relevant_docs:
-                if hasattr(doc, 'metadata') and 'timestamps' in doc.metadata:
-                    doc_timestamps = doc.metadata['timestamps']
-                    all_timestamps.extend(doc_timestamps)
+        answers = RunnableLambda(self._answer_tracked).batch(
+            [{"question": question, "history": "", "docs": docs}
+             for question, docs in zip(questions, retrieved)],
+            config={"max_concurrency": max_concurrency or self.config.BATCH_MAX_CONCURRENCY},
+            return_exceptions=True,
+        )
+        return [answer if isinstance(answer, Exception) else answer.strip()
+                for answer in answers]
 
-            # Format timestamps
-            formatted_timestamps = []
-            if all_timestamps:
-                # Remove duplicates and sort by start time
-                unique_timestamps = {}
-                for ts in all_timestamps:
-                    key = (ts['start'], ts['end'])
-                    if key not in unique_timestamps:
-                        unique_timestamps[key] = ts
+    def _answer_tracked(self, inputs: dict) -> str:
+        """Answer one batched question from its documents, logged like ask()"""
+        with self._track_question(inputs["question"]):
+            _note_question_stats(query_type=self._retrieval_k(inputs["question"])[0],
+                                 k=len(inputs["docs"]))
+            return self.answer_chain.invoke(inputs)
 
-                sorted_timestamps = sorted(
-                    unique_timestamps.values(), key=lambda x: x['start'])
+    def ask_with_timestamps(self, question: str, history: str = "") -> dict:
+        """Ask a question and return both answer and timestamp information"""
+        if not self.rag_chain:
+            raise ValueError(
+                "No video has been processed yet. Call process_video() first.")
 
-                # Create clickable timestamp links
-                for ts in sorted_timestamps:
-                    start_min, start_sec = divmod(int(ts['start']), 60)
-                    end_min, end_sec = divmod(int(ts['end']), 60)
-                    formatted_timestamps.append({
-                        'start_time': ts['start'],
-                        'end_time': ts['end'],
-                        'formatted': f"{start_min:02d}:{start_sec:02d} - {end_min:02d}:{end_sec:02d}",
-                        'text_segment': ts.get('text_segment', '')
-                    })
+        try:
+            # Track question analytics
+            if self.current_video_id and self.current_video_id in self.video_analytics:
+                self.video_analytics[self.current_video_id]["questions_asked"] += 1
 
-            # Get the regular answer
-            answer = self.rag_chain.invoke(question)
+            with self._track_question(question):
+                inputs = self._chain_inputs(question, history)
+
+                # "Where does it talk about X" resolves to chapters without the LLM
+                chapters = self.navigate(question, inputs["retrieval_query"])
+                if chapters:
+                    return {
+                        'answer': self._navigation_answer(chapters),
+                        'timestamps': [{
+                            'start_time': chapter['start_time'],
+                            'end_time': chapter['end_time'],
+                            'formatted': chapter['formatted'],
+                            'text_segment': chapter['title'],
+                        } for chapter in chapters],
+                        'video_id': self.current_video_id,
+                        'question': question
+                    }
+
+                # Get relevant documents first
+                relevant_docs = self._retrieve(inputs["retrieval_query"])
+
+                # Extract timestamps from relevant documents
+                all_timestamps = []
+                for doc in relevant_docs:
+                    if hasattr(doc, 'metadata') and 'timestamps' in doc.metadata:
+                        doc_timestamps = doc.metadata['timestamps']
+                        all_timestamps.extend(doc_timestamps)
+
+                # Format timestamps
+                formatted_timestamps = []
+                if all_timestamps:
+                    # Remove duplicates and sort by start time
+                    unique_timestamps = {}
+                    for ts in all_timestamps:
+                        key = (ts['start'], ts['end'])
+                        if key not in unique_timestamps:
+                            unique_timestamps[key] = ts
+
+                    sorted_timestamps = sorted(
+                        unique_timestamps.values(), key=lambda x: x['start'])
+
+                    # Create clickable timestamp links
+                    for ts in sorted_timestamps:
+                        formatted_timestamps.append({
+                            'start_time': ts['start'],
+                            'end_time': ts['end'],
+                            'formatted': self._format_time_range(ts['start'], ts['end']),
+                            'text_segment': ts.get('text_segment', '')
+                        })
+
+                # Answer from the same documents
+                answer = self.answer_chain.invoke({**inputs, "docs": relevant_docs})
 
             return {
                 'answer': answer.strip(),
@@ -632,6 +1612,124 @@ class YouTubeRAGChatbot:
                 'question': question
             }
 
+    def save(self, directory: str):
+        """Persist the vector index and per-video state to a directory"""
+        if self.direct_context is not None:
+            # Nothing is indexed; the transcript travels in the state file
+            os.makedirs(directory, exist_ok=True)
+            self.save_state(directory)
+            return
+        if self.vector_store is None:
+            raise ValueError("No video has been processed yet. Call process_video() first.")
+
+        import numpy as np
+
+        os.makedirs(directory, exist_ok=True)
+        lexical_index = self.get_lexical_index()
+        with self._index_lock:
+            self.vector_store.save_local(directory)
+        np.savez(os.path.join(directory, "bm25.npz"), **lexical_index.to_arrays())
+        chapter_index = self.get_chapter_index()
+        if chapter_index is not None:
+            np.savez(os.path.join(directory, "chapters.npz"), **chapter_index.to_arrays())
+        self.save_state(directory)
+
+    def save_state(self, directory: str):
+        """Persist only the per-video state (metadata, analytics, transcript, artifacts)"""
+        state = {
+            "current_video_id": self.current_video_id,
+            "processed_videos": self.processed_videos,
+            "video_analytics": self.video_analytics,
+            "index_status": dict(self.index_status),
+            "pending_chunks": list(self._pending_chunks or self._resume_chunks),
+            "direct_context": self.direct_context,
+            "artifacts": self.artifacts,
+        }
+        # The segments go next to the state as arrays that load() memory-maps
+        self.raw_transcript_data.save(directory)
+        # Write then rename so readers in other workers never see a partial file
+        tmp_path = os.path.join(directory, f"state.pkl.{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            pickle.dump(state, f)
+        os.replace(tmp_path, os.path.join(directory, "state.pkl"))
+
+    @classmethod
+    def load(cls, directory: str, config: Config = None, clients: ClientPool = None,
+             mmap: bool = True):
+        """Restore a chatbot previously persisted with save().
+
+        With mmap=True the FAISS index and the transcript arrays are
+        memory-mapped read-only, so worker processes serving the same video
+        share one copy in the page cache.
+        """
+        chatbot = cls(config, clients=clients)
+
+        with open(os.path.join(directory, "state.pkl"), "rb") as f:
+            state = pickle.load(f)
+
+        chatbot.current_video_id = state["current_video_id"]
+        chatbot.processed_videos = state["processed_videos"]
+        chatbot.video_analytics = state["video_analytics"]
+        chatbot.index_status = state["index_status"]
+        # Only indexed again if this worker resumes the video (see continue_indexing)
+        chatbot._resume_chunks = state.get("pending_chunks", [])
+        if "raw_transcript_data" in state:
+            # Saved as a list of segment dicts before transcripts were stored compactly
+            chatbot.raw_transcript_data = CompactTranscript.from_segments(state["raw_transcript_data"])
+        else:
+            chatbot.raw_transcript_data = CompactTranscript.load(directory, mmap=mmap)
+        chatbot.direct_context = state.get("direct_context")
+        chatbot.artifacts = state.get("artifacts")
+        if chatbot.direct_context is not None:
+            chatbot.setup_rag_chain()
+            return chatbot
+
+        import faiss
+        from langchain_community.vectorstores import FAISS
+
+        io_flags = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY if mmap else 0
+        index = faiss.read_index(os.path.join(directory, "index.faiss"), io_flags)
+        with open(os.path.join(directory, "index.pkl"), "rb") as f:
+            # Only files written by save() are loaded
+            docstore, index_to_docstore_id = pickle.load(f)
+
+        chatbot.vector_store = FAISS(
+            chatbot.embedding_model, index, docstore, index_to_docstore_id)
+        chatbot._index_read_only = mmap
+        bm25_path = os.path.join(directory, "bm25.npz")
+        if os.path.exists(bm25_path):
+            # Saved before this change otherwise; rebuilt on first use
+            import numpy as np
+            with np.load(bm25_path) as arrays:
+                chatbot.lexical_index = BM25Index.from_arrays(arrays)
+        chapters_path = os.path.join(directory, "chapters.npz")
+        if os.path.exists(chapters_path):
+            # Missing for partial indexes and older saves; built on first use
+            import numpy as np
+            with np.load(chapters_path) as arrays:
+                chatbot.chapter_index = ChapterIndex.from_arrays(arrays)
+        chatbot.setup_rag_chain()
+        return chatbot
+
+    def estimate_memory_bytes(self) -> int:
+        """Rough size of the index, chunk texts and raw transcript held in memory"""
+        total = 0
+        with self._index_lock:
+            if self.vector_store is not None:
+                index = self.vector_store.index
+                total += index.ntotal * index.d * 4  # float32 vectors
+                for doc in self.vector_store.docstore._dict.values():
+                    total += len(doc.page_content) + \
+                        len(doc.metadata.get('timestamps', ())) * 200
+            if self.lexical_index is not None:
+                total += (self.lexical_index.postings.nbytes + self.lexical_index.weights.nbytes
+                          + self.lexical_index.indptr.nbytes)
+            if self.chapter_index is not None:
+                total += self.chapter_index.nbytes()
+        total += self.raw_transcript_data.nbytes
+        total += len(self.direct_context or "")
+        return total
+
     def get_youtube_timestamp_url(self, video_id: str, start_time: float) -> str:
         """Generate YouTube URL with timestamp"""
         return f"https://www.youtube.com/watch?v={video_id}&t={int(start_time)}s"
@@ -655,113 +1753,180 @@ class YouTubeRAGChatbot:
             return answer + "\n\n🕒 **Source Timestamps:** No specific timestamps available."
 
     def batch_questions(self, questions: List[str]) -> List[tuple]:
-        """Ask multiple questions and return results"""
-        results = []
-        for question in questions:
-            answer = self.ask(question)
-            results.append((question, answer))
-        return results
-        """Ask multiple questions and return results"""
-        results = []
-        for question in questions:
-            answer = self.ask(question)
-            results.append((question, answer))
-        return results
+        """Ask multiple questions and return (question, answer) pairs"""
+        return list(zip(questions, self.ask_batch(questions)))
 
     # ==================== ENHANCED FEATURES ====================
 
+    def index_version(self) -> Optional[str]:
+        """Fingerprint of the current video's indexed content
+
+        Changes whenever the transcript (or its language) changes, e.g. after
+        reindex(); precomputed artifacts are valid for one index version.
+        """
+        if self.current_video_id is None:
+            return None
+        video_info = self.processed_videos.get(self.current_video_id, {})
+        digest = hashlib.sha1(
+            f"{ARTIFACTS_FORMAT}|{self.current_video_id}|{video_info.get('language_code')}|"
+            f"{video_info.get('translated')}".encode("utf-8"))
+        transcript = self.raw_transcript_data
+        digest.update(transcript.buffer[transcript.offsets[0, 0]:transcript.offsets[-1, 0]])
+        digest.update(transcript.offsets - transcript.offsets[0])
+        return digest.hexdigest()[:16]
+
+    def get_artifacts(self, allow_stale: bool = False) -> Optional[dict]:
+        """Precomputed summary and sentiment of the current video
+
+        Returns None when none were computed, or when they were computed for
+        an older index version and allow_stale is False. The result carries
+        the index_version it was computed for, computed_at and a stale flag.
+        """
+        artifacts = self.artifacts
+        if artifacts is None:
+            return None
+        stale = artifacts["index_version"] != self.index_version()
+        if stale and not allow_stale:
+            return None
+        return {**artifacts, "stale": stale}
+
+    def precompute_artifacts(self, force: bool = False) -> dict:
+        """Compute the summary and sentiment for the current index version
+
+        Runs once per index version: returns the stored artifacts if they are
+        current, unless force is set. The summary questions are answered
+        concurrently and are not counted as user questions. Nothing is stored
+        when a summary question fails, so a later call retries.
+        """
+        if not self.rag_chain:
+            raise ValueError("No video has been processed yet. Call process_video() first.")
+        if not self.is_fully_indexed:
+            raise ValueError("Video is still being indexed; precompute once it is ready")
+
+        with self._artifacts_lock:
+            version = self.index_version()
+            if not force and self.artifacts and self.artifacts["index_version"] == version:
+                return self.get_artifacts()
+
+            started_at = time.perf_counter()
+            with span("artifacts"):
+                sentiment = self._compute_sentiment(self.get_video_transcript(self.current_video_id))
+                summary = self._compute_structured_summary()
+            if "error" in summary:
+                raise ValueError(summary["error"])
+
+            self.artifacts = {
+                "index_version": version,
+                "computed_at": time.time(),
+                "sentiment": sentiment,
+                "summary": summary,
+            }
+        incr("artifacts_computed_total")
+        logger.info("🧾 Precomputed summary and sentiment in %.0fms",
+                    (time.perf_counter() - started_at) * 1000,
+                    extra={"video_id": self.current_video_id, "index_version": version})
+        return self.get_artifacts()
+
     def analyze_video_sentiment(self, video_id: str = None) -> dict:
-        """Analyze overall sentiment and emotional tone of video"""
+        """Analyze overall sentiment and emotional tone of video
+
+        Served from the precomputed artifacts when they match the index.
+        """
         if not video_id:
             video_id = self.current_video_id
 
         if not video_id or video_id not in self.processed_videos:
             return {"error": "Video not processed"}
 
-        try:
-            # Simple sentiment analysis using basic keywords
-            # In production, you'd use TextBlob or Hugging Face
-            transcript = self.get_video_transcript(video_id)
-
-            positive_words = ['good', 'great', 'excellent', 'amazing',
-                              'wonderful', 'love', 'like', 'best', 'awesome', 'fantastic']
-            negative_words = ['bad', 'terrible', 'awful', 'hate', 'worst',
-                              'horrible', 'disappointing', 'sad', 'angry', 'frustrated']
-            educational_words = ['learn', 'tutorial', 'guide', 'explain',
-                                 'understand', 'concept', 'example', 'demonstration']
-
-            words = transcript.lower().split()
-
-            positive_count = sum(1 for word in words if any(
-                pw in word for pw in positive_words))
-            negative_count = sum(1 for word in words if any(
-                nw in word for nw in negative_words))
-            educational_count = sum(1 for word in words if any(
-                ew in word for ew in educational_words))
-
-            total_sentiment_words = positive_count + negative_count
-
-            if total_sentiment_words == 0:
-                overall_sentiment = "neutral"
-                confidence = 0.5
-            elif positive_count > negative_count:
-                overall_sentiment = "positive"
-                confidence = positive_count / total_sentiment_words
-            else:
-                overall_sentiment = "negative"
-                confidence = negative_count / total_sentiment_words
-
-            emotional_tone = []
-            # More than 1% educational words
-            if educational_count > len(words) * 0.01:
-                emotional_tone.append("educational")
-            if positive_count > negative_count:
-                emotional_tone.append("uplifting")
-            else:
-                emotional_tone.append("serious")
+        artifacts = self.get_artifacts() if video_id == self.current_video_id else None
+        if artifacts is not None:
+            return dict(artifacts["sentiment"])
 
-            return {
-                "overall_sentiment": overall_sentiment,
-                "emotional_tone": emotional_tone,
-                "confidence_score": round(confidence, 2),
-                "word_analysis": {
-                    "positive_words": positive_count,
-                    "negative_words": negative_count,
-                    "educational_words": educational_count,
-                    "total_words": len(words)
-                }
-            }
+        try:
+            return self._compute_sentiment(self.get_video_transcript(video_id))
         except Exception as e:
             return {"error": f"Sentiment analysis failed: {e}"}
 
+    @staticmethod
+    def _compute_sentiment(transcript: str) -> dict:
+        """Keyword-based sentiment of a transcript"""
+        # Simple sentiment analysis using basic keywords
+        # In production, you'd use TextBlob or Hugging Face
+        text = transcript.lower()
+        words = len(text.split())
+
+        # Words containing any of the keywords, counted in one regex pass each
+        positive_count = len(_POSITIVE_WORDS.findall(text))
+        negative_count = len(_NEGATIVE_WORDS.findall(text))
+        educational_count = len(_EDUCATIONAL_WORDS.findall(text))
+
+        total_sentiment_words = positive_count + negative_count
+
+        if total_sentiment_words == 0:
+            overall_sentiment = "neutral"
+            confidence = 0.5
+        elif positive_count > negative_count:
+            overall_sentiment = "positive"
+            confidence = positive_count / total_sentiment_words
+        else:
+            overall_sentiment = "negative"
+            confidence = negative_count / total_sentiment_words
+
+        emotional_tone = []
+        # More than 1% educational words
+        if educational_count > words * 0.01:
+            emotional_tone.append("educational")
+        if positive_count > negative_count:
+            emotional_tone.append("uplifting")
+        else:
+            emotional_tone.append("serious")
+
+        return {
+            "overall_sentiment": overall_sentiment,
+            "emotional_tone": emotional_tone,
+            "confidence_score": round(confidence, 2),
+            "word_analysis": {
+                "positive_words": positive_count,
+                "negative_words": negative_count,
+                "educational_words": educational_count,
+                "total_words": words
+            }
+        }
+
     def generate_structured_summary(self, video_id: str = None) -> dict:
-        """Generate multi-level summaries (brief, detailed, technical)"""
+        """Generate multi-level summaries (brief, detailed, technical)
+
+        Served from the precomputed artifacts when they match the index.
+        """
         if not video_id:
             video_id = self.current_video_id
 
         if not video_id or not self.rag_chain:
             return {"error": "Video not processed"}
 
-        try:
-            # Generate different types of summaries
-            brief_summary = self.ask(
-                "Provide a brief 30-word summary of this video.")
-            detailed_summary = self.ask(
-                "Provide a detailed 200-word summary covering all main points.")
-            key_takeaways = self.ask(
-                "List the top 5 key takeaways from this video in bullet points.")
-            technical_concepts = self.ask(
-                "What technical concepts or terminology are explained in this video?")
+        artifacts = self.get_artifacts() if video_id == self.current_video_id else None
+        if artifacts is not None:
+            return dict(artifacts["summary"])
+        return self._compute_structured_summary()
 
-            return {
-                "brief_summary": brief_summary,
-                "detailed_summary": detailed_summary,
-                "key_takeaways": key_takeaways.split('\n') if key_takeaways else [],
-                "technical_concepts": technical_concepts.split('\n') if technical_concepts else [],
-                "generated_at": __import__('time').time()
-            }
+    def _compute_structured_summary(self) -> dict:
+        """Answer the SUMMARY_QUESTIONS concurrently"""
+        try:
+            answers = dict(zip(SUMMARY_QUESTIONS, self._answer_many(list(SUMMARY_QUESTIONS.values()))))
         except Exception as e:
             return {"error": f"Summary generation failed: {e}"}
+        failed = [answer for answer in answers.values() if isinstance(answer, Exception)]
+        if failed:
+            return {"error": f"Summary generation failed: {failed[0]}"}
+
+        return {
+            "brief_summary": answers["brief_summary"],
+            "detailed_summary": answers["detailed_summary"],
+            "key_takeaways": answers["key_takeaways"].split('\n') if answers["key_takeaways"] else [],
+            "technical_concepts": (answers["technical_concepts"].split('\n')
+                                   if answers["technical_concepts"] else []),
+            "generated_at": time.time()
+        }
 
     def get_video_analytics(self, video_id: str = None) -> dict:
         """Get comprehensive analytics for a video"""
@@ -834,34 +1999,53 @@ class YouTubeRAGChatbot:
 
     def get_video_transcript(self, video_id: str) -> str:
         """Helper method to get transcript for analysis"""
-        # This is a simplified version - in practice you'd store the transcript
-        if video_id == self.current_video_id:
-            try:
-                return self.extract_transcript(video_id)
-            except:
-                return ""
-        return ""
+        if video_id != self.current_video_id:
+            return ""
+        # Use the segments fetched at processing time instead of re-fetching
+        if self.raw_transcript_data:
+            return self.raw_transcript_data.text
+        try:
+            return self.extract_transcript(video_id)
+        except:
+            return ""
 
-    def export_analytics(self, video_id: str = None) -> dict:
-        """Export comprehensive analytics data"""
+    def export_analytics(self, video_id: str = None, allow_stale: bool = False) -> dict:
+        """Export comprehensive analytics data
+
+        Summary and sentiment come from the precomputed artifacts when
+        available (stale ones too with allow_stale); "artifacts" says which
+        index version they were computed for.
+        """
         if not video_id:
             video_id = self.current_video_id
 
         analytics = self.get_video_analytics(video_id)
-        sentiment = self.analyze_video_sentiment(video_id)
-        summary = self.generate_structured_summary(video_id)
+        artifacts = (self.get_artifacts(allow_stale=allow_stale)
+                     if video_id == self.current_video_id else None)
+        if artifacts is not None:
+            sentiment = dict(artifacts["sentiment"])
+            summary = dict(artifacts["summary"])
+        else:
+            sentiment = self.analyze_video_sentiment(video_id)
+            summary = self.generate_structured_summary(video_id)
 
         return {
             "video_id": video_id,
             "analytics": analytics,
             "sentiment_analysis": sentiment,
             "auto_summary": summary,
-            "export_timestamp": __import__('time').time()
+            "artifacts": {
+                "index_version": artifacts["index_version"],
+                "computed_at": artifacts["computed_at"],
+                "stale": artifacts["stale"],
+            } if artifacts is not None else None,
+            "export_timestamp": time.time()
         }
 
 
 def main():
     """Example usage of the YouTube RAG Chatbot"""
+    setup_logging(level=Config.LOG_LEVEL, fmt="text")
 
     # Initialize chatbot
     chatbot = YouTubeRAGChatbot()
@@ -0,0 +1,38 @@
+"""
+Fake clock and HTTP-shaped errors shared by the tests.
+"""
+
+import asyncio
+
+
+class FakeClock:
+    """Time only moves when someone sleeps"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def time(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.now += seconds
+
+    async def async_sleep(self, seconds: float):
+        # Concurrent sleepers share one timeline: waking at t never moves time back
+        wake_at = self.now + seconds
+        await asyncio.sleep(0)
+        self.now = max(self.now, wake_at)
+
+
+class RateLimited(Exception):
+    """A 429 with a Retry-After header, shaped like an HTTP client error"""
+
+    status_code = 429
+
+    def __init__(self, retry_after: float):
+        super().__init__("429 Too Many Requests")
+        self.response = type("Response", (), {"headers": {"Retry-After": str(retry_after)}})()
+
+
+class Unavailable(Exception):
+    status_code = 503
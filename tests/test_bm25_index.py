@@ -0,0 +1,92 @@
+"""
+BM25 scoring over the CSR postings, checked against the textbook formula.
+"""
+
+import math
+
+import pytest
+
+from utils import BM25Index, reciprocal_rank_fusion, tokenize
+
+DOCS = [
+    "gradient descent lowers the training loss",
+    "the cache cuts latency and the cache saves memory",
+    "training a neural network with gradient descent",
+    "python function variable loop",
+]
+
+
+def _reference_score(query: str, docs, k1: float = 1.5, b: float = 0.75):
+    tokenized = [tokenize(doc) for doc in docs]
+    average_length = sum(map(len, tokenized)) / len(tokenized)
+    scores = []
+    for tokens in tokenized:
+        score = 0.0
+        for term in set(tokenize(query)):
+            tf = tokens.count(term)
+            if not tf:
+                continue
+            df = sum(term in other for other in tokenized)
+            idf = math.log1p((len(docs) - df + 0.5) / (df + 0.5))
+            score += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(tokens) / average_length))
+        scores.append(score)
+    return scores
+
+
+def test_tokenize_keeps_joined_names_and_drops_stopwords():
+    assert tokenize("What is GPT-4 and version 3.5 of the model's API?") == [
+        "gpt-4", "version", "3.5", "model's", "api"]
+
+
+@pytest.mark.parametrize("query", ["gradient descent", "cache", "training loss memory", "python"])
+def test_scores_match_reference(query):
+    index = BM25Index(DOCS)
+    assert index.scores(query) == pytest.approx(_reference_score(query, DOCS), rel=1e-5)
+
+
+def test_search_ranks_positive_matches_best_first():
+    index = BM25Index(DOCS, doc_ids=["a", "b", "c", "d"])
+    query = "gradient descent training"
+    reference = _reference_score(query, DOCS)
+    expected = sorted((doc_id for doc_id, score in zip("abcd", reference) if score > 0),
+                      key=lambda doc_id: -reference["abcd".index(doc_id)])
+
+    results = index.search(query, k=4)
+    assert [doc_id for doc_id, _ in results] == expected == ["a", "c"]
+    assert len(index.search("gradient", k=1)) == 1
+
+
+def test_repeated_term_scores_higher():
+    index = BM25Index(DOCS, doc_ids=["a", "b", "c", "d"])
+    assert index.search("cache", k=1)[0][0] == "b"
+
+
+def test_unknown_or_stopword_query_matches_nothing():
+    index = BM25Index(DOCS)
+    assert index.search("kubernetes") == []
+    assert index.search("the and of") == []
+    assert not index.scores("kubernetes").any()
+
+
+def test_empty_index():
+    index = BM25Index([])
+    assert len(index) == 0
+    assert index.search("anything") == []
+
+
+def test_mismatched_ids_are_rejected():
+    with pytest.raises(ValueError):
+        BM25Index(DOCS, doc_ids=["a"])
+
+
+def test_arrays_round_trip():
+    index = BM25Index(DOCS, doc_ids=["a", "b", "c", "d"])
+    restored = BM25Index.from_arrays(index.to_arrays())
+    for query in ("gradient descent", "cache memory"):
+        assert restored.search(query) == pytest.approx(index.search(query))
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    fused = reciprocal_rank_fusion([["x", "y", "z"], ["y", "w"]], k=60)
+    assert [doc_id for doc_id, _ in fused] == ["y", "x", "w", "z"]
+    assert fused[0][1] == pytest.approx(1 / 62 + 1 / 61)
@@ -0,0 +1,44 @@
+"""
+Service limits configured for bulk ingestion apply to the calls they name.
+"""
+
+import pytest
+
+from bulk_ingest import configure_service_rate_limits
+from config import Config
+from utils import (PromptCache, configure_rate_limit, configure_service, reset_rate_limiters,
+                   reset_service_states)
+
+from tests.fakes import FakeClock
+
+
+class FakeLLM:
+    def __init__(self, clock: FakeClock):
+        self.clock = clock
+        self.calls = []
+
+    def invoke(self, prompt, **kwargs):
+        self.calls.append(self.clock.time())
+        return "answer"
+
+
+@pytest.fixture
+def clock():
+    reset_service_states()
+    reset_rate_limiters()
+    yield FakeClock()
+    reset_service_states()
+    reset_rate_limiters()
+
+
+def test_llm_rate_limit_throttles_llm_calls(clock):
+    configure_rate_limit("llm", 0, clock=clock)
+    configure_service("llm", clock=clock)
+    configure_service_rate_limits(Config(), youtube=0, embedding=0, llm=2)
+    llm = FakeLLM(clock)
+
+    cache = PromptCache()
+    for _ in range(3):
+        cache.generate(llm, "prefix ", "question")
+
+    assert llm.calls == pytest.approx([0.0, 0.5, 1.0])
@@ -0,0 +1,82 @@
+"""
+CompactTranscript offsets, slicing and persistence.
+"""
+
+import pytest
+
+from utils import CompactTranscript, TranscriptSegment
+
+SEGMENTS = [
+    {"text": "welcome back", "start": 0.0, "duration": 2.5},
+    {"text": "café déjà vu", "start": 2.5, "duration": 3.0},  # Multi-byte characters
+    {"text": "naïve ünïcode", "start": 5.5, "duration": 1.5},
+    {"text": "the end", "start": 7.0, "duration": 2.0},
+]
+
+
+@pytest.fixture
+def transcript():
+    return CompactTranscript.from_segments(SEGMENTS)
+
+
+def test_segments_round_trip(transcript):
+    assert len(transcript) == 4
+    assert transcript.texts() == [segment["text"] for segment in SEGMENTS]
+    assert transcript[1] == TranscriptSegment("café déjà vu", 2.5, 3.0)
+    assert transcript[-1].text == "the end"
+    assert list(transcript) == [transcript[i] for i in range(4)]
+    with pytest.raises(IndexError):
+        transcript[4]
+
+
+def test_objects_and_dicts_build_the_same_transcript(transcript):
+    from_objects = CompactTranscript.from_segments(
+        TranscriptSegment(s["text"], s["start"], s["duration"]) for s in SEGMENTS)
+    assert from_objects.text == transcript.text
+    assert from_objects.starts.tolist() == transcript.starts.tolist()
+
+
+def test_char_offsets_point_at_each_segment_in_text(transcript):
+    text = transcript.text
+    assert text == "welcome back café déjà vu naïve ünïcode the end"
+    offsets = transcript.char_offsets.tolist()
+    for position, segment in enumerate(SEGMENTS):
+        assert text[offsets[position]:offsets[position] + len(segment["text"])] == segment["text"]
+    assert offsets[-1] == len(text) + 1
+
+
+def test_times(transcript):
+    assert transcript.starts.tolist() == [0.0, 2.5, 5.5, 7.0]
+    assert transcript.ends.tolist() == [2.5, 5.5, 7.0, 9.0]
+    assert transcript.duration == 9.0
+    assert CompactTranscript.from_segments([]).duration == 0.0
+
+
+def test_slice_is_a_view_with_its_own_offsets(transcript):
+    middle = transcript[1:3]
+    assert middle.buffer is transcript.buffer
+    assert middle.text == "café déjà vu naïve ünïcode"
+    assert middle.char_offsets.tolist() == [0, 13, 27]
+    assert middle[0] == transcript[1]
+    assert middle.starts.tolist() == [2.5, 5.5]
+    assert len(transcript[3:1]) == 0
+    assert transcript[3:1].text == ""
+    assert [segment.text for segment in transcript[::2]] == ["welcome back", "naïve ünïcode"]
+
+
+def test_segments_at(transcript):
+    offsets = transcript.char_offsets.tolist()
+    # The space after a segment belongs to it
+    positions = [0, offsets[1] - 1, offsets[1], offsets[3], len(transcript.text), 10 ** 6, -1]
+    assert transcript.segments_at(positions).tolist() == [0, 0, 1, 3, 3, -1, -1]
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_save_and_load(tmp_path, transcript, mmap):
+    middle = transcript[1:4]
+    middle.save(str(tmp_path))
+    loaded = CompactTranscript.load(str(tmp_path), mmap=mmap)
+    assert loaded.texts() == middle.texts()
+    assert loaded.char_offsets.tolist() == middle.char_offsets.tolist()
+    assert loaded.starts.tolist() == middle.starts.tolist()
+    assert loaded.segments_at([0]).tolist() == [0]
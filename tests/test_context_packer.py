@@ -0,0 +1,92 @@
+"""
+Merging overlapping chunks and fitting them into a token budget.
+"""
+
+from types import SimpleNamespace
+
+from utils import count_tokens, pack_context
+
+
+def _doc(text: str, start=None):
+    return SimpleNamespace(page_content=text,
+                           metadata={} if start is None else {"start_index": start})
+
+
+TRANSCRIPT = " ".join(f"word{i}" for i in range(400))
+
+
+def _chunk(first_word: int, last_word: int):
+    """Words first..last of TRANSCRIPT with their character offset"""
+    start = len(" ".join(f"word{i}" for i in range(first_word))) + (1 if first_word else 0)
+    return _doc(" ".join(f"word{i}" for i in range(first_word, last_word + 1)), start)
+
+
+def test_overlapping_chunks_are_sent_once():
+    context, stats = pack_context([_chunk(10, 30), _chunk(25, 50)])
+    assert context == _chunk(10, 50).page_content
+    assert (stats["chunks"], stats["spans"]) == (2, 1)
+    assert stats["tokens_after"] < stats["tokens_before"]
+    assert stats["tokens_saved"] == stats["tokens_before"] - stats["tokens_after"]
+
+
+def test_touching_chunks_are_joined_by_a_space():
+    context, stats = pack_context([_chunk(31, 40), _chunk(10, 30)])
+    assert context == _chunk(10, 40).page_content
+    assert stats["spans"] == 1
+
+
+def test_contained_and_duplicate_chunks_are_dropped():
+    context, _ = pack_context([_chunk(10, 50), _chunk(20, 30), _chunk(10, 50)])
+    assert context == _chunk(10, 50).page_content
+
+
+def test_separate_spans_follow_transcript_order():
+    late, early = _chunk(200, 210), _chunk(10, 20)
+    context, stats = pack_context([late, early], separator="\n\n")
+    assert context == early.page_content + "\n\n" + late.page_content
+    assert stats["spans"] == 2
+
+
+def test_offsets_that_disagree_with_the_text_keep_both_chunks():
+    first = _doc("alpha beta gamma", 0)
+    clash = _doc("delta epsilon", 11)  # Claims to overlap "gamma"
+    context, stats = pack_context([first, clash])
+    assert stats["spans"] == 2
+    assert "alpha beta gamma" in context and "delta epsilon" in context
+
+
+def test_chunks_without_offsets_are_deduplicated_by_text():
+    context, stats = pack_context([_doc("same text"), _doc("same text"), _doc("other")])
+    assert stats["spans"] == 2
+    assert context.count("same text") == 1
+
+
+def test_budget_keeps_the_most_relevant_spans():
+    best, second, third = _chunk(300, 340), _chunk(10, 50), _chunk(150, 190)
+    used = count_tokens(best.page_content) + count_tokens(second.page_content)
+
+    # Too little room left: the third span is left out rather than cut short
+    context, stats = pack_context([best, second, third], max_tokens=used + 20)
+    assert stats["tokens_after"] <= used + 20
+    assert best.page_content in context and second.page_content in context
+    assert "word150" not in context
+    assert context.index(second.page_content) < context.index(best.page_content)
+
+    # Enough room for part of it: the third span is truncated to fit
+    context, stats = pack_context([best, second, third], max_tokens=used + 80)
+    assert stats["tokens_after"] <= used + 80
+    assert "word150" in context and third.page_content not in context
+
+
+def test_budget_truncates_a_single_long_span():
+    long_chunk = _chunk(0, 399)
+    context, stats = pack_context([long_chunk], max_tokens=100)
+    assert 0 < stats["tokens_after"] <= 100
+    assert long_chunk.page_content.startswith(context)
+
+
+def test_unlimited_budget_keeps_everything():
+    docs = [_chunk(0, 10), _chunk(100, 110), _chunk(300, 310)]
+    context, stats = pack_context(docs, max_tokens=0)
+    assert stats["spans"] == 3
+    assert all(doc.page_content in context for doc in docs)
@@ -0,0 +1,48 @@
+"""
+Maximal marginal relevance picks.
+"""
+
+import numpy as np
+
+from utils import mmr_select
+
+
+def _vectors(*rows):
+    return np.asarray(rows, dtype=np.float32)
+
+
+def test_pure_relevance_follows_relevance_order():
+    relevance = [0.2, 0.9, 0.5, 0.7]
+    vectors = np.eye(4, dtype=np.float32)
+    assert mmr_select(relevance, vectors, k=4, lambda_mult=1.0) == [1, 3, 2, 0]
+
+
+def test_near_duplicate_is_skipped_for_a_diverse_candidate():
+    # 0 and 1 say the same thing; 2 is a little less relevant but different
+    vectors = _vectors([1, 0], [0.99, 0.01], [0, 1])
+    relevance = [0.9, 0.88, 0.8]
+    assert mmr_select(relevance, vectors, k=2, lambda_mult=1.0) == [0, 1]
+    assert mmr_select(relevance, vectors, k=2, lambda_mult=0.5) == [0, 2]
+
+
+def test_first_pick_is_always_the_most_relevant():
+    vectors = np.random.default_rng(0).normal(size=(10, 8))
+    relevance = np.linspace(0.1, 0.9, 10)
+    assert mmr_select(relevance, vectors, k=3, lambda_mult=0.0)[0] == 9
+
+
+def test_time_penalty_spreads_picks_across_the_video():
+    vectors = np.eye(4, dtype=np.float32)
+    relevance = [0.9, 0.85, 0.8, 0.5]
+    start_times = [100, 110, 120, 1000]
+    assert mmr_select(relevance, vectors, k=2, lambda_mult=1.0) == [0, 1]
+    assert mmr_select(relevance, vectors, k=2, lambda_mult=1.0, start_times=start_times,
+                      time_penalty=0.5, time_scale=60) == [0, 3]
+
+
+def test_picks_are_unique_and_bounded():
+    vectors = _vectors([1, 0], [1, 0], [1, 0])
+    picks = mmr_select([0.5, 0.5, 0.5], vectors, k=10, lambda_mult=0.5)
+    assert sorted(picks) == [0, 1, 2]
+    assert mmr_select([0.5], vectors[:1], k=0) == []
+    assert mmr_select([], np.zeros((0, 2)), k=3) == []
@@ -0,0 +1,125 @@
+"""
+LLM calls made through a prompt cache share the "llm" service state.
+"""
+
+import pytest
+
+from utils import (GeminiContextCache, PromptCache, SimulatedPromptCache, configure_service,
+                   reset_service_states)
+
+from tests.fakes import FakeClock, RateLimited
+
+
+class ArrivingClock(FakeClock):
+    """Runs `arrive` the first time someone sleeps, before time moves on"""
+
+    def __init__(self):
+        super().__init__()
+        self.arrive = None
+
+    def sleep(self, seconds: float):
+        wake_at = self.now + seconds
+        arrive, self.arrive = self.arrive, None
+        if arrive:
+            arrive()
+        self.now = max(self.now, wake_at)
+
+
+class FakeLLM:
+    """Answers with the time of each call; raises the queued errors first"""
+
+    def __init__(self, clock: FakeClock, errors=()):
+        self.clock = clock
+        self.errors = list(errors)
+        self.calls = []
+
+    def invoke(self, prompt, **kwargs):
+        self.calls.append(self.clock.time())
+        if self.errors:
+            raise self.errors.pop(0)
+        return self.clock.time()
+
+
+@pytest.fixture
+def clock():
+    reset_service_states()
+    clock = ArrivingClock()
+    configure_service("llm", failure_threshold=0, clock=clock)
+    yield clock
+    reset_service_states()
+
+
+def test_llm_429_pauses_concurrent_caller(clock):
+    cache = PromptCache()
+    rate_limited = FakeLLM(clock, errors=[RateLimited(retry_after=7)])
+    other = FakeLLM(clock)
+    answered = {}
+    # A second question arrives while the first waits out its 429
+    clock.arrive = lambda: answered.setdefault("other", cache.generate(other, "prefix ", "other"))
+
+    answered["first"] = cache.generate(rate_limited, "prefix ", "first")
+
+    assert rate_limited.calls == [0.0, pytest.approx(7.0)]
+    # The later caller never reached the LLM before the advised 7 seconds
+    assert other.calls == [pytest.approx(7.0)]
+    assert answered == {"first": pytest.approx(7.0), "other": pytest.approx(7.0)}
+
+
+def test_retried_call_counts_prefix_once(clock):
+    cache = SimulatedPromptCache(min_tokens=0, clock=clock.time)
+    llm = FakeLLM(clock, errors=[RateLimited(retry_after=1)])
+
+    cache.generate(llm, "the same prefix ", "question")
+
+    stats = cache.get_stats()
+    assert len(llm.calls) == 2
+    assert stats["requests"] == 1
+    assert stats["hits"] == 0
+
+
+class RecordingGeminiCache(GeminiContextCache):
+    """Gemini cache whose cached contents are only recorded"""
+
+    def __init__(self):
+        super().__init__("gemini-test", api_key="offline-test", min_tokens=1)
+        self.created = []
+
+    def _create(self, prefix: str) -> str:
+        self.created.append(prefix)
+        return f"cachedContents/{len(self.created)}"
+
+
+class RecordingLLM:
+    def __init__(self):
+        self.calls = []
+
+    def invoke(self, prompt, **kwargs):
+        self.calls.append((prompt, kwargs.get("cached_content")))
+        return "answer"
+
+
+def test_gemini_caches_prefix_from_its_second_use():
+    cache = RecordingGeminiCache()
+    llm = RecordingLLM()
+    transcript = "instructions and the whole transcript " * 20
+
+    for question in ("first?", "second?", "third?"):
+        cache.generate(llm, transcript, question)
+
+    assert cache.created == [transcript]
+    assert llm.calls[0] == (transcript + "first?", None)
+    assert [name for _, name in llm.calls[1:]] == ["cachedContents/1"] * 2
+    assert [messages[0].content for messages, _ in llm.calls[1:]] == ["second?", "third?"]
+    assert (cache.requests, cache.hits) == (3, 2)
+
+
+def test_gemini_does_not_cache_one_off_prefixes():
+    cache = RecordingGeminiCache()
+    llm = RecordingLLM()
+
+    for i in range(5):
+        cache.generate(llm, f"instructions with retrieved chunk {i} " * 20, "question?")
+
+    assert cache.created == []
+    assert all(name is None for _, name in llm.calls)
+    assert cache.hits == 0
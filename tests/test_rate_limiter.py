@@ -0,0 +1,57 @@
+"""
+Token-bucket throttling, driven by a fake clock.
+"""
+
+import asyncio
+
+import pytest
+
+from utils import RateLimiter
+
+from tests.fakes import FakeClock
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def test_unlimited_never_waits(clock):
+    limiter = RateLimiter(rate=0, clock=clock)
+    assert [limiter.acquire() for _ in range(100)] == [0.0] * 100
+    assert clock.time() == 0.0
+
+
+def test_burst_then_rate(clock):
+    limiter = RateLimiter(rate=2, burst=3, clock=clock)
+    started = []
+    for _ in range(6):
+        limiter.acquire()
+        started.append(clock.time())
+
+    # Three back to back, then one every half second
+    assert started == pytest.approx([0.0, 0.0, 0.0, 0.5, 1.0, 1.5])
+    assert limiter.total_wait_time == pytest.approx(1.5)
+
+
+def test_idle_time_refills_up_to_burst(clock):
+    limiter = RateLimiter(rate=1, burst=2, clock=clock)
+    limiter.acquire()
+    limiter.acquire()
+    clock.sleep(10)
+    assert limiter.reserve() == 0.0
+    assert limiter.reserve() == 0.0
+    assert limiter.reserve() == pytest.approx(1.0)
+
+
+def test_concurrent_async_callers_are_spaced(clock):
+    limiter = RateLimiter(rate=4, clock=clock)
+
+    async def call():
+        await limiter.async_acquire()
+        return clock.time()
+
+    async def run():
+        return await asyncio.gather(*(call() for _ in range(4)))
+
+    assert sorted(asyncio.run(run())) == pytest.approx([0.0, 0.25, 0.5, 0.75])
@@ -0,0 +1,142 @@
+"""
+Incremental reindexing: only chunks cut from changed caption segments are
+removed and re-embedded.
+"""
+
+import pytest
+
+from benchmarks.fakes import (FakeSegment, FakeTranscriptApi, FakeTranslator, HashEmbeddings,
+                              make_fake_llm, make_segments)
+from config import Config
+from main import YouTubeRAGChatbot
+from utils import ClientPool
+
+VIDEO_ID = "dQw4w9WgXcQ"
+SEGMENTS = 200
+
+
+def _process(monkeypatch, direct_context_max_tokens: int = 0, segments: int = SEGMENTS):
+    monkeypatch.setattr(Config, "GOOGLE_API_KEY", "offline-test")
+    config = Config()
+    config.DIRECT_CONTEXT_MAX_TOKENS = direct_context_max_tokens
+    clients = ClientPool(config)
+    clients.set_clients(
+        ytt_api=FakeTranscriptApi(segments),
+        embedding_model=HashEmbeddings(),
+        llm=make_fake_llm(),
+        translator_factory=lambda source, target: FakeTranslator(source, target),
+        translation_delay=0.0,
+    )
+    chatbot = YouTubeRAGChatbot(config, clients=clients)
+    chatbot.process_video(VIDEO_ID)
+    return chatbot
+
+
+@pytest.fixture
+def chatbot(monkeypatch):
+    return _process(monkeypatch)
+
+
+def _chunks(chatbot) -> dict:
+    """doc id -> (first segment, last segment, text)"""
+    docstore = chatbot.vector_store.docstore
+    return {doc_id: (doc.metadata["first_segment"], doc.metadata["last_segment"], doc.page_content)
+            for doc_id, doc in ((doc_id, docstore.search(doc_id))
+                                for doc_id in chatbot.vector_store.index_to_docstore_id.values())}
+
+
+def _assert_consistent(chatbot, segment_count: int):
+    chunks = _chunks(chatbot)
+    assert chatbot.vector_store.index.ntotal == len(chunks)
+    assert set(chatbot.get_lexical_index().doc_ids) == set(chunks)
+    covered = set()
+    for first, last, _ in chunks.values():
+        covered.update(range(first, last + 1))
+    assert covered == set(range(segment_count))
+
+
+def _embedded_texts(chatbot) -> int:
+    return chatbot.embedder.get_stats()["texts_embedded"]
+
+
+def test_unchanged_transcript_embeds_nothing(chatbot):
+    before = _chunks(chatbot)
+    calls = chatbot.clients.embedding_model.calls
+
+    report = chatbot.reindex(make_segments(VIDEO_ID, SEGMENTS))
+
+    assert report["mode"] == "incremental"
+    assert report["embedding_api_calls"] == 0
+    assert chatbot.clients.embedding_model.calls == calls
+    assert (report["chunks_removed"], report["chunks_added"]) == (0, 0)
+    assert _chunks(chatbot) == before
+
+
+def test_edit_in_the_middle_reembeds_touched_chunks_only(chatbot):
+    before = _chunks(chatbot)
+    segments = make_segments(VIDEO_ID, SEGMENTS)
+    edited = segments[100]
+    segments[100] = FakeSegment("corrected caption words", edited.start, edited.duration)
+    touched = {doc_id for doc_id, (first, last, _) in before.items() if first <= 100 <= last}
+    embedded = _embedded_texts(chatbot)
+
+    report = chatbot.reindex(segments)
+
+    after = _chunks(chatbot)
+    assert report["mode"] == "incremental"
+    assert report["chunks_removed"] == len(touched)
+    assert report["chunks_reused"] == len(before) - len(touched)
+    # Every untouched chunk keeps its id (and vector); only new chunks are embedded
+    assert set(before) - touched <= set(after)
+    assert not touched & set(after)
+    assert _embedded_texts(chatbot) - embedded <= report["chunks_added"] <= len(touched) + 2
+    assert any("corrected caption words" in text for _, _, text in after.values())
+    _assert_consistent(chatbot, SEGMENTS)
+
+
+def test_removed_segments_leave_faiss_and_bm25(chatbot):
+    before = _chunks(chatbot)
+    segments = make_segments(VIDEO_ID, SEGMENTS)
+    removed = segments[80:120]
+    del segments[80:120]
+    # Chunks made only of removed segments, which cannot be reused
+    gone = {doc_id for doc_id, (first, last, _) in before.items() if 80 <= first and last < 120}
+    assert gone
+
+    report = chatbot.reindex(segments)
+
+    after = _chunks(chatbot)
+    assert report["segments_removed"] == len(removed)
+    assert not gone & set(after)
+    assert not gone & set(chatbot.vector_store.index_to_docstore_id.values())
+    assert not gone & set(chatbot.get_lexical_index().doc_ids)
+    for segment in removed:
+        marker = segment.text.split()[-1]
+        assert not chatbot.get_lexical_index().search(marker)
+        assert all(marker not in text.split() for _, _, text in after.values())
+    _assert_consistent(chatbot, len(segments))
+
+
+def test_direct_context_video_swaps_transcript(monkeypatch):
+    chatbot = _process(monkeypatch, direct_context_max_tokens=4000, segments=20)
+    assert chatbot.direct_context is not None
+    segments = make_segments(VIDEO_ID, 20)
+    segments[5] = FakeSegment("corrected caption words", segments[5].start, segments[5].duration)
+
+    report = chatbot.reindex(segments)
+
+    assert report["mode"] == "direct"
+    assert report["embedding_api_calls"] == 0
+    assert "corrected caption words" in chatbot.direct_context
+    assert chatbot.vector_store is None
+
+
+def test_direct_context_video_outgrowing_budget_is_indexed(monkeypatch):
+    chatbot = _process(monkeypatch, direct_context_max_tokens=4000, segments=20)
+
+    report = chatbot.reindex(make_segments(VIDEO_ID, SEGMENTS))
+
+    assert report["mode"] == "full"
+    assert chatbot.direct_context is None
+    assert report["chunk_count"] == len(_chunks(chatbot)) > 0
+    _assert_consistent(chatbot, SEGMENTS)
@@ -0,0 +1,50 @@
+"""
+A partial index saved to disk is resumed by a fresh worker.
+"""
+
+from benchmarks.fakes import FakeTranscriptApi, FakeTranslator, HashEmbeddings, make_fake_llm
+from config import Config
+from main import YouTubeRAGChatbot
+from utils import ClientPool
+
+VIDEO_ID = "dQw4w9WgXcQ"
+SEGMENTS = 200
+
+
+def _clients(config: Config) -> ClientPool:
+    clients = ClientPool(config)
+    clients.set_clients(
+        ytt_api=FakeTranscriptApi(SEGMENTS),
+        embedding_model=HashEmbeddings(),
+        llm=make_fake_llm(),
+        translator_factory=lambda source, target: FakeTranslator(source, target),
+        translation_delay=0.0,
+    )
+    return clients
+
+
+def test_loaded_partial_index_resumes_from_saved_pending_chunks(monkeypatch, tmp_path):
+    monkeypatch.setattr(Config, "GOOGLE_API_KEY", "offline-test")
+    config = Config()
+    config.DIRECT_CONTEXT_MAX_TOKENS = 0
+    config.INDEX_BATCH_SIZE = 2
+
+    chatbot = YouTubeRAGChatbot(config, clients=_clients(config))
+    chatbot.process_video(VIDEO_ID, partial_ready_chunks=2)
+    total = chatbot.index_status["total_chunks"]
+    assert chatbot.index_status["state"] == "partial" and total > 4
+    chatbot.save(str(tmp_path))
+
+    # The worker that was indexing it is gone; another one maps the saved state
+    loaded = YouTubeRAGChatbot.load(str(tmp_path), config, clients=_clients(config))
+    assert not loaded.is_indexing
+    assert loaded.vector_store.index.ntotal == 2
+
+    batches = []
+    loaded.continue_indexing(on_batch=lambda: batches.append(loaded.index_status["indexed_chunks"]))
+
+    assert loaded.is_fully_indexed and loaded.get_coverage() == 1.0
+    assert loaded.vector_store.index.ntotal == total
+    assert len(batches) == (total - 1) // 2 and batches[-1] == total
+    texts = {doc.page_content for doc in loaded.vector_store.docstore._dict.values()}
+    assert len(texts) == total
@@ -0,0 +1,142 @@
+"""
+Shared 429 pauses and circuit breakers, driven by a fake clock.
+"""
+
+import asyncio
+
+import pytest
+
+from utils import (CircuitOpenError, RetryPolicy, async_retry_with_backoff, configure_service,
+                   reset_service_states, retry_with_backoff)
+
+from tests.fakes import FakeClock, RateLimited, Unavailable
+
+
+@pytest.fixture
+def clock():
+    reset_service_states()
+    yield FakeClock()
+    reset_service_states()
+
+
+def _policy(service: str, max_retries: int = 1) -> RetryPolicy:
+    return RetryPolicy(f"test_{service}", max_retries=max_retries, base_delay=0.1,
+                       max_delay=60.0, service=service)
+
+
+def _fail(error: Exception):
+    def call():
+        raise error
+    return call
+
+
+def test_retry_after_pauses_every_caller(clock):
+    configure_service("paused", failure_threshold=0, clock=clock)
+    policy = _policy("paused", max_retries=3)
+    started_at = {}
+    rate_limited = asyncio.Event()
+
+    async def first():
+        if "first" not in started_at:
+            started_at["first"] = clock.time()
+            rate_limited.set()
+            raise RateLimited(retry_after=7)
+        return clock.time()
+
+    async def second():
+        started_at["second"] = clock.time()
+        return clock.time()
+
+    async def run():
+        async def after_429():
+            await rate_limited.wait()
+            return await async_retry_with_backoff(second, policy=policy)
+
+        return await asyncio.gather(async_retry_with_backoff(first, policy=policy), after_429())
+
+    first_retried_at, second_ran_at = asyncio.run(run())
+    assert started_at["first"] == 0.0
+    # Neither the caller that got the 429 nor the one that arrived later
+    # calls the service again before the advised 7 seconds are up
+    assert first_retried_at == pytest.approx(7.0, abs=0.01)
+    assert second_ran_at == pytest.approx(7.0, abs=0.01)
+
+
+def test_breaker_opens_after_threshold(clock):
+    state = configure_service("flaky", failure_threshold=3, recovery_timeout=30, clock=clock)
+    policy = _policy("flaky")
+    calls = []
+
+    def failing():
+        calls.append(clock.time())
+        raise Unavailable()
+
+    for _ in range(2):
+        with pytest.raises(Unavailable):
+            retry_with_backoff(failing, policy=policy)
+        assert not state.get_stats()["circuit_open"]
+
+    with pytest.raises(Unavailable):
+        retry_with_backoff(failing, policy=policy)
+    assert state.get_stats()["circuit_open"]
+
+    # Open: callers fail fast without reaching the service
+    clock.sleep(29)
+    with pytest.raises(CircuitOpenError) as error:
+        retry_with_backoff(failing, policy=policy)
+    assert error.value.retry_in == pytest.approx(1.0)
+    assert len(calls) == 3
+
+
+def _open_breaker(service: str, clock: FakeClock):
+    state = configure_service(service, failure_threshold=1, recovery_timeout=10, clock=clock)
+    with pytest.raises(Unavailable):
+        retry_with_backoff(_fail(Unavailable()), policy=_policy(service))
+    assert state.get_stats()["circuit_open"]
+    clock.sleep(10)
+    return state
+
+
+def test_single_probe_closes_breaker(clock):
+    state = _open_breaker("recovering", clock)
+    policy = _policy("recovering")
+
+    def probe():
+        # Only one caller gets through while the probe is in flight
+        with pytest.raises(CircuitOpenError):
+            retry_with_backoff(lambda: "second", policy=policy)
+        return "probe"
+
+    assert retry_with_backoff(probe, policy=policy) == "probe"
+    assert not state.get_stats()["circuit_open"]
+    assert retry_with_backoff(lambda: "after", policy=policy) == "after"
+
+
+def test_failed_probe_reopens_breaker(clock):
+    state = _open_breaker("still_down", clock)
+    policy = _policy("still_down")
+
+    with pytest.raises(Unavailable):
+        retry_with_backoff(_fail(Unavailable()), policy=policy)
+    assert state.get_stats()["circuit_open"]
+    with pytest.raises(CircuitOpenError) as error:
+        retry_with_backoff(lambda: "too soon", policy=policy)
+    assert error.value.retry_in == pytest.approx(10.0)
+
+
+def test_cancelled_probe_is_released(clock):
+    state = _open_breaker("cancelled", clock)
+    policy = _policy("cancelled")
+
+    async def hang():
+        await asyncio.Event().wait()
+
+    async def run():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(async_retry_with_backoff(hang, policy=policy), 0.01)
+
+    asyncio.run(run())
+    # No verdict: the breaker stays open, but the next caller may probe
+    assert state.get_stats()["circuit_open"]
+    assert retry_with_backoff(lambda: "probe", policy=policy) == "probe"
+    assert not state.get_stats()["circuit_open"]
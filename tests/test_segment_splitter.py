@@ -0,0 +1,79 @@
+"""
+Token-budgeted chunks of whole caption segments.
+"""
+
+import pytest
+
+from utils import CompactTranscript, SegmentSplitter, count_tokens_batch, segment_chunk_bounds
+
+
+def _check_bounds(bounds, token_counts, chunk_tokens, overlap_tokens):
+    bounds = bounds.tolist()
+    assert bounds[0][0] == 0 and bounds[-1][1] == len(token_counts) - 1
+    for (lo, hi), (next_lo, next_hi) in zip(bounds, bounds[1:]):
+        # No gap, always progress, overlap within its budget
+        assert lo < next_lo <= hi + 1 and next_hi > hi
+        assert sum(token_counts[next_lo:hi + 1]) <= overlap_tokens
+    for lo, hi in bounds:
+        assert sum(token_counts[lo:hi + 1]) <= chunk_tokens or lo == hi
+
+
+def test_docstring_example():
+    assert segment_chunk_bounds([4, 4, 4, 4, 4], chunk_tokens=10, overlap_tokens=4).tolist() == [
+        [0, 1], [1, 2], [2, 3], [3, 4]]
+
+
+def test_without_overlap_chunks_partition_the_segments():
+    bounds = segment_chunk_bounds([3, 3, 3, 3, 3, 3, 3], chunk_tokens=9, overlap_tokens=0)
+    assert bounds.tolist() == [[0, 2], [3, 5], [6, 6]]
+
+
+@pytest.mark.parametrize("chunk_tokens, overlap_tokens", [(20, 0), (20, 5), (50, 20), (12, 11)])
+def test_bounds_respect_budgets(chunk_tokens, overlap_tokens):
+    token_counts = [(i * 7) % 11 + 1 for i in range(200)]
+    bounds = segment_chunk_bounds(token_counts, chunk_tokens, overlap_tokens)
+    _check_bounds(bounds, token_counts, chunk_tokens, overlap_tokens)
+
+
+def test_oversized_segment_gets_its_own_chunk():
+    bounds = segment_chunk_bounds([2, 30, 2, 2], chunk_tokens=10, overlap_tokens=2)
+    assert [1, 1] in bounds.tolist()
+    _check_bounds(bounds, [2, 30, 2, 2], 10, 2)
+
+
+def test_overlap_is_dropped_when_the_next_segment_would_not_fit():
+    # Repeating the 6-token segment would leave no room for the next one
+    assert segment_chunk_bounds([4, 6, 6], chunk_tokens=10, overlap_tokens=6).tolist() == [
+        [0, 1], [2, 2]]
+
+
+def test_empty():
+    assert segment_chunk_bounds([], chunk_tokens=10).shape == (0, 2)
+    assert SegmentSplitter().split(CompactTranscript.from_segments([])) == []
+
+
+def test_split_builds_chunks_from_whole_segments():
+    transcript = CompactTranscript.from_segments(
+        {"text": f"segment number {i} says something", "start": i * 3.0, "duration": 3.0}
+        for i in range(60))
+    token_counts = count_tokens_batch(transcript.texts())
+    splitter = SegmentSplitter(chunk_tokens=40, overlap_tokens=10)
+
+    chunks = splitter.split(transcript)
+
+    assert len(chunks) > 1
+    offsets = transcript.char_offsets
+    for chunk in chunks:
+        lo, hi = chunk.first_segment, chunk.last_segment
+        assert chunk.text == transcript[lo:hi + 1].text
+        assert transcript.text[chunk.start_index:chunk.start_index + len(chunk.text)] == chunk.text
+        assert chunk.start_index == offsets[lo]
+        assert (chunk.start_time, chunk.end_time) == (lo * 3.0, (hi + 1) * 3.0)
+        assert chunk.tokens == sum(token_counts[lo:hi + 1]) <= 40
+    assert chunks[1].first_segment <= chunks[0].last_segment
+
+
+@pytest.mark.parametrize("chunk_tokens, overlap_tokens", [(0, 0), (10, 10), (10, -1)])
+def test_invalid_budgets(chunk_tokens, overlap_tokens):
+    with pytest.raises(ValueError):
+        SegmentSplitter(chunk_tokens, overlap_tokens)
@@ -0,0 +1,115 @@
+"""
+Versioned saves, reloads and pruning in the video session manager.
+"""
+
+import json
+import os
+
+import pytest
+
+from utils import VideoSessionManager
+
+
+class FakeChatbot:
+    """Just enough of a chatbot to be saved, loaded and evicted"""
+
+    def __init__(self, video_id: str, text: str, state: str = "ready"):
+        self.video_id = video_id
+        self.text = text
+        self.index_status = {"state": state, "indexed_chunks": 3}
+        self.is_indexing = False
+        self.processed_videos = {video_id: {"language_code": "en"}}
+
+    def save(self, directory: str):
+        os.makedirs(directory)
+        with open(os.path.join(directory, "index.json"), "w") as f:
+            json.dump({"video_id": self.video_id, "text": self.text,
+                       "state": self.index_status["state"]}, f)
+
+    def save_state(self, directory: str):
+        pass
+
+    def estimate_memory_bytes(self) -> int:
+        return len(self.text)
+
+    def get_coverage(self) -> float:
+        return 1.0
+
+
+def load(directory: str) -> FakeChatbot:
+    with open(os.path.join(directory, "index.json")) as f:
+        data = json.load(f)
+    return FakeChatbot(data["video_id"], data["text"], data["state"])
+
+
+def _manager(tmp_path, **kwargs) -> VideoSessionManager:
+    return VideoSessionManager(str(tmp_path / "store"), load, **kwargs)
+
+
+def _versions_on_disk(manager, video_id):
+    return sorted(os.listdir(os.path.join(manager.store_dir, video_id)))
+
+
+def test_saved_session_reloads_after_eviction(tmp_path):
+    manager = _manager(tmp_path, max_videos=1)
+    manager["first"] = FakeChatbot("first", "one")
+    manager["second"] = FakeChatbot("second", "two")
+
+    assert not manager.is_resident("first")
+    assert manager["first"].text == "one"
+    assert manager.reloads == 1 and manager.evictions == 2
+    assert sorted(manager) == ["first", "second"]
+
+
+def test_other_worker_sees_newer_version(tmp_path):
+    manager = _manager(tmp_path)
+    other = _manager(tmp_path)
+    manager["vid"] = FakeChatbot("vid", "old")
+    assert other["vid"].text == "old"
+
+    manager["vid"] = FakeChatbot("vid", "new")
+
+    assert manager.registry.get("vid")["version"] == 2
+    assert other["vid"].text == "new"
+    assert other.reloads == 2
+
+
+def test_partial_index_is_registered_as_partial(tmp_path):
+    manager = _manager(tmp_path)
+    manager["vid"] = FakeChatbot("vid", "text", state="indexing")
+    assert manager.registry.get("vid")["status"] == "partial"
+    assert not manager.claim("vid")
+
+
+def test_replaced_versions_are_kept_for_retain_seconds(tmp_path):
+    manager = _manager(tmp_path, retain_seconds=3600)
+    manager["vid"] = FakeChatbot("vid", "v1")
+    manager.persist("vid")
+    manager.persist("vid")
+
+    # Older versions are only marked, so readers of their path can still load them
+    assert len(_versions_on_disk(manager, "vid")) == 3
+
+
+def test_replaced_versions_are_deleted_after_retain_seconds(tmp_path):
+    manager = _manager(tmp_path, retain_seconds=0)
+    manager["vid"] = FakeChatbot("vid", "v1")
+    manager.persist("vid")
+    # First prune only marks the replaced version, the next one deletes it
+    assert len(_versions_on_disk(manager, "vid")) == 2
+    manager.persist("vid")
+
+    current = os.path.basename(manager.registry.get("vid")["index_path"])
+    assert len(_versions_on_disk(manager, "vid")) == 2
+    assert current in _versions_on_disk(manager, "vid")
+
+
+def test_delete_removes_index_and_row(tmp_path):
+    manager = _manager(tmp_path)
+    manager["vid"] = FakeChatbot("vid", "text")
+    del manager["vid"]
+
+    assert "vid" not in manager
+    assert not os.path.exists(os.path.join(manager.store_dir, "vid"))
+    with pytest.raises(KeyError):
+        manager["vid"]
@@ -0,0 +1,86 @@
+"""
+Processing claims and index versions in the shared video registry.
+"""
+
+import pytest
+
+from utils import VideoRegistry
+
+from tests.fakes import FakeClock
+
+
+@pytest.fixture
+def registry(tmp_path):
+    return VideoRegistry(str(tmp_path / "registry.sqlite3"))
+
+
+def test_claim_is_exclusive_until_released(registry):
+    assert registry.try_claim("vid")
+    assert not registry.try_claim("vid")
+    assert "vid" not in registry
+
+    registry.release_claim("vid")
+    assert registry.try_claim("vid")
+
+
+def test_abandoned_claim_is_taken_over(tmp_path):
+    registry = VideoRegistry(str(tmp_path / "registry.sqlite3"), claim_timeout=0)
+    assert registry.try_claim("vid")
+    assert registry.try_claim("vid")
+
+
+def test_stale_partial_video_is_taken_over_in_place(tmp_path, monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr("utils.video_registry.time", clock)
+    registry = VideoRegistry(str(tmp_path / "registry.sqlite3"), claim_timeout=60)
+    registry.register("vid", "/store/vid/a", status="partial", chunk_count=20)
+
+    clock.sleep(50)
+    registry.heartbeat("vid")
+    clock.sleep(50)
+    assert not registry.try_claim("vid")  # Heartbeat 50s ago
+
+    clock.sleep(20)
+    assert registry.try_claim("vid")
+    assert not registry.try_claim("vid")  # The takeover counts as a heartbeat
+    row = registry.get("vid")
+    assert (row["status"], row["index_path"], row["version"]) == ("partial", "/store/vid/a", 1)
+
+
+def test_registered_video_cannot_be_claimed(registry):
+    assert registry.try_claim("vid")
+    registry.register("vid", "/store/vid/a", status="ready", language_code="en",
+                      chunk_count=12, coverage=1.0)
+
+    assert not registry.try_claim("vid")
+    registry.release_claim("vid")  # Only drops processing rows
+    row = registry.get("vid")
+    assert (row["status"], row["index_path"], row["chunk_count"]) == ("ready", "/store/vid/a", 12)
+
+
+def test_register_bumps_version(registry):
+    assert registry.register("vid", "/store/vid/a", status="partial") == 1
+    assert registry.register("vid", "/store/vid/b", status="ready") == 2
+    assert registry.get("vid")["version"] == 2
+    assert registry.get("vid")["index_path"] == "/store/vid/b"
+
+
+def test_only_available_videos_are_listed(registry):
+    registry.register("first", "/store/first/a", status="ready")
+    registry.try_claim("claimed")
+    registry.register("second", "/store/second/a", status="partial")
+
+    assert registry.list_video_ids() == ["first", "second"]
+    assert "claimed" not in registry
+
+    assert registry.remove("first")["index_path"] == "/store/first/a"
+    assert registry.remove("first") is None
+    assert registry.list_video_ids() == ["second"]
+
+
+def test_registry_is_shared_through_the_database(tmp_path):
+    path = str(tmp_path / "registry.sqlite3")
+    VideoRegistry(path).register("vid", "/store/vid/a", status="ready")
+    other = VideoRegistry(path)
+    assert other.get("vid")["version"] == 1
+    assert not other.try_claim("vid")
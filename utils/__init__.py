@@ -5,9 +5,68 @@ Utility modules for the YouTube Chatbot RAG system.
 from .retry_utils import (
     retry_with_backoff,
     retry_decorator,
+    async_retry_with_backoff,
+    async_retry_decorator,
     youtube_transcript_retry,
     embedding_retry,
-    llm_retry
+    llm_retry,
+    async_llm_retry,
+    YOUTUBE_POLICY,
+    EMBEDDING_POLICY,
+    LLM_POLICY
+)
+from .retry_policy import (
+    RetryPolicy,
+    RetryBudget,
+    register_policy,
+    get_retry_policy,
+    get_retry_metrics
+)
+from .service_state import (
+    Clock,
+    CircuitOpenError,
+    ServiceState,
+    get_service_state,
+    configure_service,
+    reset_service_states
+)
+from .rate_limiter import RateLimiter, get_rate_limiter, configure_rate_limit, reset_rate_limiters
+from .embedding_batcher import EmbeddingBatcher
+from .bm25_index import BM25Index, reciprocal_rank_fusion, tokenize
+from .token_utils import count_tokens, count_tokens_batch, truncate_to_tokens, fits_token_budget
+from .context_packer import pack_context
+from .mmr import mmr_select
+from .prompt_cache import (PromptCache, SimulatedPromptCache, GeminiContextCache,
+                           build_prompt_cache)
+from .adaptive_retrieval import (classify_query, score_cutoff, FACTUAL_QUERY, SUMMARY_QUERY,
+                                 GENERAL_QUERY)
+from .conversation_store import ConversationStore, is_follow_up, summarize_turns, format_turns
+from .compact_transcript import CompactTranscript, TranscriptSegment
+from .segment_splitter import SegmentSplitter, SegmentChunk, segment_chunk_bounds
+from .chapters import ChapterIndex, chapter_starts, gap_similarities, is_navigation_query
+from .client_pool import ClientPool, get_client_pool
+from .video_registry import VideoRegistry
+from .session_manager import VideoSessionManager
+from .dashboard_metrics import DashboardAggregator
+from .logging_utils import (
+    get_logger,
+    setup_logging,
+    shutdown_logging,
+    new_request_id,
+    set_request_id,
+    reset_request_id,
+    get_request_id
+)
+from .instrumentation import (
+    metrics,
+    span,
+    timed,
+    incr,
+    observe,
+    set_enabled as set_instrumentation_enabled,
+    start_request_timings,
+    finish_request_timings,
+    server_timing_header
 )
 
 __all__ = [
@@ -15,5 +74,79 @@ __all__ = [
     'retry_decorator',
     'youtube_transcript_retry',
     'embedding_retry',
-    'llm_retry'
+    'llm_retry',
+    'async_retry_with_backoff',
+    'async_retry_decorator',
+    'async_llm_retry',
+    'YOUTUBE_POLICY',
+    'EMBEDDING_POLICY',
+    'LLM_POLICY',
+    'RetryPolicy',
+    'RetryBudget',
+    'register_policy',
+    'get_retry_policy',
+    'get_retry_metrics',
+    'Clock',
+    'CircuitOpenError',
+    'ServiceState',
+    'get_service_state',
+    'configure_service',
+    'reset_service_states',
+    'RateLimiter',
+    'get_rate_limiter',
+    'configure_rate_limit',
+    'reset_rate_limiters',
+    'EmbeddingBatcher',
+    'BM25Index',
+    'reciprocal_rank_fusion',
+    'tokenize',
+    'count_tokens',
+    'count_tokens_batch',
+    'truncate_to_tokens',
+    'fits_token_budget',
+    'pack_context',
+    'mmr_select',
+    'PromptCache',
+    'SimulatedPromptCache',
+    'GeminiContextCache',
+    'build_prompt_cache',
+    'classify_query',
+    'score_cutoff',
+    'FACTUAL_QUERY',
+    'SUMMARY_QUERY',
+    'GENERAL_QUERY',
+    'ConversationStore',
+    'is_follow_up',
+    'summarize_turns',
+    'format_turns',
+    'CompactTranscript',
+    'TranscriptSegment',
+    'SegmentSplitter',
+    'SegmentChunk',
+    'segment_chunk_bounds',
+    'ChapterIndex',
+    'chapter_starts',
+    'gap_similarities',
+    'is_navigation_query',
+    'ClientPool',
+    'get_client_pool',
+    'VideoRegistry',
+    'VideoSessionManager',
+    'DashboardAggregator',
+    'get_logger',
+    'setup_logging',
+    'shutdown_logging',
+    'new_request_id',
+    'set_request_id',
+    'reset_request_id',
+    'get_request_id',
+    'metrics',
+    'span',
+    'timed',
+    'incr',
+    'observe',
+    'set_instrumentation_enabled',
+    'start_request_timings',
+    'finish_request_timings',
+    'server_timing_header'
 ]
@@ -0,0 +1,78 @@
+"""
+How many chunks a question needs.
+Questions are classified by their wording: short factual lookups need one or
+two chunks, requests for summaries or overviews need many. Within that
+maximum, retrieval stops early where candidate similarity drops sharply or
+falls too far below the best match.
+"""
+
+import re
+from typing import Sequence
+
+FACTUAL_QUERY = "factual"
+SUMMARY_QUERY = "summary"
+GENERAL_QUERY = "general"
+
+_SUMMARY_PATTERN = re.compile(
+    r"\b(summar\w*|overview|recap|outline|tl;?dr|gist|"
+    r"main (points?|ideas?|topics?|themes?)|key (points?|takeaways?|ideas?|concepts?)|"
+    r"takeaways?|what (is|'s) (this|the) video about|what (does|did) (it|this|the video) "
+    r"(cover|talk about|discuss)|everything|list (all|every)|all the)\b",
+    re.IGNORECASE)
+
+_FACTUAL_PATTERN = re.compile(
+    r"^\s*(who|when|where|which|whose|how (many|much|long|old|often)|"
+    r"what(?: is| are| was| were|'s| does \S+ (?:mean|stand for))|what year|what time|"
+    r"define|is|are|was|were|does|did|do|can|has|have)\b",
+    re.IGNORECASE)
+
+# Factual wording on a long question usually hides a broader request
+FACTUAL_MAX_WORDS = 12
+
+
+def classify_query(question: str) -> str:
+    """
+    Kind of question: FACTUAL_QUERY, SUMMARY_QUERY or GENERAL_QUERY.
+
+    Example:
+        >>> classify_query("Who created Python?")
+        'factual'
+        >>> classify_query("Summarize the main points")
+        'summary'
+    """
+    if _SUMMARY_PATTERN.search(question):
+        return SUMMARY_QUERY
+    if _FACTUAL_PATTERN.search(question) and len(question.split()) <= FACTUAL_MAX_WORDS:
+        return FACTUAL_QUERY
+    return GENERAL_QUERY
+
+
+def score_cutoff(scores: Sequence[float], max_k: int, min_k: int = 1,
+                 min_ratio: float = 0.0, max_gap: float = 0.0) -> int:
+    """
+    Number of results to keep from similarity scores.
+
+    Scores are considered best first; counting stops at the first score below
+    min_ratio * best score or more than max_gap below the previous one.
+
+    Parameters:
+        scores (sequence): Candidate similarity scores (any order).
+        max_k (int): Upper bound on the result count.
+        min_k (int): Lower bound on the result count.
+        min_ratio (float): Minimum score relative to the best (0 disables).
+        max_gap (float): Largest allowed drop between consecutive scores (0 disables).
+
+    Returns:
+        int: How many of the best candidates to keep.
+    """
+    ranked = sorted(scores, reverse=True)[:max_k]
+    if not ranked:
+        return 0
+    keep = 1
+    for previous, score in zip(ranked, ranked[1:]):
+        if min_ratio and score < min_ratio * ranked[0]:
+            break
+        if max_gap and previous - score > max_gap:
+            break
+        keep += 1
+    return max(min(keep, max_k), min(min_k, len(ranked)))
@@ -0,0 +1,170 @@
+"""
+Lexical (BM25) retrieval over transcript chunks.
+The inverted index is stored as flat NumPy arrays in CSR layout (one row of
+postings per term) with the BM25 weight of every posting precomputed at build
+time, so a query is a few array slices and one bincount. Rankings from BM25
+and vector search are combined with reciprocal rank fusion.
+"""
+
+import re
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Words that match almost every chunk and only add noise to the scores
+STOPWORDS = frozenset("""
+a an and are as at be but by can do does for from had has have how i if in
+is it its of on or so that the their then there these they this to was we
+were what when where which who why will with you your about into than just
+""".split())
+
+_TOKEN_PATTERN = re.compile(r"\w+(?:[.'\-]\w+)*")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased words, keeping numbers and joined names like "gpt-4" or "3.5" whole"""
+    return [token for token in _TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+class BM25Index:
+    """
+    Immutable BM25 index over a list of documents.
+
+    Parameters:
+        texts (list): Document texts.
+        doc_ids (list): One id per text, returned by search() (default: positions).
+        k1 (float): Term frequency saturation.
+        b (float): Document length normalization.
+
+    Example:
+        >>> index = BM25Index(["gradient descent lowers the loss", "cache latency"], ["a", "b"])
+        >>> index.search("cache", k=1)
+        [('b', 0.815...)]
+    """
+
+    def __init__(self, texts: Sequence[str], doc_ids: Optional[Sequence[str]] = None,
+                 k1: float = 1.5, b: float = 0.75):
+        import numpy as np
+
+        self.k1 = k1
+        self.b = b
+        self.doc_ids = list(doc_ids) if doc_ids is not None else list(range(len(texts)))
+        if len(self.doc_ids) != len(texts):
+            raise ValueError("texts and doc_ids must have the same length")
+
+        vocabulary: Dict[str, int] = {}
+        term_ids, doc_positions = [], []
+        doc_lengths = np.zeros(len(texts), dtype=np.float32)
+        for position, text in enumerate(texts):
+            tokens = tokenize(text)
+            doc_lengths[position] = len(tokens)
+            for token in tokens:
+                term_ids.append(vocabulary.setdefault(token, len(vocabulary)))
+            doc_positions.extend([position] * len(tokens))
+
+        self.vocabulary = vocabulary
+        self._build(np.asarray(term_ids, dtype=np.int64),
+                    np.asarray(doc_positions, dtype=np.int64), doc_lengths)
+
+    def _build(self, term_ids: "np.ndarray", doc_positions: "np.ndarray",
+               doc_lengths: "np.ndarray"):
+        import numpy as np
+
+        n_docs = len(doc_lengths)
+        n_terms = len(self.vocabulary)
+
+        # Count each (term, doc) pair once: the pairs, sorted by term, are the postings
+        pair_keys, term_freqs = np.unique(term_ids * max(n_docs, 1) + doc_positions,
+                                          return_counts=True)
+        posting_terms = pair_keys // max(n_docs, 1)
+        self.postings = (pair_keys % max(n_docs, 1)).astype(np.int32)
+
+        document_freqs = np.bincount(posting_terms, minlength=n_terms)
+        self.indptr = np.zeros(n_terms + 1, dtype=np.int64)
+        np.cumsum(document_freqs, out=self.indptr[1:])
+
+        idf = np.log1p((n_docs - document_freqs + 0.5) / (document_freqs + 0.5))
+        average_length = float(doc_lengths.mean()) if n_docs and doc_lengths.sum() else 1.0
+        norm = self.k1 * (1 - self.b + self.b * doc_lengths[self.postings] / average_length)
+        self.weights = (idf[posting_terms] * term_freqs * (self.k1 + 1)
+                        / (term_freqs + norm)).astype(np.float32)
+        self.n_docs = n_docs
+
+    def __len__(self) -> int:
+        return self.n_docs
+
+    def scores(self, query: str) -> "np.ndarray":
+        """BM25 score of every document for a query"""
+        import numpy as np
+
+        term_ids = {self.vocabulary[token] for token in tokenize(query) if token in self.vocabulary}
+        if not term_ids:
+            return np.zeros(self.n_docs, dtype=np.float32)
+        rows = [slice(self.indptr[term_id], self.indptr[term_id + 1]) for term_id in term_ids]
+        return np.bincount(np.concatenate([self.postings[row] for row in rows]),
+                           weights=np.concatenate([self.weights[row] for row in rows]),
+                           minlength=self.n_docs)
+
+    def search(self, query: str, k: int = 4) -> List[Tuple[object, float]]:
+        """
+        Best matching documents for a query.
+
+        Returns:
+            list: Up to k (doc_id, score) pairs with a positive score, best first.
+        """
+        import numpy as np
+
+        scores = self.scores(query)
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(self.doc_ids[position], float(scores[position])) for position in candidates]
+
+    # ---- Persistence ----
+
+    def to_arrays(self) -> Dict[str, "np.ndarray"]:
+        """Arrays for np.savez(); restore with from_arrays()"""
+        import numpy as np
+
+        terms = sorted(self.vocabulary, key=self.vocabulary.get)
+        return {
+            "terms": np.asarray(terms, dtype=str),
+            "doc_ids": np.asarray(self.doc_ids, dtype=str),
+            "indptr": self.indptr,
+            "postings": self.postings,
+            "weights": self.weights,
+            "params": np.asarray([self.k1, self.b], dtype=np.float64),
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays) -> "BM25Index":
+        index = cls.__new__(cls)
+        index.k1, index.b = (float(value) for value in arrays["params"])
+        index.vocabulary = {str(term): term_id for term_id, term in enumerate(arrays["terms"])}
+        index.doc_ids = [str(doc_id) for doc_id in arrays["doc_ids"]]
+        index.indptr = arrays["indptr"]
+        index.postings = arrays["postings"]
+        index.weights = arrays["weights"]
+        index.n_docs = len(index.doc_ids)
+        return index
+
+
+def reciprocal_rank_fusion(rankings: Iterable[Sequence[object]], k: int = 60,
+                           weights: Optional[Sequence[float]] = None) -> List[Tuple[object, float]]:
+    """
+    Merge several best-first rankings of ids into one.
+
+    Each id scores sum(weight / (k + rank)) over the rankings it appears in,
+    so items ranked well by either retriever rise without comparing raw scores.
+
+    Returns:
+        list: (id, fused score) pairs, best first.
+    """
+    fused: Dict[object, float] = {}
+    for ranking_index, ranking in enumerate(rankings):
+        weight = weights[ranking_index] if weights else 1.0
+        for rank, doc_id in enumerate(ranking, start=1):
+            fused[doc_id] = fused.get(doc_id, 0.0) + weight / (k + rank)
+    return sorted(fused.items(), key=lambda item: -item[1])
@@ -0,0 +1,230 @@
+"""
+Topical chapters over a video's timeline.
+Chunk embeddings (in time order) are compared across every gap between
+neighbouring chunks in one vectorized pass; chapters start at the gaps where
+that similarity dips deepest (TextTiling-style depth scores). Each chapter
+keeps its time range, a keyword title and the unit-length mean of its chunk
+vectors, so "where does it talk about X" resolves with one matrix-vector
+product over the chapter centroids.
+"""
+
+import math
+import re
+from collections import Counter
+from typing import TYPE_CHECKING, Dict, List, Sequence, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+from .bm25_index import tokenize
+
+_NAVIGATION_PATTERN = re.compile(
+    r"\b(?:(?:where|when|at what (?:point|time|minute)|(?:which|what) (?:part|section|chapter|"
+    r"segment|minute|moment))\b.*\b(?:talk\w*|mention\w*|discuss\w*|cover\w*|explain\w*|"
+    r"show\w*|says?|said|speak\w*|go(?:es)? over|gets? (?:to|into)|introduc\w*)"
+    r"|timestamps? (?:for|of|where|when)|jump to|skip to|take me to|"
+    r"find the (?:part|section|bit|moment))\b",
+    re.IGNORECASE)
+
+
+def is_navigation_query(question: str) -> bool:
+    """
+    True for questions asking where in the video something is.
+
+    Example:
+        >>> is_navigation_query("Where does he talk about gradient descent?")
+        True
+        >>> is_navigation_query("When was Python created?")
+        False
+    """
+    return bool(_NAVIGATION_PATTERN.search(question))
+
+
+def _unit_rows(vectors: "np.ndarray") -> "np.ndarray":
+    import numpy as np
+
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+def gap_similarities(vectors, window: int = 2) -> "np.ndarray":
+    """
+    Cosine similarity across each gap between consecutive chunks.
+
+    Gap g (between chunks g and g + 1) compares the sum of the window chunks
+    before it with the sum of the window chunks after it; window=1 compares
+    the neighbouring chunks themselves.
+
+    Returns:
+        np.ndarray: n - 1 similarities for n chunks.
+    """
+    import numpy as np
+
+    vectors = _unit_rows(np.asarray(vectors, dtype=np.float32))
+    n = len(vectors)
+    if n < 2:
+        return np.zeros(0, dtype=np.float32)
+    cumulative = np.concatenate([np.zeros((1, vectors.shape[1]), dtype=np.float32),
+                                 np.cumsum(vectors, axis=0)])
+    gaps = np.arange(1, n)
+    left = cumulative[gaps] - cumulative[np.maximum(gaps - window, 0)]
+    right = cumulative[np.minimum(gaps + window, n)] - cumulative[gaps]
+    return np.einsum("ij,ij->i", _unit_rows(left), _unit_rows(right))
+
+
+def chapter_starts(vectors, min_chunks: int = 3, window: int = 2, cutoff: float = 0.5,
+                   max_chapters: int = 0) -> List[int]:
+    """
+    Positions of the first chunk of each chapter.
+
+    A gap's depth is how far its similarity lies below the highest similarity
+    within window gaps on either side. Gaps deeper than mean + cutoff * std
+    of all depths become chapter starts, deepest first, as long as every
+    chapter keeps at least min_chunks chunks.
+
+    Parameters:
+        vectors (array): Chunk embeddings in time order.
+        min_chunks (int): Fewest chunks per chapter.
+        window (int): Chunks compared on each side of a gap.
+        cutoff (float): Depth threshold in standard deviations above the mean.
+        max_chapters (int): Most chapters (0 = unlimited).
+
+    Returns:
+        list: Sorted chunk positions, starting with 0.
+    """
+    import numpy as np
+
+    n = len(vectors)
+    min_chunks = max(min_chunks, 1)
+    if n < 2 * min_chunks:
+        return [0] if n else []
+
+    similarity = gap_similarities(vectors, window)
+    padded = np.pad(similarity, window, constant_values=-np.inf)
+    peaks = np.lib.stride_tricks.sliding_window_view(padded, window + 1)
+    left_peak = peaks[:len(similarity)].max(axis=1)
+    right_peak = peaks[window:window + len(similarity)].max(axis=1)
+    depth = (left_peak - similarity) + (right_peak - similarity)
+
+    threshold = depth.mean() + cutoff * depth.std()
+    starts = [0]
+    for gap in np.argsort(-depth, kind="stable"):
+        if depth[gap] <= threshold or depth[gap] <= 0:
+            break
+        if max_chapters and len(starts) >= max_chapters:
+            break
+        start = int(gap) + 1
+        if start < min_chunks or n - start < min_chunks:
+            continue
+        if any(abs(start - other) < min_chunks for other in starts):
+            continue
+        starts.append(start)
+    return sorted(starts)
+
+
+def chapter_titles(texts_per_chapter: Sequence[str], words: int = 3) -> List[str]:
+    """Each chapter's most distinctive words (TF-IDF across chapters), comma-separated"""
+    counts = [Counter(token for token in tokenize(text) if not token.isdigit())
+              for text in texts_per_chapter]
+    document_frequency = Counter(token for count in counts for token in count)
+    total = len(counts)
+    titles = []
+    for count in counts:
+        ranked = sorted(count.items(), key=lambda item: (
+            -item[1] * math.log(1 + total / document_frequency[item[0]]), item[0]))
+        titles.append(", ".join(token for token, _ in ranked[:words]))
+    return titles
+
+
+class ChapterIndex:
+    """
+    Chapters of one video with their time ranges, titles and centroids.
+
+    Parameters:
+        chunk_counts (array): Chunks in each chapter.
+        start_times (array): Chapter start times in seconds.
+        end_times (array): Chapter end times in seconds.
+        centroids (array): Unit-length mean chunk vector of each chapter.
+        titles (list): Keyword title of each chapter.
+
+    Example:
+        >>> index = ChapterIndex.build(vectors, texts, start_times, end_times)
+        >>> index.search(query_vector, k=1)
+        [(2, 0.71)]
+    """
+
+    def __init__(self, chunk_counts, start_times, end_times, centroids, titles: Sequence[str]):
+        import numpy as np
+
+        self.chunk_counts = np.asarray(chunk_counts, dtype=np.int32)
+        self.start_times = np.asarray(start_times, dtype=np.float64)
+        self.end_times = np.asarray(end_times, dtype=np.float64)
+        self.centroids = np.asarray(centroids, dtype=np.float32)
+        self.titles = [str(title) for title in titles]
+
+    @classmethod
+    def build(cls, vectors, texts: Sequence[str], start_times: Sequence[float],
+              end_times: Sequence[float], min_chunks: int = 3, window: int = 2,
+              cutoff: float = 0.5, max_chapters: int = 0) -> "ChapterIndex":
+        """Segment chunks (in time order) into chapters; see chapter_starts()"""
+        import numpy as np
+
+        vectors = np.asarray(vectors, dtype=np.float32)
+        starts = chapter_starts(vectors, min_chunks, window, cutoff, max_chapters)
+        bounds = starts + [len(vectors)]
+
+        unit = _unit_rows(vectors)
+        centroids = _unit_rows(np.add.reduceat(unit, starts, axis=0)) if starts else unit[:0]
+        texts_per_chapter = [" ".join(texts[lo:hi]) for lo, hi in zip(bounds, bounds[1:])]
+        chapter_start_times = [float(start_times[lo]) for lo in starts]
+        # Chunks overlap, so a chapter ends where the next one starts
+        chapter_end_times = chapter_start_times[1:] + (
+            [float(max(end_times))] if starts else [])
+        return cls(np.diff(bounds), chapter_start_times, chapter_end_times, centroids,
+                   chapter_titles(texts_per_chapter))
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    def search(self, query_vector, k: int = 1, min_score: float = 0.0) -> List[Tuple[int, float]]:
+        """Best (chapter, cosine similarity) pairs for a query vector, best first"""
+        import numpy as np
+
+        if not len(self):
+            return []
+        query = np.asarray(query_vector, dtype=np.float32)
+        scores = self.centroids @ (query / (np.linalg.norm(query) or 1.0))
+        top = np.argsort(-scores, kind="stable")[:k]
+        return [(int(i), float(scores[i])) for i in top if scores[i] >= min_score]
+
+    def chapters(self) -> List[dict]:
+        """Chapter descriptions in time order"""
+        return [{
+            "index": i,
+            "title": self.titles[i],
+            "start_time": float(self.start_times[i]),
+            "end_time": float(self.end_times[i]),
+            "chunk_count": int(self.chunk_counts[i]),
+        } for i in range(len(self))]
+
+    def to_arrays(self) -> Dict[str, "np.ndarray"]:
+        """Arrays for np.savez(); restore with from_arrays()"""
+        import numpy as np
+
+        return {
+            "chunk_counts": self.chunk_counts,
+            "start_times": self.start_times,
+            "end_times": self.end_times,
+            "centroids": self.centroids,
+            "titles": np.asarray(self.titles, dtype=str),
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays) -> "ChapterIndex":
+        return cls(arrays["chunk_counts"], arrays["start_times"], arrays["end_times"],
+                   arrays["centroids"], arrays["titles"].tolist())
+
+    def nbytes(self) -> int:
+        return (self.centroids.nbytes + self.start_times.nbytes + self.end_times.nbytes
+                + self.chunk_counts.nbytes + sum(len(title) for title in self.titles))
+
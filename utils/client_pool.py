@@ -0,0 +1,142 @@
+"""
+Shared model clients.
+One ClientPool holds the YouTube transcript client, embedding model, LLM,
+translator factory, embedding batcher and prompt cache so that many chatbot
+instances (one per video) reuse the same HTTP sessions, caches and rate
+limits instead of building their own.
+"""
+
+import threading
+from typing import Dict, Tuple
+
+from config import Config
+from .embedding_batcher import EmbeddingBatcher
+from .prompt_cache import PromptCache, build_prompt_cache
+
+
+class ClientPool:
+    """
+    Lazily-created model clients shared across videos.
+
+    Parameters:
+        config (Config): Configuration used to build the clients.
+    """
+
+    def __init__(self, config: Config = None):
+        self.config = config or Config()
+        self._lock = threading.Lock()
+        self._ytt_api = None
+        self._embedding_model = None
+        self._llm = None
+        self._embedder = None
+        self._prompt_cache = None
+        self._translator_factory = None
+        # Pause between translation requests (the free translator rate-limits hard)
+        self.translation_delay = 0.5
+
+    @property
+    def ytt_api(self):
+        with self._lock:
+            if self._ytt_api is None:
+                from youtube_transcript_api import YouTubeTranscriptApi
+                from youtube_transcript_api.proxies import WebshareProxyConfig
+
+                # Use the proxy for better reliability when it is configured
+                proxy_config = None
+                if self.config.PROXY_USERNAME and self.config.PROXY_PASSWORD:
+                    proxy_config = WebshareProxyConfig(
+                        proxy_username=self.config.PROXY_USERNAME,
+                        proxy_password=self.config.PROXY_PASSWORD,
+                    )
+                self._ytt_api = YouTubeTranscriptApi(proxy_config=proxy_config)
+            return self._ytt_api
+
+    @property
+    def embedding_model(self):
+        with self._lock:
+            if self._embedding_model is None:
+                from langchain_google_genai import GoogleGenerativeAIEmbeddings
+
+                self._embedding_model = GoogleGenerativeAIEmbeddings(
+                    model=self.config.EMBEDDING_MODEL
+                )
+            return self._embedding_model
+
+    @property
+    def llm(self):
+        with self._lock:
+            if self._llm is None:
+                from langchain_google_genai import ChatGoogleGenerativeAI
+
+                self._llm = ChatGoogleGenerativeAI(
+                    model=self.config.LLM_MODEL,
+                    temperature=self.config.LLM_TEMPERATURE
+                )
+            return self._llm
+
+    def get_translator(self, source_lang: str, target_lang: str = 'en'):
+        """Translator object with a translate(text) method"""
+        with self._lock:
+            factory = self._translator_factory
+        if factory is None:
+            from deep_translator import GoogleTranslator
+            factory = GoogleTranslator
+        return factory(source=source_lang, target=target_lang)
+
+    @property
+    def embedder(self) -> EmbeddingBatcher:
+        embedding_model = self.embedding_model
+        with self._lock:
+            if self._embedder is None:
+                self._embedder = EmbeddingBatcher(
+                    embedding_model,
+                    batch_size=self.config.EMBEDDING_BATCH_SIZE,
+                    cache_size=self.config.EMBEDDING_CACHE_SIZE,
+                )
+            return self._embedder
+
+    @property
+    def prompt_cache(self) -> PromptCache:
+        with self._lock:
+            if self._prompt_cache is None:
+                self._prompt_cache = build_prompt_cache(
+                    self.config.PROMPT_CACHE,
+                    model=self.config.LLM_MODEL,
+                    ttl_seconds=self.config.PROMPT_CACHE_TTL_SECONDS,
+                    min_tokens=self.config.PROMPT_CACHE_MIN_TOKENS,
+                    cached_token_rate=self.config.PROMPT_CACHE_CACHED_TOKEN_RATE,
+                )
+            return self._prompt_cache
+
+    def set_clients(self, ytt_api=None, embedding_model=None, llm=None,
+                    translator_factory=None, translation_delay=None, prompt_cache=None):
+        """Replace clients (e.g. with local fakes); the batcher is rebuilt"""
+        with self._lock:
+            if prompt_cache is not None:
+                self._prompt_cache = prompt_cache
+            if translator_factory is not None:
+                self._translator_factory = translator_factory
+            if translation_delay is not None:
+                self.translation_delay = translation_delay
+            if ytt_api is not None:
+                self._ytt_api = ytt_api
+            if embedding_model is not None:
+                self._embedding_model = embedding_model
+                self._embedder = None
+            if llm is not None:
+                self._llm = llm
+
+
+_shared_pools: Dict[Tuple, ClientPool] = {}
+_shared_pools_lock = threading.Lock()
+
+
+def get_client_pool(config: Config = None) -> ClientPool:
+    """Get the process-wide pool for the given configuration's models"""
+    config = config or Config()
+    key = (config.EMBEDDING_MODEL, config.LLM_MODEL, config.LLM_TEMPERATURE)
+    with _shared_pools_lock:
+        pool = _shared_pools.get(key)
+        if pool is None:
+            pool = _shared_pools[key] = ClientPool(config)
+        return pool
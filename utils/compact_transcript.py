@@ -0,0 +1,174 @@
+"""
+Compact storage for caption segments.
+A transcript is kept as one UTF-8 buffer holding the segment texts joined by
+single spaces (so the buffer decodes to the joined transcript), plus NumPy
+arrays of each segment's byte offset, character offset, start time and
+duration. That is a few dozen bytes per segment instead of a Python object,
+a string and two floats each, and the arrays can be saved and memory-mapped
+back without copying.
+"""
+
+import os
+from collections import namedtuple
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, Iterable, List
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# One caption segment, as returned by CompactTranscript[i]
+TranscriptSegment = namedtuple("TranscriptSegment", ["text", "start", "duration"])
+
+_FILES = ("text", "offsets", "times")
+
+
+def _field(item, name: str):
+    return item[name] if isinstance(item, dict) else getattr(item, name)
+
+
+class CompactTranscript(Sequence):
+    """
+    Immutable sequence of caption segments backed by flat arrays.
+
+    Indexing returns TranscriptSegment tuples; slicing returns a view that
+    shares the buffer.
+
+    Parameters:
+        buffer (array): uint8 UTF-8 bytes of the texts joined by spaces.
+        offsets (array): (n + 1, 2) int64 byte and character offsets where each
+            segment starts; row n is one past the end (including a final space).
+        times (array): (n, 2) float64 start and duration of each segment.
+
+    Example:
+        >>> transcript = CompactTranscript.from_segments(fetched_snippets)
+        >>> transcript.text[:20]
+        'welcome back to the '
+        >>> transcript.segments_at([0, 500])
+        array([ 0, 12])
+    """
+
+    def __init__(self, buffer, offsets, times):
+        self.buffer = buffer
+        self.offsets = offsets
+        self.times = times
+
+    @classmethod
+    def from_segments(cls, segments: Iterable) -> "CompactTranscript":
+        """Build from objects (or dicts) with text, start and duration"""
+        import numpy as np
+
+        segments = segments if isinstance(segments, (list, tuple)) else list(segments)
+        texts = [_field(item, "text") for item in segments]
+        encoded = [text.encode("utf-8") for text in texts]
+
+        offsets = np.zeros((len(segments) + 1, 2), dtype=np.int64)
+        np.cumsum([len(data) + 1 for data in encoded], out=offsets[1:, 0])
+        np.cumsum([len(text) + 1 for text in texts], out=offsets[1:, 1])
+        times = np.array([(_field(item, "start"), _field(item, "duration")) for item in segments],
+                         dtype=np.float64).reshape(-1, 2)
+        buffer = np.frombuffer(b" ".join(encoded), dtype=np.uint8)
+        return cls(buffer, offsets, times)
+
+    # ---- Sequence interface ----
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            stop = max(stop, start)
+            return CompactTranscript(self.buffer, self.offsets[start:stop + 1], self.times[start:stop])
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("segment index out of range")
+        return TranscriptSegment(self._text(index), float(self.times[index, 0]),
+                                 float(self.times[index, 1]))
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def _text(self, index: int) -> str:
+        lo, hi = self.offsets[index, 0], self.offsets[index + 1, 0] - 1
+        return self.buffer[lo:hi].tobytes().decode("utf-8")
+
+    # ---- Whole-transcript views ----
+
+    @property
+    def text(self) -> str:
+        """The segment texts joined by single spaces"""
+        if not len(self):
+            return ""
+        return self.buffer[self.offsets[0, 0]:self.offsets[-1, 0] - 1].tobytes().decode("utf-8")
+
+    def texts(self) -> List[str]:
+        return [self._text(index) for index in range(len(self))]
+
+    @property
+    def char_offsets(self) -> "np.ndarray":
+        """Where each segment starts in text (plus one past the end), in characters"""
+        return self.offsets[:, 1] - self.offsets[0, 1]
+
+    @property
+    def starts(self) -> "np.ndarray":
+        return self.times[:, 0]
+
+    @property
+    def ends(self) -> "np.ndarray":
+        return self.times[:, 0] + self.times[:, 1]
+
+    @property
+    def duration(self) -> float:
+        """End of the last segment in seconds (0 when empty)"""
+        return float(self.ends[-1]) if len(self) else 0.0
+
+    def segments_at(self, positions) -> "np.ndarray":
+        """
+        Segment holding each character position of text (the space after a
+        segment belongs to it); -1 for positions past the end.
+        """
+        import numpy as np
+
+        positions = np.asarray(positions, dtype=np.int64)
+        char_offsets = self.char_offsets
+        segments = np.searchsorted(char_offsets, positions, side="right") - 1
+        return np.where((positions >= 0) & (positions < char_offsets[-1]), segments, -1)
+
+    @property
+    def nbytes(self) -> int:
+        return self.buffer.nbytes + self.offsets.nbytes + self.times.nbytes
+
+    # ---- Persistence ----
+
+    def save(self, directory: str, name: str = "transcript"):
+        """Write the arrays as .npy files (atomically replacing earlier ones)"""
+        import numpy as np
+
+        os.makedirs(directory, exist_ok=True)
+        arrays = dict(zip(_FILES, (self.buffer[self.offsets[0, 0]:self.offsets[-1, 0]],
+                                   self.offsets - self.offsets[0], self.times)))
+        for suffix, array in arrays.items():
+            path = os.path.join(directory, f"{name}.{suffix}.npy")
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.save(f, np.ascontiguousarray(array))
+            os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, directory: str, name: str = "transcript", mmap: bool = True) -> "CompactTranscript":
+        """Read arrays written by save(); with mmap=True they are memory-mapped read-only"""
+        import numpy as np
+
+        mode = "r" if mmap else None
+        buffer, offsets, times = (np.load(os.path.join(directory, f"{name}.{suffix}.npy"),
+                                          mmap_mode=mode) for suffix in _FILES)
+        return cls(buffer, offsets, times)
+
+    @staticmethod
+    def exists(directory: str, name: str = "transcript") -> bool:
+        return all(os.path.exists(os.path.join(directory, f"{name}.{suffix}.npy"))
+                   for suffix in _FILES)
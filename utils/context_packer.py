@@ -0,0 +1,115 @@
+"""
+Token-budgeted prompt context from retrieved chunks.
+Neighbouring chunks overlap (by whole caption segments, or by CHUNK_OVERLAP
+characters for translated text), so retrieved chunks that are adjacent in
+the transcript are merged by their offsets (start_index metadata) and the
+repeated text is sent once. Merged spans are then added in relevance order
+until the token budget is used, and laid out in transcript order so the
+model reads them as they were spoken.
+"""
+
+from typing import List, Tuple
+
+from .token_utils import count_tokens, truncate_to_tokens
+
+# Spans that would be cut to fewer tokens than this are left out instead
+MIN_PARTIAL_TOKENS = 50
+
+
+class _Span:
+    __slots__ = ("start", "end", "text", "rank")
+
+    def __init__(self, start, end, text, rank):
+        self.start = start
+        self.end = end
+        self.text = text
+        self.rank = rank
+
+
+def _merge_spans(docs: List) -> List[_Span]:
+    """Merge chunks that overlap or touch in the transcript"""
+    spans, unplaced = [], []
+    for rank, doc in enumerate(docs):
+        metadata = getattr(doc, "metadata", None) or {}
+        start = metadata.get("start_index")
+        if start is None:
+            unplaced.append(_Span(None, None, doc.page_content, rank))
+        else:
+            spans.append(_Span(start, start + len(doc.page_content), doc.page_content, rank))
+
+    spans.sort(key=lambda span: (span.start, -span.end))
+    merged: List[_Span] = []
+    for span in spans:
+        previous = merged[-1] if merged else None
+        if previous is None or span.start > previous.end + 1:
+            merged.append(span)
+            continue
+        previous.rank = min(previous.rank, span.rank)
+        if span.end <= previous.end:
+            continue  # Contained (or duplicate) chunk
+        overlap = previous.end - span.start
+        if overlap > 0 and previous.text[-overlap:] != span.text[:overlap]:
+            # Offsets don't match the text (e.g. repeated phrases); keep both whole
+            merged.append(span)
+            continue
+        joiner = " " if overlap < 0 else ""
+        previous.text += joiner + span.text[max(overlap, 0):]
+        previous.end = span.end
+
+    # Chunks without offsets are only deduplicated by exact text
+    seen = {span.text for span in merged}
+    for span in unplaced:
+        if span.text not in seen:
+            seen.add(span.text)
+            merged.append(span)
+    return merged
+
+
+def pack_context(docs: List, max_tokens: int = 0, separator: str = "\n\n") -> Tuple[str, dict]:
+    """
+    Build the prompt context from retrieved documents (best first).
+
+    Parameters:
+        docs (list): Documents with page_content and optional start_index metadata.
+        max_tokens (int): Token budget for the context (0 = unlimited).
+        separator (str): Placed between spans that are not contiguous.
+
+    Returns:
+        tuple: (context text, stats) where stats has the chunk and span counts,
+        tokens_before (plain concatenation), tokens_after and tokens_saved.
+
+    Example:
+        >>> context, stats = pack_context(retrieved_docs, max_tokens=1500)
+        >>> stats["tokens_saved"]
+        212
+    """
+    tokens_before = count_tokens(separator.join(doc.page_content for doc in docs))
+    spans = _merge_spans(docs)
+
+    selected, used = [], 0
+    separator_tokens = count_tokens(separator)
+    for span in sorted(spans, key=lambda span: span.rank):
+        tokens = count_tokens(span.text)
+        cost = tokens + (separator_tokens if selected else 0)
+        if max_tokens and used + cost > max_tokens:
+            remaining = max_tokens - used - (separator_tokens if selected else 0)
+            if selected and remaining < MIN_PARTIAL_TOKENS:
+                continue
+            span.text = truncate_to_tokens(span.text, remaining)
+            if not span.text:
+                continue
+            cost = count_tokens(span.text) + (separator_tokens if selected else 0)
+        selected.append(span)
+        used += cost
+
+    # Transcript order; spans without offsets go last, by relevance
+    selected.sort(key=lambda span: (span.start is None, span.start or 0, span.rank))
+    context = separator.join(span.text for span in selected)
+    tokens_after = count_tokens(context)
+    return context, {
+        "chunks": len(docs),
+        "spans": len(selected),
+        "tokens_before": tokens_before,
+        "tokens_after": tokens_after,
+        "tokens_saved": max(tokens_before - tokens_after, 0),
+    }
@@ -0,0 +1,275 @@
+"""
+Bounded per-session conversation memory.
+Each session keeps its most recent turns verbatim and older turns folded into
+a rolling summary, so the history sent with a question stays within a token
+budget however long the conversation runs. Sessions expire after a period of
+inactivity and the least recently used are dropped beyond a session cap, so
+memory stays bounded across thousands of sessions.
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, List, Optional, Tuple
+
+from .token_utils import count_tokens, truncate_to_tokens
+from .logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+# (question, answer)
+Turn = Tuple[str, str]
+
+# Words that only make sense with the earlier conversation
+_FOLLOW_UP_PATTERN = re.compile(
+    r"\b(it|its|that|this|those|these|they|them|their|he|she|him|her|his|"
+    r"above|previous|earlier|again|more|else|further|continue|elaborate|"
+    r"(first|second|third|fourth|fifth|last|next|other) (one|point|step|part|example|thing))\b",
+    re.IGNORECASE)
+FOLLOW_UP_MAX_WORDS = 4
+
+
+def is_follow_up(question: str) -> bool:
+    """
+    True if a question likely refers back to the conversation.
+
+    Example:
+        >>> is_follow_up("Explain the second point more")
+        True
+        >>> is_follow_up("What is backpropagation used for in neural networks?")
+        False
+    """
+    return (len(question.split()) <= FOLLOW_UP_MAX_WORDS
+            or _FOLLOW_UP_PATTERN.search(question) is not None)
+
+
+def format_turns(turns: List[Turn]) -> str:
+    """Turns as 'User: ...' / 'Assistant: ...' lines"""
+    return "\n".join(f"User: {question}\nAssistant: {answer}" for question, answer in turns)
+
+
+def summarize_turns(summary: str, turns: List[Turn], max_tokens: int) -> str:
+    """
+    Summary without an LLM: the earlier summary plus the folded questions,
+    keeping the most recent text within max_tokens.
+    """
+    lines = [summary] if summary else []
+    lines += [f"User asked: {question}" for question, _ in turns]
+    text = "\n".join(lines)
+    if count_tokens(text) <= max_tokens:
+        return text
+    # Drop the oldest lines first
+    while len(lines) > 1 and count_tokens("\n".join(lines)) > max_tokens:
+        lines.pop(0)
+    return truncate_to_tokens("\n".join(lines), max_tokens)
+
+
+class _Conversation:
+    __slots__ = ("video_id", "summary", "turns", "turn_tokens", "updated_at", "compacting")
+
+    def __init__(self, video_id, now):
+        self.video_id = video_id
+        self.summary = ""
+        self.turns: List[Turn] = []
+        self.turn_tokens: List[int] = []
+        self.updated_at = now
+        self.compacting = False
+
+    def tokens(self) -> int:
+        return count_tokens(self.summary) + sum(self.turn_tokens)
+
+
+class ConversationStore:
+    """
+    Conversation history keyed by session id.
+
+    Parameters:
+        ttl_seconds (float): Sessions idle for longer are discarded (0 = never).
+        max_sessions (int): Most sessions kept; least recently used go first (0 = unlimited).
+        max_tokens (int): Token budget of one session's history (summary + recent turns).
+        recent_turns (int): Turns kept verbatim; older ones are folded into the summary.
+        clock (callable): Time source (seconds).
+
+    Example:
+        >>> store = ConversationStore(ttl_seconds=1800, max_tokens=1000)
+        >>> history = store.get_history(session_id, video_id)
+        >>> answer = chatbot.ask(question, history=history)
+        >>> if store.add_turn(session_id, video_id, question, answer):
+        ...     store.compact(session_id, chatbot.summarize_conversation)
+    """
+
+    def __init__(self, ttl_seconds: float = 1800.0, max_sessions: int = 10000,
+                 max_tokens: int = 1000, recent_turns: int = 3,
+                 clock: Callable[[], float] = time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self.max_tokens = max_tokens
+        self.recent_turns = max(recent_turns, 1)
+        self.clock = clock
+
+        self._sessions = OrderedDict()  # session_id -> _Conversation, least recent first
+        self._lock = threading.Lock()
+
+        # Stats
+        self.expired = 0
+        self.evicted = 0
+        self.compactions = 0
+
+    @property
+    def summary_max_tokens(self) -> int:
+        return max(self.max_tokens // 3, 1)
+
+    def _evict(self, now: float):
+        """Drop expired sessions, then the least recently used beyond the cap"""
+        if self.ttl_seconds:
+            while self._sessions:
+                conversation = next(iter(self._sessions.values()))
+                if now - conversation.updated_at <= self.ttl_seconds:
+                    break
+                self._sessions.popitem(last=False)
+                self.expired += 1
+        while self.max_sessions and len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+            self.evicted += 1
+
+    def _get(self, session_id: str, video_id: Optional[str], now: float) -> Optional[_Conversation]:
+        self._evict(now)
+        conversation = self._sessions.get(session_id)
+        if conversation is not None and video_id is not None and conversation.video_id != video_id:
+            # The session moved on to another video; its history no longer applies
+            del self._sessions[session_id]
+            return None
+        return conversation
+
+    def get_history(self, session_id: str, video_id: Optional[str] = None) -> str:
+        """
+        The session's history as prompt text ("" for a new or expired session).
+
+        Returns:
+            str: Summary of earlier turns followed by the recent turns verbatim,
+            within max_tokens.
+        """
+        with self._lock:
+            conversation = self._get(session_id, video_id, self.clock())
+            if conversation is None:
+                return ""
+            summary = conversation.summary
+            turns = list(conversation.turns)
+            turn_tokens = list(conversation.turn_tokens)
+
+        # Over budget until a pending compaction finishes: drop the oldest turns
+        if self.max_tokens:
+            budget = self.max_tokens - count_tokens(summary)
+            while len(turns) > 1 and sum(turn_tokens) > budget:
+                turns.pop(0)
+                turn_tokens.pop(0)
+
+        parts = [f"Summary of the earlier conversation: {summary}"] if summary else []
+        if turns:
+            parts.append(format_turns(turns))
+        history = "\n".join(parts)
+        return truncate_to_tokens(history, self.max_tokens) if self.max_tokens else history
+
+    def add_turn(self, session_id: str, video_id: Optional[str], question: str, answer: str) -> bool:
+        """
+        Record a question and its answer.
+
+        Returns:
+            bool: True if the history is over its budget and compact() should run.
+        """
+        now = self.clock()
+        with self._lock:
+            conversation = self._get(session_id, video_id, now)
+            if conversation is None:
+                conversation = _Conversation(video_id, now)
+                self._sessions[session_id] = conversation
+            conversation.turns.append((question, answer))
+            conversation.turn_tokens.append(count_tokens(question) + count_tokens(answer))
+            conversation.updated_at = now
+            self._sessions.move_to_end(session_id)
+            self._evict(now)
+            return self._needs_compaction(conversation)
+
+    def _needs_compaction(self, conversation: _Conversation) -> bool:
+        return len(conversation.turns) > 1 and (
+            len(conversation.turns) > self.recent_turns
+            or bool(self.max_tokens and conversation.tokens() > self.max_tokens))
+
+    def compact(self, session_id: str,
+                summarizer: Optional[Callable[[str, List[Turn]], str]] = None) -> bool:
+        """
+        Fold the older turns of a session into its summary.
+
+        The summarizer (e.g. an LLM call) runs without holding the store lock;
+        the session keeps answering with its full history until it finishes.
+
+        Parameters:
+            session_id (str): Session to compact.
+            summarizer (callable): (summary, turns) -> new summary. Defaults to
+                summarize_turns, which keeps the earlier questions.
+
+        Returns:
+            bool: True if turns were folded into the summary.
+        """
+        with self._lock:
+            conversation = self._sessions.get(session_id)
+            if conversation is None or conversation.compacting or not self._needs_compaction(conversation):
+                return False
+            # Keep the recent turns, and fold more while they alone exceed the budget
+            fold = len(conversation.turns) - self.recent_turns
+            recent_budget = self.max_tokens - self.summary_max_tokens if self.max_tokens else 0
+            while (recent_budget and fold < len(conversation.turns) - 1
+                   and sum(conversation.turn_tokens[max(fold, 0):]) > recent_budget):
+                fold += 1
+            fold = max(fold, 1)
+            summary, folded = conversation.summary, conversation.turns[:fold]
+            conversation.compacting = True
+
+        new_summary = None
+        if summarizer is not None:
+            try:
+                new_summary = summarizer(summary, folded)
+            except Exception as e:
+                logger.warning("⚠️ Conversation summary failed (%s); keeping earlier questions", e)
+        if not new_summary:
+            new_summary = summarize_turns(summary, folded, self.summary_max_tokens)
+        new_summary = truncate_to_tokens(new_summary.strip(), self.summary_max_tokens)
+
+        with self._lock:
+            # Turns are only appended meanwhile, so the folded ones are still first
+            conversation.summary = new_summary
+            del conversation.turns[:fold]
+            del conversation.turn_tokens[:fold]
+            conversation.compacting = False
+            self.compactions += 1
+        return True
+
+    def clear(self, session_id: str) -> bool:
+        """Forget a session; returns False if it did not exist"""
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def __contains__(self, session_id) -> bool:
+        with self._lock:
+            self._evict(self.clock())
+            return session_id in self._sessions
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._evict(self.clock())
+            return len(self._sessions)
+
+    def get_stats(self) -> dict:
+        """Live sessions, their history tokens and eviction counts"""
+        with self._lock:
+            self._evict(self.clock())
+            return {
+                "sessions": len(self._sessions),
+                "history_tokens": sum(conversation.tokens() for conversation in self._sessions.values()),
+                "max_sessions": self.max_sessions,
+                "ttl_seconds": self.ttl_seconds,
+                "expired": self.expired,
+                "evicted": self.evicted,
+                "compactions": self.compactions,
+            }
@@ -0,0 +1,182 @@
+"""
+Incremental dashboard aggregation.
+Keeps running totals that are updated when a video is processed, a question is
+asked or a video is removed, so the dashboard never has to walk every video.
+Backed by SQLite so all worker processes report the same numbers.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+
+class DashboardAggregator:
+    """
+    Running dashboard totals plus a per-video summary table for paging.
+
+    Parameters:
+        db_path (str): SQLite database file (can be shared with VideoRegistry).
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._local = threading.local()
+
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS dashboard_videos (
+                    video_id TEXT PRIMARY KEY,
+                    processed_at REAL NOT NULL,
+                    processing_time REAL NOT NULL DEFAULT 0,
+                    word_count INTEGER NOT NULL DEFAULT 0,
+                    questions_asked INTEGER NOT NULL DEFAULT 0,
+                    analytics TEXT NOT NULL,
+                    sentiment TEXT NOT NULL
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS dashboard_videos_processed_at ON dashboard_videos (processed_at)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS dashboard_totals (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    total_videos INTEGER NOT NULL DEFAULT 0,
+                    total_questions INTEGER NOT NULL DEFAULT 0,
+                    total_processing_time REAL NOT NULL DEFAULT 0,
+                    total_words INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            conn.execute("INSERT OR IGNORE INTO dashboard_totals (id) VALUES (1)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30.0)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def record_video_processed(self, video_id: str, analytics: dict, sentiment: dict):
+        """Add (or replace) a video's contribution to the totals"""
+        video_stats = analytics.get("video_stats", {})
+        processing_time = float(video_stats.get("processing_time", 0) or 0)
+        word_count = int(video_stats.get("word_count", 0) or 0)
+
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            old = conn.execute(
+                "SELECT processing_time, word_count, questions_asked FROM dashboard_videos WHERE video_id = ?",
+                (video_id,),
+            ).fetchone()
+            questions = old["questions_asked"] if old else 0
+            conn.execute(
+                """INSERT OR REPLACE INTO dashboard_videos
+                   (video_id, processed_at, processing_time, word_count, questions_asked, analytics, sentiment)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                (video_id, video_stats.get("processed_at") or time.time(), processing_time,
+                 word_count, questions, json.dumps(analytics), json.dumps(sentiment)),
+            )
+            conn.execute(
+                """UPDATE dashboard_totals SET
+                       total_videos = total_videos + ?,
+                       total_processing_time = total_processing_time + ?,
+                       total_words = total_words + ?
+                   WHERE id = 1""",
+                (0 if old else 1,
+                 processing_time - (old["processing_time"] if old else 0),
+                 word_count - (old["word_count"] if old else 0)),
+            )
+
+    def record_question(self, video_id: str, count: int = 1):
+        """
+        Count answered questions for a video.
+
+        A video still being indexed gets a placeholder row, which
+        record_video_processed fills in once the video is fully indexed.
+        """
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            inserted = conn.execute(
+                """INSERT OR IGNORE INTO dashboard_videos
+                   (video_id, processed_at, analytics, sentiment) VALUES (?, ?, '{}', '{}')""",
+                (video_id, time.time()),
+            ).rowcount
+            conn.execute(
+                "UPDATE dashboard_videos SET questions_asked = questions_asked + ? WHERE video_id = ?",
+                (count, video_id),
+            )
+            conn.execute(
+                """UPDATE dashboard_totals SET
+                       total_videos = total_videos + ?,
+                       total_questions = total_questions + ?
+                   WHERE id = 1""",
+                (inserted, count),
+            )
+
+    def record_video_removed(self, video_id: str):
+        """Subtract a removed video's contribution from the totals"""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            old = conn.execute(
+                "SELECT processing_time, word_count, questions_asked FROM dashboard_videos WHERE video_id = ?",
+                (video_id,),
+            ).fetchone()
+            if old is None:
+                return
+            conn.execute("DELETE FROM dashboard_videos WHERE video_id = ?", (video_id,))
+            conn.execute(
+                """UPDATE dashboard_totals SET
+                       total_videos = total_videos - 1,
+                       total_questions = total_questions - ?,
+                       total_processing_time = total_processing_time - ?,
+                       total_words = total_words - ?
+                   WHERE id = 1""",
+                (old["questions_asked"], old["processing_time"], old["word_count"]),
+            )
+
+    def get_system_stats(self) -> dict:
+        """Totals across every video (a single-row read)"""
+        row = self._connect().execute(
+            "SELECT * FROM dashboard_totals WHERE id = 1").fetchone()
+        total_videos = row["total_videos"]
+        return {
+            "total_videos": total_videos,
+            "total_questions_asked": row["total_questions"],
+            "avg_processing_time": row["total_processing_time"] / total_videos if total_videos else 0,
+            "total_words_processed": row["total_words"],
+        }
+
+    def get_videos(self, page: int = 1, page_size: int = 20) -> list:
+        """Per-video detail, most recently processed first"""
+        rows = self._connect().execute(
+            """SELECT video_id, questions_asked, analytics, sentiment FROM dashboard_videos
+               ORDER BY processed_at DESC LIMIT ? OFFSET ?""",
+            (page_size, (max(page, 1) - 1) * page_size),
+        ).fetchall()
+
+        return [self._row_to_video(row) for row in rows]
+
+    def get_video(self, video_id: str) -> Optional[dict]:
+        """Stored detail for a single video"""
+        row = self._connect().execute(
+            "SELECT video_id, questions_asked, analytics, sentiment FROM dashboard_videos WHERE video_id = ?",
+            (video_id,),
+        ).fetchone()
+        return self._row_to_video(row) if row else None
+
+    @staticmethod
+    def _row_to_video(row) -> dict:
+        analytics = json.loads(row["analytics"])
+        # The live counter is kept in its own column
+        analytics.setdefault("interaction_stats", {})[
+            "total_questions"] = row["questions_asked"]
+        return {
+            "video_id": row["video_id"],
+            "analytics": analytics,
+            "sentiment": json.loads(row["sentiment"]),
+            # Placeholder rows have no analytics until indexing finishes
+            "status": "ready" if "video_stats" in analytics else "processing",
+        }
@@ -0,0 +1,158 @@
+"""
+Batched, cached embedding calls.
+Groups texts into embed_documents() requests and remembers vectors it has
+already computed, so re-ingesting overlapping content does not hit the API.
+"""
+
+import hashlib
+import inspect
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, List, Optional
+
+if TYPE_CHECKING:
+    import numpy as np
+
+from .retry_utils import embedding_retry
+from .logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+# Task type that makes embed_documents() embed texts as search queries
+QUERY_TASK_TYPE = "RETRIEVAL_QUERY"
+
+
+class EmbeddingBatcher:
+    """
+    Thread-safe wrapper around an embedding model that batches and caches calls.
+
+    Parameters:
+        embedding_model: A LangChain Embeddings instance.
+        batch_size (int): Maximum texts per embed_documents() request.
+        cache_size (int): Maximum number of vectors kept in the LRU cache (0 disables).
+    """
+
+    def __init__(self, embedding_model, batch_size: int = 50, cache_size: int = 2000):
+        self.embedding_model = embedding_model
+        self.batch_size = max(int(batch_size), 1)
+        self.cache_size = max(int(cache_size), 0)
+
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._task_type_supported = None
+
+        # Counters for throughput reports
+        self.api_calls = 0
+        self.texts_embedded = 0
+        self.cache_hits = 0
+        self.failed_texts = 0
+
+    @staticmethod
+    def _cache_key(text: str) -> str:
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    def embed_texts(self, texts: List[str]) -> List[Optional["np.ndarray"]]:
+        """
+        Embed texts, returning one float32 vector per text (None if it failed).
+
+        Cached texts are served without an API call; the rest are sent in
+        batches of batch_size. If a batch fails after retries, its texts are
+        retried one by one so a single bad chunk does not lose the whole batch.
+        """
+        results: List[Optional["np.ndarray"]] = [None] * len(texts)
+        misses = []
+
+        with self._lock:
+            for i, text in enumerate(texts):
+                key = self._cache_key(text)
+                vector = self._cache.get(key)
+                if vector is not None:
+                    self._cache.move_to_end(key)
+                    self.cache_hits += 1
+                    results[i] = vector
+                else:
+                    misses.append(i)
+
+        for start in range(0, len(misses), self.batch_size):
+            batch = misses[start:start + self.batch_size]
+            batch_texts = [texts[i] for i in batch]
+            try:
+                vectors = self._embed_batch(batch_texts)
+            except Exception as e:
+                logger.warning("⚠️ Embedding batch failed (%s), retrying chunks individually", e)
+                vectors = []
+                for text in batch_texts:
+                    try:
+                        vectors.append(self._embed_batch([text])[0])
+                    except Exception as text_error:
+                        logger.error("❌ Skipped chunk: %s", text_error)
+                        vectors.append(None)
+
+            for i, vector in zip(batch, vectors):
+                results[i] = vector
+            self._remember(batch_texts, vectors)
+
+        return results
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a search query (queries use the model's query task type)"""
+        with self._lock:
+            self.api_calls += 1
+        return embedding_retry(self.embedding_model.embed_query, text)
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed several search queries in one request.
+
+        Needs a model whose embed_documents takes a task_type (as Gemini's
+        does) to mark the texts as queries; other models get one
+        embed_query() call per text.
+        """
+        if len(texts) <= 1 or not self._supports_task_type():
+            return [self.embed_query(text) for text in texts]
+        with self._lock:
+            self.api_calls += 1
+        return embedding_retry(self.embedding_model.embed_documents, list(texts),
+                               task_type=QUERY_TASK_TYPE)
+
+    def _supports_task_type(self) -> bool:
+        if self._task_type_supported is None:
+            try:
+                parameters = inspect.signature(self.embedding_model.embed_documents).parameters
+                self._task_type_supported = "task_type" in parameters
+            except (TypeError, ValueError):
+                self._task_type_supported = False
+        return self._task_type_supported
+
+    def _embed_batch(self, texts: List[str]) -> List["np.ndarray"]:
+        import numpy as np
+
+        with self._lock:
+            self.api_calls += 1
+        vectors = embedding_retry(self.embedding_model.embed_documents, texts)
+        return [np.asarray(vector, dtype=np.float32) for vector in vectors]
+
+    def _remember(self, texts: List[str], vectors: List[Optional["np.ndarray"]]):
+        with self._lock:
+            for text, vector in zip(texts, vectors):
+                if vector is None:
+                    self.failed_texts += 1
+                    continue
+                self.texts_embedded += 1
+                if self.cache_size:
+                    key = self._cache_key(text)
+                    self._cache[key] = vector
+                    self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def get_stats(self) -> dict:
+        """Counters describing how much work the batcher did and saved"""
+        with self._lock:
+            return {
+                "api_calls": self.api_calls,
+                "texts_embedded": self.texts_embedded,
+                "cache_hits": self.cache_hits,
+                "failed_texts": self.failed_texts,
+                "cached_vectors": len(self._cache),
+            }
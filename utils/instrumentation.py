@@ -0,0 +1,261 @@
+"""
+Lightweight pipeline instrumentation.
+Spans time each stage (fetch, translate, split, embed, index, retrieve, llm)
+into histograms, counters track volumes, and everything can be rendered in the
+Prometheus text format. Spans opened while handling an HTTP request are also
+collected per request so they can be returned in a Server-Timing header.
+
+When instrumentation is disabled, span() returns a shared no-op object and
+incr()/observe() return immediately, so the hooks cost a function call.
+"""
+
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Latency buckets in seconds (Prometheus "le" bounds)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_enabled = True
+
+# Per-request list of (stage, seconds), set by the HTTP middleware
+_request_timings: contextvars.ContextVar[Optional[List[Tuple[str, float]]]] = \
+    contextvars.ContextVar("request_timings", default=None)
+
+
+def set_enabled(enabled: bool):
+    """Turn instrumentation on or off for the whole process"""
+    global _enabled
+    _enabled = bool(enabled)
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: dict) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "total", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Thread-safe store of counters and histograms keyed by name and labels"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, _Histogram]] = {}
+        self._help: Dict[str, str] = {}
+        self._collectors: List[Callable[[], Iterable[Tuple[str, dict, float]]]] = []
+
+    def describe(self, name: str, help_text: str):
+        self._help[name] = help_text
+
+    def incr(self, name: str, value: float = 1.0, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, buckets: Tuple[float, ...] = DEFAULT_BUCKETS, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram(buckets)
+            histogram.observe(value)
+
+    def register_collector(self, collector: Callable[[], Iterable[Tuple[str, dict, float]]]):
+        """
+        Add a callable that yields (name, labels, value) gauges at scrape time,
+        for numbers that are already tracked elsewhere (e.g. retry metrics).
+        """
+        self._collectors.append(collector)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def snapshot(self) -> dict:
+        """Counters plus histogram count/sum/mean, for JSON reports"""
+        with self._lock:
+            counters = {name: {_format_labels(k) or "total": v for k, v in series.items()}
+                        for name, series in self._counters.items()}
+            histograms = {
+                name: {_format_labels(k) or "total": {
+                    "count": h.count,
+                    "sum": round(h.total, 6),
+                    "mean": round(h.total / h.count, 6) if h.count else 0.0,
+                } for k, h in series.items()}
+                for name, series in self._histograms.items()
+            }
+        return {"counters": counters, "histograms": histograms}
+
+    def render_prometheus(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                self._header(lines, name, "counter")
+                for key, value in series.items():
+                    lines.append(f"{_series(name, key)} {value:g}")
+
+            for name, series in sorted(self._histograms.items()):
+                self._header(lines, name, "histogram")
+                for key, histogram in series.items():
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets + (float("inf"),), histogram.counts):
+                        cumulative += count
+                        le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                        lines.append(f"{_series(name + '_bucket', key + (('le', le),))} {cumulative}")
+                    lines.append(f"{_series(name + '_sum', key)} {histogram.total:.6f}")
+                    lines.append(f"{_series(name + '_count', key)} {histogram.count}")
+
+        gauges: Dict[str, List[str]] = {}
+        for collector in self._collectors:
+            for name, labels, value in collector():
+                gauges.setdefault(name, []).append(
+                    f"{_series(name, _label_key(labels))} {float(value):g}")
+        for name, samples in sorted(gauges.items()):
+            self._header(lines, name, "gauge")
+            lines.extend(samples)
+
+        return "\n".join(lines) + "\n"
+
+    def _header(self, lines: List[str], name: str, metric_type: str):
+        if name in self._help:
+            lines.append(f"# HELP {name} {self._help[name]}")
+        lines.append(f"# TYPE {name} {metric_type}")
+
+
+def _format_labels(key: LabelKey) -> str:
+    return ",".join(f'{k}="{v}"' for k, v in key)
+
+
+def _series(name: str, key: LabelKey) -> str:
+    return f"{name}{{{_format_labels(key)}}}" if key else name
+
+
+metrics = MetricsRegistry()
+metrics.describe("stage_duration_seconds", "Time spent in each pipeline stage")
+metrics.describe("http_request_duration_seconds", "HTTP request latency by route")
+
+
+class _Span:
+    __slots__ = ("name", "labels", "started_at")
+
+    def __init__(self, name: str, labels: dict):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.started_at = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.started_at
+        metrics.observe("stage_duration_seconds", elapsed, stage=self.name, **self.labels)
+        if exc_type is not None:
+            metrics.incr("stage_errors_total", stage=self.name)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.append((self.name, elapsed))
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def span(name: str, **labels):
+    """
+    Time a block of code as a pipeline stage.
+
+    Example:
+        >>> with span("embed"):
+        ...     vectors = embedder.embed_texts(texts)
+    """
+    if not _enabled:
+        return _NOOP_SPAN
+    return _Span(name, labels)
+
+
+def timed(name: str):
+    """Decorator form of span()"""
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def incr(name: str, value: float = 1.0, **labels):
+    """Increase a counter"""
+    if _enabled:
+        metrics.incr(name, value, **labels)
+
+
+def observe(name: str, value: float, **labels):
+    """Record a value in a histogram"""
+    if _enabled:
+        metrics.observe(name, value, **labels)
+
+
+def start_request_timings() -> contextvars.Token:
+    """Begin collecting spans for the current request (see server_timing_header)"""
+    return _request_timings.set([])
+
+
+def finish_request_timings(token: contextvars.Token) -> List[Tuple[str, float]]:
+    timings = _request_timings.get() or []
+    _request_timings.reset(token)
+    return timings
+
+
+def server_timing_header(timings: List[Tuple[str, float]], total: Optional[float] = None) -> str:
+    """
+    Format spans as a Server-Timing header value, summing repeated stages.
+
+    Example:
+        >>> server_timing_header([("retrieve", 0.012), ("llm", 0.8)])
+        'retrieve;dur=12.0, llm;dur=800.0'
+    """
+    totals: Dict[str, float] = {}
+    for name, seconds in timings:
+        totals[name] = totals.get(name, 0.0) + seconds
+    if total is not None:
+        totals["total"] = total
+    return ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in totals.items())
@@ -0,0 +1,197 @@
+"""
+Structured, non-blocking logging.
+Log records are put on an in-memory queue by the calling thread and written
+by a background listener thread, so request handlers never wait on stdout.
+Records carry the current request id and can be emitted as JSON lines.
+Chatty low-level messages can be sampled so logging cost stays flat as the
+request rate grows.
+"""
+
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+import uuid
+from typing import Optional
+
+LOGGER_NAMESPACE = "youtube_chatbot"
+
+request_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "request_id", default=None)
+
+# Attributes every LogRecord has; anything else was passed through `extra`
+_RESERVED_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {
+    "message", "asctime", "request_id"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_setup_lock = threading.Lock()
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    Logger under the application namespace.
+
+    Example:
+        >>> logger = get_logger(__name__)
+        >>> logger.info("Video processed", extra={"video_id": video_id, "chunks": 42})
+    """
+    if name == LOGGER_NAMESPACE or name.startswith(LOGGER_NAMESPACE + "."):
+        return logging.getLogger(name)
+    return logging.getLogger(f"{LOGGER_NAMESPACE}.{name}")
+
+
+def new_request_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+def set_request_id(request_id: Optional[str]) -> contextvars.Token:
+    """Tag log records from the current context (request) with an id"""
+    return request_id_var.set(request_id)
+
+
+def reset_request_id(token: contextvars.Token):
+    request_id_var.reset(token)
+
+
+def get_request_id() -> Optional[str]:
+    return request_id_var.get()
+
+
+class RequestIdFilter(logging.Filter):
+    """Copy the current request id onto the record (runs in the calling thread)"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep only a fraction of records below `max_level`.
+
+    Sampling counts occurrences of each message template, so every kind of
+    message still shows up (its first occurrence always does) while a hot
+    message logged thousands of times a second is thinned out.
+
+    Parameters:
+        rate (float): Fraction of records to keep, between 0 and 1.
+        max_level (int): Records at or above this level are always kept.
+    """
+
+    def __init__(self, rate: float = 1.0, max_level: int = logging.WARNING):
+        super().__init__()
+        self.every = max(int(round(1 / rate)), 1) if rate > 0 else 0
+        self.max_level = max_level
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= self.max_level or self.every == 1:
+            return True
+        if self.every == 0:
+            return False
+
+        key = (record.name, record.msg)
+        with self._lock:
+            count = self._counts.get(key, 0)
+            self._counts[key] = count + 1
+        if count % self.every:
+            return False
+        record.sample_rate = 1 / self.every
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, including fields passed through `extra`"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            entry["request_id"] = request_id
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    """Human-readable lines for local development"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        timestamp = time.strftime("%H:%M:%S", time.localtime(record.created))
+        request_id = getattr(record, "request_id", None)
+        prefix = f"{timestamp} {record.levelname:<7} " + (f"[{request_id}] " if request_id else "")
+        line = prefix + record.getMessage()
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+
+def setup_logging(level: str = "INFO", fmt: str = "json", sample_rate: float = 1.0,
+                  stream=None) -> logging.Logger:
+    """
+    Route application logs through a queue to a background writer.
+
+    Safe to call more than once; later calls replace the previous setup.
+
+    Parameters:
+        level (str): Minimum level, e.g. "INFO" or "DEBUG".
+        fmt (str): "json" for JSON lines, "text" for readable output.
+        sample_rate (float): Fraction of DEBUG/INFO records to keep.
+        stream: Where to write (default: stdout).
+
+    Returns:
+        logging.Logger: The application root logger.
+    """
+    global _listener
+
+    with _setup_lock:
+        if _listener is not None:
+            _listener.stop()
+
+        log_queue = queue.SimpleQueue()
+        output = logging.StreamHandler(stream or sys.stdout)
+        output.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+
+        # Filters run on the QueueHandler, in the calling thread: sampled-out
+        # records never reach the queue and the request id is captured there
+        queue_handler = logging.handlers.QueueHandler(log_queue)
+        queue_handler.addFilter(RequestIdFilter())
+        if sample_rate < 1.0:
+            queue_handler.addFilter(SamplingFilter(sample_rate))
+
+        root = logging.getLogger(LOGGER_NAMESPACE)
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(queue_handler)
+        root.setLevel(level.upper())
+        root.propagate = False
+
+        _listener = logging.handlers.QueueListener(log_queue, output)
+        _listener.start()
+    return root
+
+
+def shutdown_logging():
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+atexit.register(shutdown_logging)
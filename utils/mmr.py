@@ -0,0 +1,87 @@
+"""
+Maximal marginal relevance (MMR) selection over retrieval candidates.
+Picks results one at a time, trading relevance to the query against
+similarity to what was already picked, so near-duplicate chunks from the same
+part of a video don't crowd out the rest. An optional time penalty also
+discourages picking chunks close in time to earlier picks.
+
+All pairwise similarities are computed with one matrix product; each pick
+then costs O(candidates).
+"""
+
+from typing import TYPE_CHECKING, List, Optional, Sequence
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+def _normalize_rows(vectors: "np.ndarray") -> "np.ndarray":
+    import numpy as np
+
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def mmr_select(relevance: Sequence[float], embeddings, k: int, lambda_mult: float = 0.5,
+               start_times: Optional[Sequence[float]] = None, time_penalty: float = 0.0,
+               time_scale: float = 60.0) -> List[int]:
+    """
+    Choose k candidates by maximal marginal relevance.
+
+    Each step picks the candidate maximizing
+        lambda_mult * relevance
+        - (1 - lambda_mult) * max cosine similarity to the picked candidates
+        - time_penalty * max exp(-|time gap| / time_scale) to the picked candidates
+
+    Parameters:
+        relevance (sequence): Relevance of each candidate to the query, on a
+            cosine-like 0..1 scale (e.g. query similarity, or fused scores
+            divided by their maximum).
+        embeddings: Candidate vectors, one row per candidate.
+        k (int): Number of candidates to pick.
+        lambda_mult (float): 1 = pure relevance, 0 = pure diversity.
+        start_times (sequence): Candidate start times in seconds (for the time penalty).
+        time_penalty (float): Weight of the time-proximity penalty (0 disables it).
+        time_scale (float): Seconds over which time proximity decays.
+
+    Returns:
+        list: Indexes of the picked candidates, in pick order.
+
+    Example:
+        >>> picks = mmr_select(scores, vectors, k=4, lambda_mult=0.7,
+        ...                    start_times=starts, time_penalty=0.2)
+    """
+    import numpy as np
+
+    relevance = np.asarray(relevance, dtype=np.float32)
+    n = len(relevance)
+    k = min(k, n)
+    if k <= 0:
+        return []
+
+    vectors = _normalize_rows(np.asarray(embeddings, dtype=np.float32))
+    similarity = vectors @ vectors.T
+
+    proximity = None
+    if time_penalty and start_times is not None:
+        times = np.asarray(start_times, dtype=np.float32)
+        proximity = np.exp(-np.abs(times[:, None] - times[None, :]) / max(time_scale, 1e-6))
+
+    max_similarity = np.full(n, -np.inf, dtype=np.float32)
+    max_proximity = np.zeros(n, dtype=np.float32)
+    available = np.ones(n, dtype=bool)
+    picks = [int(np.argmax(relevance))]
+
+    while True:
+        last = picks[-1]
+        available[last] = False
+        if len(picks) == k:
+            return picks
+        np.maximum(max_similarity, similarity[last], out=max_similarity)
+        score = lambda_mult * relevance - (1 - lambda_mult) * max_similarity
+        if proximity is not None:
+            np.maximum(max_proximity, proximity[last], out=max_proximity)
+            score -= time_penalty * max_proximity
+        score[~available] = -np.inf
+        picks.append(int(np.argmax(score)))
@@ -0,0 +1,302 @@
+"""
+Prompt prefix caching.
+RAG prompts are built as a stable prefix (the instruction block, then the
+retrieved context) and a variable suffix (conversation history and the
+question). A PromptCache decides how the prefix is sent:
+
+- PromptCache sends the whole prompt every time (no caching);
+- SimulatedPromptCache also sends the whole prompt, but tracks which
+  prefixes a provider-side cache would hold and bills them as cached, to
+  measure what caching would save without a provider;
+- GeminiContextCache stores prefixes that repeat with Gemini context caching
+  and sends only the suffix with a reference to the cached prefix.
+
+Every cache keeps the same counters, so the tokens saved are comparable.
+LLM calls go through llm_retry, so they share the "llm" rate limiter, 429
+pause and circuit breaker.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+
+from .token_utils import count_tokens
+from .instrumentation import incr
+from .logging_utils import get_logger
+from .retry_utils import llm_retry
+
+logger = get_logger(__name__)
+
+# Share of the input price billed for cached tokens (Gemini: 25%)
+DEFAULT_CACHED_TOKEN_RATE = 0.25
+
+
+def prefix_key(prefix: str) -> str:
+    return hashlib.sha1(prefix.encode("utf-8")).hexdigest()
+
+
+class PromptCache:
+    """
+    Base hook: sends prefix + suffix as one prompt and counts tokens.
+
+    Subclasses override _call() to reuse cached prefixes.
+
+    Parameters:
+        cached_token_rate (float): Share of the input price billed for cached tokens.
+    """
+
+    name = "none"
+
+    def __init__(self, cached_token_rate: float = DEFAULT_CACHED_TOKEN_RATE):
+        self.cached_token_rate = cached_token_rate
+        self._stats_lock = threading.Lock()
+
+        # Stats
+        self.requests = 0
+        self.hits = 0
+        self.prompt_tokens = 0
+        self.prefix_tokens = 0
+        self.cached_tokens = 0
+
+    def generate(self, llm, prefix: str, suffix: str):
+        """
+        Call the LLM with prefix + suffix.
+
+        Returns:
+            The LLM's response message.
+        """
+        prefix_tokens = count_tokens(prefix)
+        message, cached_tokens = self._call(llm, prefix, suffix, prefix_tokens)
+        prompt_tokens = prefix_tokens + count_tokens(suffix)
+        with self._stats_lock:
+            self.requests += 1
+            self.prompt_tokens += prompt_tokens
+            self.prefix_tokens += prefix_tokens
+            if cached_tokens:
+                self.hits += 1
+                self.cached_tokens += cached_tokens
+        if cached_tokens:
+            incr("prompt_cache_hits_total")
+            incr("prompt_cached_tokens_total", cached_tokens)
+        return message
+
+    def _call(self, llm, prefix: str, suffix: str, prefix_tokens: int) -> Tuple[object, int]:
+        """(response message, prompt tokens served from the cache)"""
+        return llm_retry(llm.invoke, prefix + suffix), 0
+
+    def get_stats(self) -> dict:
+        """Requests, cache hits and prompt tokens sent (in total and in
+        prefixes), cached and billed"""
+        with self._stats_lock:
+            saved = self.cached_tokens * (1 - self.cached_token_rate)
+            return {
+                "cache": self.name,
+                "requests": self.requests,
+                "hits": self.hits,
+                "hit_rate": round(self.hits / self.requests, 4) if self.requests else 0.0,
+                "prompt_tokens": self.prompt_tokens,
+                "prefix_tokens": self.prefix_tokens,
+                "cached_tokens": self.cached_tokens,
+                "billed_prompt_tokens": round(self.prompt_tokens - saved),
+                "billed_tokens_saved": round(saved),
+            }
+
+
+class _PrefixTable:
+    """Prefix keys with expiry times, least recently used first"""
+
+    def __init__(self, ttl_seconds: float, max_entries: int, clock: Callable[[], float]):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: str, value):
+        with self._lock:
+            self._entries[key] = (self.clock() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while self.max_entries and len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+class SimulatedPromptCache(PromptCache):
+    """
+    Local stand-in for a provider cache: prompts are sent whole, but a prefix
+    seen within ttl_seconds is counted (and billed) as cached.
+
+    Parameters:
+        ttl_seconds (float): How long a prefix stays cached after it was stored.
+        min_tokens (int): Shorter prefixes are never cached (providers have a minimum).
+        max_entries (int): Most prefixes tracked.
+        cached_token_rate (float): Share of the input price billed for cached tokens.
+        clock (callable): Time source (seconds).
+
+    Example:
+        >>> cache = SimulatedPromptCache(ttl_seconds=300, min_tokens=1024)
+        >>> message = cache.generate(llm, prefix, suffix)
+        >>> cache.get_stats()["billed_tokens_saved"]
+        5184
+    """
+
+    name = "simulated"
+
+    def __init__(self, ttl_seconds: float = 300.0, min_tokens: int = 1024,
+                 max_entries: int = 1000, cached_token_rate: float = DEFAULT_CACHED_TOKEN_RATE,
+                 clock: Callable[[], float] = time.monotonic):
+        super().__init__(cached_token_rate)
+        self.min_tokens = min_tokens
+        self._prefixes = _PrefixTable(ttl_seconds, max_entries, clock)
+
+    def _call(self, llm, prefix: str, suffix: str, prefix_tokens: int) -> Tuple[object, int]:
+        cached_tokens = 0
+        if prefix_tokens >= self.min_tokens:
+            key = prefix_key(prefix)
+            if self._prefixes.get(key) is not None:
+                cached_tokens = prefix_tokens
+            else:
+                self._prefixes.put(key, True)
+        return llm_retry(llm.invoke, prefix + suffix), cached_tokens
+
+
+class GeminiContextCache(PromptCache):
+    """
+    Gemini context caching: a prefix of at least min_tokens that is seen a
+    second time within ttl_seconds is stored once as cached content, and
+    that and later prompts with the prefix send only the suffix with a
+    reference to it.
+
+    Retrieved context usually differs between questions, so most prefixes
+    are never seen again; creating a cache entry for each would add a call
+    and storage cost per question for no hits. Prefixes that do repeat (the
+    whole transcript of a direct-context video, or a question asked again)
+    are cached from their second use.
+
+    Falls back to sending the whole prompt when a cache cannot be created.
+
+    Parameters:
+        model (str): Gemini model name (the cache is tied to it).
+        api_key (str): Google API key (default: GOOGLE_API_KEY).
+        ttl_seconds (float): Lifetime of each cached prefix.
+        min_tokens (int): Shorter prefixes are sent normally (Gemini's minimum
+            cacheable size depends on the model).
+        max_entries (int): Most cache names remembered.
+        cached_token_rate (float): Share of the input price billed for cached tokens.
+    """
+
+    name = "gemini"
+
+    def __init__(self, model: str, api_key: Optional[str] = None, ttl_seconds: float = 300.0,
+                 min_tokens: int = 1024, max_entries: int = 1000,
+                 cached_token_rate: float = DEFAULT_CACHED_TOKEN_RATE):
+        super().__init__(cached_token_rate)
+        self.model = model if model.startswith("models/") else f"models/{model}"
+        self.api_key = api_key or os.getenv("GOOGLE_API_KEY")
+        self.ttl_seconds = ttl_seconds
+        self.min_tokens = min_tokens
+        # Forget names a little before Gemini expires them
+        self._names = _PrefixTable(max(ttl_seconds - 10, ttl_seconds / 2), max_entries, time.monotonic)
+        self._seen = _PrefixTable(ttl_seconds, max_entries, time.monotonic)
+        self._client = None
+        self._client_lock = threading.Lock()
+        self._create_locks = {}
+
+    def _get_client(self):
+        with self._client_lock:
+            if self._client is None:
+                from google.ai import generativelanguage as glm
+
+                self._client = glm.CacheServiceClient(client_options={"api_key": self.api_key})
+            return self._client
+
+    def _create(self, prefix: str) -> str:
+        """Store a prefix as Gemini cached content; returns its name"""
+        from google.ai import generativelanguage as glm
+        from google.protobuf import duration_pb2
+
+        cached = self._get_client().create_cached_content(cached_content=glm.CachedContent(
+            model=self.model,
+            contents=[glm.Content(role="user", parts=[glm.Part(text=prefix)])],
+            ttl=duration_pb2.Duration(seconds=int(self.ttl_seconds)),
+        ))
+        incr("prompt_cache_creations_total")
+        return cached.name
+
+    def _cache_name(self, prefix: str) -> Optional[str]:
+        key = prefix_key(prefix)
+        name = self._names.get(key)
+        if name is not None:
+            return name
+        if self._seen.get(key) is None:
+            # First sighting: only pay for a cache entry once the prefix repeats
+            self._seen.put(key, True)
+            return None
+        with self._client_lock:
+            lock = self._create_locks.setdefault(key, threading.Lock())
+        # One creation per prefix, even when several questions race for it
+        with lock:
+            name = self._names.get(key)
+            if name is None:
+                try:
+                    name = self._create(prefix)
+                    self._names.put(key, name)
+                except Exception as e:
+                    logger.warning("⚠️ Could not cache prompt prefix, sending it in full: %s", e)
+        with self._client_lock:
+            self._create_locks.pop(key, None)
+        return name
+
+    def _call(self, llm, prefix: str, suffix: str, prefix_tokens: int) -> Tuple[object, int]:
+        if prefix_tokens < self.min_tokens:
+            return llm_retry(llm.invoke, prefix + suffix), 0
+        name = self._cache_name(prefix)
+        if name is None:
+            return llm_retry(llm.invoke, prefix + suffix), 0
+
+        from langchain_core.messages import HumanMessage
+
+        message = llm_retry(llm.invoke, [HumanMessage(content=suffix)], cached_content=name)
+        usage = getattr(message, "usage_metadata", None) or {}
+        cached_tokens = (usage.get("input_token_details") or {}).get("cache_read")
+        return message, cached_tokens if cached_tokens is not None else prefix_tokens
+
+
+def build_prompt_cache(kind: str, model: str = "", ttl_seconds: float = 300.0,
+                       min_tokens: int = 1024,
+                       cached_token_rate: float = DEFAULT_CACHED_TOKEN_RATE) -> PromptCache:
+    """
+    Prompt cache for a PROMPT_CACHE setting: "none", "simulated" or "gemini".
+
+    Returns:
+        PromptCache: The cache ("none" still counts prompt tokens).
+    """
+    kind = (kind or "none").lower()
+    if kind == "none":
+        return PromptCache(cached_token_rate)
+    if kind == "simulated":
+        return SimulatedPromptCache(ttl_seconds=ttl_seconds, min_tokens=min_tokens,
+                                    cached_token_rate=cached_token_rate)
+    if kind == "gemini":
+        return GeminiContextCache(model, ttl_seconds=ttl_seconds, min_tokens=min_tokens,
+                                  cached_token_rate=cached_token_rate)
+    raise ValueError(f"Unknown prompt cache: {kind}")
@@ -0,0 +1,107 @@
+"""
+Per-service rate limiting.
+Provides token-bucket limiters shared by every caller of an external service
+(YouTube, embeddings, LLM) so bulk workloads stay under provider quotas.
+"""
+
+import threading
+from typing import Dict, Optional
+
+from .service_state import SYSTEM_CLOCK, Clock
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket.
+
+    Parameters:
+        rate (float): Requests allowed per second. 0 or None disables limiting.
+        burst (int): Maximum number of requests that may be made back to back.
+        clock (Clock): Time source.
+    """
+
+    def __init__(self, rate: Optional[float] = None, burst: int = 1, clock: Clock = SYSTEM_CLOCK):
+        self.clock = clock
+        self._lock = threading.Lock()
+        self.configure(rate, burst)
+        self.total_wait_time = 0.0
+
+    def configure(self, rate: Optional[float], burst: int = 1):
+        """Change the allowed rate; takes effect for the next acquire()"""
+        with self._lock:
+            self.rate = rate or 0.0
+            self.burst = max(int(burst), 1)
+            self._tokens = float(self.burst)
+            self._updated_at = self.clock.time()
+
+    def reserve(self) -> float:
+        """
+        Take a token, returning how long the caller must wait before using it.
+        """
+        if not self.rate:
+            return 0.0
+
+        with self._lock:
+            now = self.clock.time()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+
+            # Reserve a token now; the caller waits if we went negative
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            self.total_wait_time += wait
+            return wait
+
+    def acquire(self) -> float:
+        """
+        Block until a request may be made.
+
+        Returns:
+            float: Seconds spent waiting.
+        """
+        wait = self.reserve()
+        if wait > 0:
+            self.clock.sleep(wait)
+        return wait
+
+    async def async_acquire(self) -> float:
+        """Like acquire(), but waits without blocking the event loop"""
+        wait = self.reserve()
+        if wait > 0:
+            await self.clock.async_sleep(wait)
+        return wait
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(service: str) -> RateLimiter:
+    """Get (creating if needed) the shared limiter for a service"""
+    with _limiters_lock:
+        limiter = _limiters.get(service)
+        if limiter is None:
+            limiter = _limiters[service] = RateLimiter()
+        return limiter
+
+
+def configure_rate_limit(service: str, rate: Optional[float], burst: int = 1,
+                         clock: Optional[Clock] = None) -> RateLimiter:
+    """
+    Set the request rate (and optionally the clock) for a service.
+
+    Example:
+        >>> configure_rate_limit("embedding", rate=5, burst=10)
+    """
+    limiter = get_rate_limiter(service)
+    if clock is not None:
+        limiter.clock = clock
+    limiter.configure(rate, burst)
+    return limiter
+
+
+def reset_rate_limiters():
+    """Forget all limiters (e.g. between benchmark runs)"""
+    with _limiters_lock:
+        _limiters.clear()
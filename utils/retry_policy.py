@@ -0,0 +1,307 @@
+"""
+Typed retry policies.
+Decides whether a failure is worth retrying from its exception type and HTTP
+status instead of its message text, reads the delay the service asked for, and
+caps the share of traffic that may be retries so an outage cannot turn into a
+retry storm.
+"""
+
+import importlib
+import threading
+from collections import deque
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+from .service_state import SYSTEM_CLOCK, Clock
+
+# Statuses that mean "try again later"; any other 4xx/5xx is final
+RETRYABLE_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+# Exception classes are named by dotted path and resolved on first use, so the
+# policies work whether or not the optional client libraries are installed
+TRANSIENT_ERRORS = (
+    "builtins.ConnectionError",
+    "builtins.TimeoutError",
+    "requests.exceptions.ConnectionError",
+    "requests.exceptions.Timeout",
+    "requests.exceptions.ChunkedEncodingError",
+    "httpx.TransportError",
+    "google.api_core.exceptions.ResourceExhausted",
+    "google.api_core.exceptions.TooManyRequests",
+    "google.api_core.exceptions.ServiceUnavailable",
+    "google.api_core.exceptions.DeadlineExceeded",
+    "google.api_core.exceptions.InternalServerError",
+    "google.api_core.exceptions.BadGateway",
+    "google.api_core.exceptions.GatewayTimeout",
+    "youtube_transcript_api._errors.RequestBlocked",
+    "youtube_transcript_api._errors.YouTubeRequestFailed",
+)
+
+RATE_LIMIT_ERRORS = (
+    "google.api_core.exceptions.ResourceExhausted",
+    "google.api_core.exceptions.TooManyRequests",
+)
+
+PERMANENT_ERRORS = (
+    "builtins.ValueError",
+    "builtins.TypeError",
+    "builtins.KeyError",
+    "google.api_core.exceptions.InvalidArgument",
+    "google.api_core.exceptions.PermissionDenied",
+    "google.api_core.exceptions.Unauthenticated",
+    "youtube_transcript_api._errors.TranscriptsDisabled",
+    "youtube_transcript_api._errors.NoTranscriptFound",
+    "youtube_transcript_api._errors.VideoUnavailable",
+    "youtube_transcript_api._errors.VideoUnplayable",
+    "youtube_transcript_api._errors.InvalidVideoId",
+    "youtube_transcript_api._errors.AgeRestricted",
+    "youtube_transcript_api._errors.NotTranslatable",
+    "youtube_transcript_api._errors.TranslationLanguageNotAvailable",
+)
+
+ErrorTypes = Iterable[Union[str, type]]
+
+
+def _resolve_types(names: ErrorTypes) -> Tuple[type, ...]:
+    """Import the named exception classes, skipping libraries that are missing"""
+    resolved = []
+    for name in names:
+        if isinstance(name, type):
+            resolved.append(name)
+            continue
+        module_name, _, attr = name.rpartition(".")
+        try:
+            cls = getattr(importlib.import_module(module_name), attr)
+        except (ImportError, AttributeError):
+            continue
+        resolved.append(cls)
+    return tuple(resolved)
+
+
+def _exception_chain(error: BaseException, limit: int = 5):
+    """The error followed by the errors it wraps (e.g. a LangChain wrapper's cause)"""
+    seen = set()
+    while error is not None and len(seen) < limit and id(error) not in seen:
+        seen.add(id(error))
+        yield error
+        error = error.__cause__ or (None if error.__suppress_context__ else error.__context__)
+
+
+def get_status_code(error: BaseException) -> Optional[int]:
+    """HTTP status carried by an exception, if any"""
+    for candidate in (getattr(error, "status_code", None), getattr(error, "code", None),
+                      getattr(getattr(error, "response", None), "status_code", None)):
+        if isinstance(candidate, int) and 100 <= candidate < 600:
+            return candidate
+    return None
+
+
+def get_retry_after(error: BaseException) -> Optional[float]:
+    """Seconds the service asked us to wait (Retry-After header or gRPC RetryInfo)"""
+    for exc in _exception_chain(error):
+        headers = getattr(getattr(exc, "response", None), "headers", None)
+        if headers is not None and hasattr(headers, "get"):
+            value = headers.get("Retry-After")
+            if value:
+                try:
+                    return max(float(value), 0.0)
+                except ValueError:
+                    pass
+
+        for detail in getattr(exc, "details", None) or ():
+            delay = getattr(detail, "retry_delay", None)
+            if delay is not None:
+                return delay.seconds + delay.nanos / 1e9
+    return None
+
+
+class RetryDecision:
+    """Outcome of classifying a failure"""
+
+    __slots__ = ("retry", "rate_limited", "retry_after")
+
+    def __init__(self, retry: bool, rate_limited: bool = False,
+                 retry_after: Optional[float] = None):
+        self.retry = retry
+        self.rate_limited = rate_limited
+        self.retry_after = retry_after
+
+
+class RetryBudget:
+    """
+    Caps retries at a fraction of recent calls.
+
+    Parameters:
+        ratio (float): Retries allowed per first attempt within the window.
+        window (float): Sliding window length in seconds.
+        min_retries (int): Retries always allowed per window, so a quiet
+            service can still recover from a blip.
+        clock (Clock): Time source.
+    """
+
+    def __init__(self, ratio: float = 0.2, window: float = 10.0,
+                 min_retries: int = 10, clock: Clock = SYSTEM_CLOCK):
+        self.ratio = ratio
+        self.window = window
+        self.min_retries = min_retries
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._calls = deque()
+        self._retries = deque()
+
+    def _expire(self, now: float):
+        cutoff = now - self.window
+        for events in (self._calls, self._retries):
+            while events and events[0] < cutoff:
+                events.popleft()
+
+    def record_call(self):
+        with self._lock:
+            now = self.clock.time()
+            self._expire(now)
+            self._calls.append(now)
+
+    def try_spend(self) -> bool:
+        """Take one retry from the budget; False means the caller should give up"""
+        with self._lock:
+            now = self.clock.time()
+            self._expire(now)
+            if len(self._retries) >= self.min_retries + self.ratio * len(self._calls):
+                return False
+            self._retries.append(now)
+            return True
+
+
+class RetryPolicy:
+    """
+    How one kind of call is retried.
+
+    Parameters:
+        name (str): Name used in metrics.
+        max_retries (int): Maximum attempts per call.
+        base_delay (float): Base delay in seconds.
+        max_delay (float): Maximum delay in seconds.
+        service (str): Service whose shared rate limit and breaker apply.
+        transient (list): Exception classes (or dotted names) worth retrying.
+        rate_limited (list): Exception classes that mean "slow down".
+        permanent (list): Exception classes that are never retried.
+        retry_statuses (set): HTTP statuses worth retrying.
+        message_patterns (tuple): Legacy error substrings, only consulted for
+            errors that carry neither a known type nor a status.
+        retry_unknown (bool): Retry errors nothing else could classify.
+        budget (RetryBudget): Shared retry budget, or None for no cap.
+    """
+
+    def __init__(self, name: str, max_retries: int = 5, base_delay: float = 1.0,
+                 max_delay: float = 60.0, service: Optional[str] = None,
+                 transient: ErrorTypes = TRANSIENT_ERRORS,
+                 rate_limited: ErrorTypes = RATE_LIMIT_ERRORS,
+                 permanent: ErrorTypes = PERMANENT_ERRORS,
+                 retry_statuses: Iterable[int] = RETRYABLE_STATUSES,
+                 message_patterns: Optional[Union[str, Tuple[str, ...]]] = None,
+                 retry_unknown: bool = False,
+                 budget: Optional[RetryBudget] = None):
+        self.name = name
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.service = service
+        self.retry_statuses = frozenset(retry_statuses)
+        if isinstance(message_patterns, str):
+            message_patterns = (message_patterns,)
+        self.message_patterns = tuple(p.lower() for p in message_patterns or ())
+        self.retry_unknown = retry_unknown
+        self.budget = budget
+
+        self._type_names = (transient, rate_limited, permanent)
+        self._types = None
+        self.metrics = RetryMetrics()
+
+    @classmethod
+    def from_legacy(cls, handle_errors=None, **kwargs) -> "RetryPolicy":
+        """
+        Policy for the old handle_errors argument: typed rules first, then the
+        substrings; no substrings means every unclassified error is retried.
+        """
+        return cls(kwargs.pop("name", "default"), message_patterns=handle_errors,
+                   retry_unknown=not handle_errors, **kwargs)
+
+    def _resolved(self):
+        if self._types is None:
+            self._types = tuple(_resolve_types(names) for names in self._type_names)
+        return self._types
+
+    def classify(self, error: BaseException) -> RetryDecision:
+        """Decide whether (and how) to retry after `error`"""
+        transient, rate_limited, permanent = self._resolved()
+        chain = list(_exception_chain(error))
+
+        # The most specific signal wins: an HTTP status anywhere in the chain
+        for exc in chain:
+            status = get_status_code(exc)
+            if status is not None:
+                return RetryDecision(status in self.retry_statuses, status == 429,
+                                     get_retry_after(error) if status == 429 else None)
+
+        for exc in chain:
+            if isinstance(exc, permanent):
+                return RetryDecision(False)
+            if isinstance(exc, transient):
+                limited = isinstance(exc, rate_limited)
+                return RetryDecision(True, limited, get_retry_after(error) if limited else None)
+
+        if self.message_patterns:
+            message = str(error).lower()
+            if any(pattern in message for pattern in self.message_patterns):
+                limited = "429" in message or "quota" in message
+                return RetryDecision(True, limited, get_retry_after(error))
+            return RetryDecision(False)
+
+        return RetryDecision(self.retry_unknown)
+
+
+class RetryMetrics:
+    """Thread-safe counters for one policy"""
+
+    FIELDS = ("calls", "attempts", "successes", "retries",
+              "give_ups", "budget_exhausted", "non_retryable")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = dict.fromkeys(self.FIELDS, 0)
+
+    def incr(self, field: str):
+        with self._lock:
+            self._counts[field] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self._counts)
+
+
+_policies: Dict[str, RetryPolicy] = {}
+_policies_lock = threading.Lock()
+
+
+def register_policy(policy: RetryPolicy) -> RetryPolicy:
+    """Make a policy's metrics visible through get_retry_metrics()"""
+    with _policies_lock:
+        _policies[policy.name] = policy
+    return policy
+
+
+def get_retry_policy(name: str) -> Optional[RetryPolicy]:
+    with _policies_lock:
+        return _policies.get(name)
+
+
+def get_retry_metrics() -> Dict[str, dict]:
+    """
+    Attempts, retries and give-ups for every registered policy.
+
+    Example:
+        >>> get_retry_metrics()["llm_retry"]["give_ups"]
+        0
+    """
+    with _policies_lock:
+        policies = list(_policies.values())
+    return {policy.name: policy.metrics.snapshot() for policy in policies}
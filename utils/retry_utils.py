@@ -1,92 +1,268 @@
 """
 Retry utilities with exponential backoff and jitter.
 Provides reusable retry mechanisms for handling API rate limits and temporary failures.
+
+Retries against a named service share that service's state: a 429 pauses
+every caller for the advised window, and repeated failures open a circuit
+breaker (see service_state.py). Which errors are retried is decided by a
+RetryPolicy (see retry_policy.py).
 """
 
-import time
 import random
+import re
 from typing import Callable, Any, Tuple, Union, Optional
 from functools import wraps
 
+from .rate_limiter import get_rate_limiter
+from .logging_utils import get_logger
+from .retry_policy import RetryBudget, RetryPolicy, register_policy
+from .service_state import (
+    SYSTEM_CLOCK, Clock, CircuitOpenError, ServiceState, get_service_state
+)
 
-import time
-import random
-from typing import Callable, Optional, Union, Tuple, Any
+logger = get_logger(__name__)
+
+_RETRY_IN_PATTERN = re.compile(r"retry (?:in|after) ([\d.]+)\s*s", re.IGNORECASE)
+
+LEGACY_HANDLE_ERRORS = ("quota", "429", "temporarily", "rate limit", "residential")
+
+# Shared policies for the specialised helpers below
+YOUTUBE_POLICY = register_policy(RetryPolicy(
+    "youtube_transcript_retry", max_retries=5, service="youtube", budget=RetryBudget()))
+EMBEDDING_POLICY = register_policy(RetryPolicy(
+    "embedding_retry", max_retries=5, base_delay=2.0, service="embedding", budget=RetryBudget()))
+LLM_POLICY = register_policy(RetryPolicy(
+    "llm_retry", max_retries=3, service="llm", budget=RetryBudget()))
+
+
+def _backoff_delay(attempt: int, base_delay: float, max_delay: float) -> float:
+    delay = min(base_delay * (2 ** attempt), max_delay)
+    return delay + random.uniform(0, 0.1 * delay)
+
+
+def _advised_delay(error: Exception, decision) -> Optional[float]:
+    if decision.retry_after is not None:
+        return decision.retry_after
+    # Gemini puts the hint in the message ("Please retry in 7.5s")
+    match = _RETRY_IN_PATTERN.search(str(error))
+    return float(match.group(1)) if match else None
+
+
+def _handle_failure(error: Exception, attempt: int, policy: RetryPolicy,
+                    state: Optional[ServiceState]) -> float:
+    """
+    Update metrics and shared state after a failed attempt.
+
+    Returns:
+        float: Seconds this caller should sleep before retrying. 0 means the
+        wait is enforced through the service pause instead.
+
+    Raises:
+        The error itself if it should not (or may no longer) be retried.
+    """
+    decision = policy.classify(error)
+    if not decision.retry:
+        policy.metrics.incr("non_retryable")
+        if state:
+            state.record_success()  # The service answered; it is not unhealthy
+        raise error
+
+    delay = _backoff_delay(attempt, policy.base_delay, policy.max_delay)
+    shared = state is not None and decision.rate_limited
+    if state:
+        state.record_failure()
+        if shared:
+            # Everyone backs off together for the advised (or backoff) window
+            delay = min(_advised_delay(error, decision) or delay, policy.max_delay)
+            state.pause(delay)
+
+    if attempt == policy.max_retries - 1:
+        policy.metrics.incr("give_ups")
+        raise error
+    if policy.budget and not policy.budget.try_spend():
+        policy.metrics.incr("budget_exhausted")
+        policy.metrics.incr("give_ups")
+        logger.warning("⚠️ Retry budget for %s exhausted, giving up: %s", policy.name, error)
+        raise error
+
+    policy.metrics.incr("retries")
+    logger.info("⏳ Retry %d/%d after %.2fs due to error: %s",
+                attempt + 1, policy.max_retries, delay, error,
+                extra={"policy": policy.name})
+    return 0.0 if shared else delay
+
+
+def _start_call(policy: RetryPolicy, clock: Optional[Clock]):
+    state = get_service_state(policy.service) if policy.service else None
+    limiter = get_rate_limiter(policy.service) if policy.service else None
+    clock = clock or (state.clock if state else SYSTEM_CLOCK)
+    policy.metrics.incr("calls")
+    if policy.budget:
+        policy.budget.record_call()
+    return state, limiter, clock
+
+
+def _legacy_policy(policy: Optional[RetryPolicy], max_retries, handle_errors,
+                   base_delay, max_delay, service) -> RetryPolicy:
+    if policy is not None:
+        return policy
+    return RetryPolicy.from_legacy(handle_errors, max_retries=max_retries,
+                                   base_delay=base_delay, max_delay=max_delay,
+                                   service=service)
 
 
 def retry_with_backoff(
     func: Callable,
     *args,
     max_retries: int = 5,
-    handle_errors: Optional[Union[str, Tuple[str, ...]]] = (
-        "quota", "429", "temporarily", "rate limit", "residential"),
+    handle_errors: Optional[Union[str, Tuple[str, ...]]] = LEGACY_HANDLE_ERRORS,
     base_delay: float = 1.0,
     max_delay: float = 60.0,
+    service: Optional[str] = None,
+    clock: Optional[Clock] = None,
+    policy: Optional[RetryPolicy] = None,
     **kwargs
 ) -> Any:
     """
-    Retry a function with exponential backoff and jitter on specified errors.
+    Retry a function with exponential backoff and jitter on transient errors.
 
     Parameters:
         func (callable): The function to retry.
         *args: Positional arguments for the function.
         max_retries (int): Maximum retry attempts.
-        handle_errors (str or tuple): Error substrings that trigger retry.
+        handle_errors (str or tuple): Legacy error substrings, consulted only
+            for errors whose type and HTTP status say nothing.
         base_delay (float): Base delay in seconds.
         max_delay (float): Maximum delay in seconds.
+        service (str): Name of the service being called. Every attempt waits on
+            that service's rate limiter, shared 429 pause and circuit breaker.
+        clock (Clock): Time source (default: the service's clock, else real time).
+        policy (RetryPolicy): Use this policy instead of the arguments above.
         **kwargs: Keyword arguments for the function.
 
     Returns:
         The return value of func if successful.
 
     Raises:
-        The last exception if all retries fail or an unretryable error occurs.
+        The last exception if all retries fail, the retry budget runs out or an
+        unretryable error occurs, or CircuitOpenError if the service's circuit
+        breaker is open.
     """
-    last_exception = None
+    policy = _legacy_policy(policy, max_retries, handle_errors, base_delay, max_delay, service)
+    state, limiter, clock = _start_call(policy, clock)
 
-    for attempt in range(max_retries):
+    for attempt in range(policy.max_retries):
+        probe = False
         try:
-            return func(*args, **kwargs)
-        except Exception as e:
-            last_exception = e
-            err_str = str(e).lower()
+            if state:
+                wait, probe = state.before_call()
+                if wait > 0:
+                    clock.sleep(wait)
+            if limiter:
+                limiter.acquire()
+
+            policy.metrics.incr("attempts")
+            try:
+                result = func(*args, **kwargs)
+            except CircuitOpenError:
+                raise
+            except Exception as e:
+                probe = False  # Recorded as a success or failure
+                delay = _handle_failure(e, attempt, policy, state)
+                if delay > 0:
+                    clock.sleep(delay)
+                continue
+
+            policy.metrics.incr("successes")
+            if state:
+                probe = False
+                state.record_success()
+            return result
+        finally:
+            # Cancelled or interrupted mid-probe: free the probe for the next caller
+            if probe:
+                state.release_probe()
+
+
+async def async_retry_with_backoff(
+    func: Callable,
+    *args,
+    max_retries: int = 5,
+    handle_errors: Optional[Union[str, Tuple[str, ...]]] = LEGACY_HANDLE_ERRORS,
+    base_delay: float = 1.0,
+    max_delay: float = 60.0,
+    service: Optional[str] = None,
+    clock: Optional[Clock] = None,
+    policy: Optional[RetryPolicy] = None,
+    **kwargs
+) -> Any:
+    """
+    Async version of retry_with_backoff for coroutine functions.
 
-            if handle_errors:
-                if isinstance(handle_errors, tuple):
-                    should_retry = any(pat in err_str for pat in handle_errors)
-                else:
-                    should_retry = handle_errors in err_str
-            else:
-                should_retry = True  # Retry all errors if no patterns specified
+    Waits with the clock's async sleep, so backoff never blocks the event loop.
+    Shares rate limits, 429 pauses and circuit breakers with synchronous callers
+    of the same service.
 
-            if not should_retry or attempt == max_retries - 1:
-                raise e
+    Example:
+        >>> answer = await async_retry_with_backoff(
+        ...     llm.ainvoke, prompt, policy=LLM_POLICY
+        ... )
+    """
+    policy = _legacy_policy(policy, max_retries, handle_errors, base_delay, max_delay, service)
+    state, limiter, clock = _start_call(policy, clock)
 
-            delay = min(base_delay * (2 ** attempt), max_delay)
-            jitter = random.uniform(0, 0.1 * delay)
-            total_delay = delay + jitter
+    for attempt in range(policy.max_retries):
+        probe = False
+        try:
+            if state:
+                wait, probe = state.before_call()
+                if wait > 0:
+                    await clock.async_sleep(wait)
+            if limiter:
+                await limiter.async_acquire()
 
-            print(
-                f"⏳ Retry {attempt + 1}/{max_retries} after {total_delay:.2f}s due to error: {e}")
-            time.sleep(total_delay)
+            policy.metrics.incr("attempts")
+            try:
+                result = await func(*args, **kwargs)
+            except CircuitOpenError:
+                raise
+            except Exception as e:
+                probe = False  # Recorded as a success or failure
+                delay = _handle_failure(e, attempt, policy, state)
+                if delay > 0:
+                    await clock.async_sleep(delay)
+                continue
 
-    raise last_exception
+            policy.metrics.incr("successes")
+            if state:
+                probe = False
+                state.record_success()
+            return result
+        finally:
+            # Cancelled or interrupted mid-probe: free the probe for the next caller
+            if probe:
+                state.release_probe()
 
 
 def retry_decorator(
     max_retries: int = 5,
     handle_errors: Optional[Union[str, Tuple[str, ...]]] = None,
     base_delay: float = 1.0,
-    max_delay: float = 60.0
+    max_delay: float = 60.0,
+    service: Optional[str] = None,
+    policy: Optional[RetryPolicy] = None
 ):
     """
     Decorator version of retry_with_backoff.
 
     Parameters:
         max_retries (int): Maximum retry attempts (default: 5).
-        handle_errors (str or tuple): Error types or string patterns to retry on.
+        handle_errors (str or tuple): Legacy error substrings to retry on
+            (default: retry anything not known to be permanent).
         base_delay (float): Base delay in seconds (default: 1.0).
         max_delay (float): Maximum delay in seconds (default: 60.0).
+        service (str): Service whose shared state the retries use.
+        policy (RetryPolicy): Use this policy instead of the arguments above.
 
     Example:
         >>> @retry_decorator(max_retries=3, handle_errors=("quota", "429"))
@@ -94,17 +270,39 @@ def retry_decorator(
         ...     # Some API call that might fail
         ...     pass
     """
+    policy = _legacy_policy(policy, max_retries, handle_errors, base_delay, max_delay, service)
+
     def decorator(func: Callable) -> Callable:
         @wraps(func)
         def wrapper(*args, **kwargs):
-            return retry_with_backoff(
-                func, *args,
-                max_retries=max_retries,
-                handle_errors=handle_errors,
-                base_delay=base_delay,
-                max_delay=max_delay,
-                **kwargs
-            )
+            return retry_with_backoff(func, *args, policy=policy, **kwargs)
+        return wrapper
+    return decorator
+
+
+def async_retry_decorator(
+    max_retries: int = 5,
+    handle_errors: Optional[Union[str, Tuple[str, ...]]] = None,
+    base_delay: float = 1.0,
+    max_delay: float = 60.0,
+    service: Optional[str] = None,
+    policy: Optional[RetryPolicy] = None
+):
+    """
+    Decorator version of async_retry_with_backoff.
+
+    Example:
+        >>> @async_retry_decorator(max_retries=3, service="llm")
+        ... async def api_call():
+        ...     # Some async API call that might fail
+        ...     pass
+    """
+    policy = _legacy_policy(policy, max_retries, handle_errors, base_delay, max_delay, service)
+
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            return await async_retry_with_backoff(func, *args, policy=policy, **kwargs)
         return wrapper
     return decorator
 
@@ -119,13 +317,7 @@ def youtube_transcript_retry(func: Callable, *args, **kwargs) -> Any:
         ...     ytt_api.fetch, video_id, languages=['en']
         ... )
     """
-    return retry_with_backoff(
-        func, *args,
-        max_retries=5,
-        handle_errors=("quota", "429", "temporarily",
-                       "proxy", "502", "gateway"),
-        **kwargs
-    )
+    return retry_with_backoff(func, *args, policy=YOUTUBE_POLICY, **kwargs)
 
 
 def embedding_retry(func: Callable, *args, **kwargs) -> Any:
@@ -137,14 +329,7 @@ def embedding_retry(func: Callable, *args, **kwargs) -> Any:
         ...     embedding_model.embed_query, text
         ... )
     """
-    return retry_with_backoff(
-        func, *args,
-        max_retries=5,
-        handle_errors=("quota", "429", "temporarily",
-                       "proxy", "502", "gateway"),
-        base_delay=2.0,
-        **kwargs
-    )
+    return retry_with_backoff(func, *args, policy=EMBEDDING_POLICY, **kwargs)
 
 
 def llm_retry(func: Callable, *args, **kwargs) -> Any:
@@ -156,10 +341,16 @@ def llm_retry(func: Callable, *args, **kwargs) -> Any:
         ...     llm.invoke, prompt
         ... )
     """
-    return retry_with_backoff(
-        func, *args,
-        max_retries=3,
-        handle_errors=("quota", "429", "rate limit"),
-        base_delay=1.0,
-        **kwargs
-    )
+    return retry_with_backoff(func, *args, policy=LLM_POLICY, **kwargs)
+
+
+async def async_llm_retry(func: Callable, *args, **kwargs) -> Any:
+    """
+    Async specialized retry function for LLM API calls.
+
+    Example:
+        >>> response = await async_llm_retry(
+        ...     llm.ainvoke, prompt
+        ... )
+    """
+    return await async_retry_with_backoff(func, *args, policy=LLM_POLICY, **kwargs)
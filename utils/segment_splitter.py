@@ -0,0 +1,118 @@
+"""
+Token-budgeted chunks made of whole caption segments.
+Segment token counts are computed once and summed cumulatively, so each
+chunk's end (the last segment that still fits the budget) and the next
+chunk's start (the first segment of the overlap) are binary searches over
+the running total. No chunk edge falls inside a segment, chunk sizes follow
+the token budget rather than a character count, and every chunk's time span
+is simply the start of its first segment to the end of its last.
+"""
+
+from collections import namedtuple
+from typing import TYPE_CHECKING, List, Sequence
+
+if TYPE_CHECKING:
+    import numpy as np
+
+from .compact_transcript import CompactTranscript
+from .token_utils import count_tokens_batch
+
+# One chunk: its text, segment range (inclusive), character offset in the
+# transcript text, time span in seconds and estimated token count
+SegmentChunk = namedtuple("SegmentChunk", ["text", "first_segment", "last_segment",
+                                           "start_index", "start_time", "end_time", "tokens"])
+
+
+def segment_chunk_bounds(token_counts: Sequence[int], chunk_tokens: int,
+                         overlap_tokens: int = 0) -> "np.ndarray":
+    """
+    First and last segment of each chunk.
+
+    Segments are packed in order while their token total fits chunk_tokens
+    (a segment larger than that gets a chunk of its own). Each chunk after
+    the first starts with the trailing segments of the previous one that
+    fit in overlap_tokens, dropping overlap where it would leave no room for
+    the next segment.
+
+    Parameters:
+        token_counts (list): Tokens in each segment.
+        chunk_tokens (int): Token budget per chunk.
+        overlap_tokens (int): Most tokens repeated from the previous chunk.
+
+    Returns:
+        np.ndarray: (chunks, 2) int64 segment positions, last inclusive.
+
+    Example:
+        >>> segment_chunk_bounds([4, 4, 4, 4, 4], chunk_tokens=10, overlap_tokens=4)
+        array([[0, 1],
+               [1, 2],
+               [2, 3],
+               [3, 4]])
+    """
+    import numpy as np
+
+    n = len(token_counts)
+    cumulative = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(token_counts, out=cumulative[1:])
+
+    bounds = []
+    lo = 0
+    while lo < n:
+        # Last segment whose running total from lo still fits the budget
+        hi = max(int(np.searchsorted(cumulative, cumulative[lo] + chunk_tokens, side="right")) - 2, lo)
+        bounds.append((lo, hi))
+        if hi == n - 1:
+            break
+        # Overlap: the earliest start within overlap_tokens of the chunk end,
+        # late enough that the next segment still fits after it
+        start = int(np.searchsorted(cumulative, cumulative[hi + 1] - overlap_tokens, side="left"))
+        fits = int(np.searchsorted(cumulative, cumulative[hi + 2] - chunk_tokens, side="left"))
+        lo = min(max(start, fits, lo + 1), hi + 1)
+    return np.array(bounds, dtype=np.int64).reshape(-1, 2)
+
+
+class SegmentSplitter:
+    """
+    Splits a transcript into chunks of whole caption segments.
+
+    Parameters:
+        chunk_tokens (int): Token budget per chunk.
+        overlap_tokens (int): Most tokens repeated from the previous chunk
+            (whole segments only).
+
+    Example:
+        >>> splitter = SegmentSplitter(chunk_tokens=250, overlap_tokens=50)
+        >>> chunk = splitter.split(transcript)[0]
+        >>> chunk.first_segment, chunk.last_segment, chunk.start_time, chunk.end_time
+        (0, 17, 0.0, 72.0)
+    """
+
+    def __init__(self, chunk_tokens: int = 250, overlap_tokens: int = 50):
+        if chunk_tokens <= 0:
+            raise ValueError("chunk_tokens must be positive")
+        if not 0 <= overlap_tokens < chunk_tokens:
+            raise ValueError("overlap_tokens must be at least 0 and below chunk_tokens")
+        self.chunk_tokens = chunk_tokens
+        self.overlap_tokens = overlap_tokens
+
+    def split(self, transcript: CompactTranscript) -> List[SegmentChunk]:
+        """Chunks of a transcript in time order"""
+        import numpy as np
+
+        if not len(transcript):
+            return []
+        token_counts = np.asarray(count_tokens_batch(transcript.texts()), dtype=np.int64)
+        bounds = segment_chunk_bounds(token_counts, self.chunk_tokens, self.overlap_tokens)
+        cumulative = np.concatenate([[0], np.cumsum(token_counts)])
+        char_offsets = transcript.char_offsets
+        starts, ends = transcript.starts, transcript.ends
+
+        return [SegmentChunk(
+            text=transcript[lo:hi + 1].text,
+            first_segment=int(lo),
+            last_segment=int(hi),
+            start_index=int(char_offsets[lo]),
+            start_time=float(starts[lo]),
+            end_time=float(ends[hi]),
+            tokens=int(cumulative[hi + 1] - cumulative[lo]),
+        ) for lo, hi in bounds]
@@ -0,0 +1,162 @@
+"""
+Shared per-service health state.
+When a service answers 429, every caller of that service pauses for the
+advised window instead of backing off on its own schedule, and repeated
+transient failures open a circuit breaker so callers fail fast while the
+service recovers.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+
+class Clock:
+    """Time source used by retries; swap in a fake one to drive time by hand"""
+
+    def time(self) -> float:
+        return time.monotonic()
+
+    def sleep(self, seconds: float):
+        time.sleep(seconds)
+
+    async def async_sleep(self, seconds: float):
+        await asyncio.sleep(seconds)
+
+
+SYSTEM_CLOCK = Clock()
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a service whose circuit breaker is open"""
+
+    def __init__(self, service: str, retry_in: float):
+        super().__init__(
+            f"Circuit open for service '{service}', retry in {retry_in:.1f}s")
+        self.service = service
+        self.retry_in = retry_in
+
+
+class ServiceState:
+    """
+    Rate-limit pause and circuit breaker shared by all callers of one service.
+
+    Parameters:
+        name (str): Service name, e.g. "llm".
+        failure_threshold (int): Consecutive transient failures that open the circuit.
+        recovery_timeout (float): Seconds the circuit stays open before one probe call.
+        clock (Clock): Time source.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5,
+                 recovery_timeout: float = 30.0, clock: Clock = SYSTEM_CLOCK):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self.paused_until = 0.0
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self._probe_in_flight = False
+
+    def pause(self, seconds: float):
+        """Hold every caller of this service for at least `seconds`"""
+        with self._lock:
+            self.paused_until = max(self.paused_until, self.clock.time() + seconds)
+
+    def before_call(self) -> Tuple[float, bool]:
+        """
+        Check whether a call may start.
+
+        A caller that gets the half-open probe must end it with
+        record_success(), record_failure() or, if the call never finished
+        (cancelled, interrupted), release_probe().
+
+        Returns:
+            tuple: (seconds the caller must wait first, 0 to go ahead now;
+            True if this call is the half-open probe).
+
+        Raises:
+            CircuitOpenError: If the circuit is open and no probe is allowed.
+        """
+        with self._lock:
+            now = self.clock.time()
+            probe = False
+            if self.opened_at is not None:
+                reopen_at = self.opened_at + self.recovery_timeout
+                if now < reopen_at or self._probe_in_flight:
+                    raise CircuitOpenError(self.name, max(reopen_at - now, 0.0))
+                # Half-open: let exactly one caller probe the service
+                self._probe_in_flight = probe = True
+            return max(self.paused_until - now, 0.0), probe
+
+    def release_probe(self):
+        """Give up the half-open probe without a verdict; the next caller may probe"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        """Count a transient failure; opens the circuit at the threshold"""
+        with self._lock:
+            self.consecutive_failures += 1
+            if self._probe_in_flight or (
+                    self.failure_threshold and self.consecutive_failures >= self.failure_threshold):
+                self.opened_at = self.clock.time()
+            self._probe_in_flight = False
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            now = self.clock.time()
+            return {
+                "paused_for": round(max(self.paused_until - now, 0.0), 3),
+                "circuit_open": self.opened_at is not None,
+                "consecutive_failures": self.consecutive_failures,
+            }
+
+
+_states: Dict[str, ServiceState] = {}
+_states_lock = threading.Lock()
+
+
+def get_service_state(service: str) -> ServiceState:
+    """Get (creating if needed) the shared state for a service"""
+    with _states_lock:
+        state = _states.get(service)
+        if state is None:
+            state = _states[service] = ServiceState(service)
+        return state
+
+
+def configure_service(service: str, failure_threshold: Optional[int] = None,
+                      recovery_timeout: Optional[float] = None,
+                      clock: Optional[Clock] = None) -> ServiceState:
+    """
+    Adjust a service's circuit breaker or clock.
+
+    Example:
+        >>> configure_service("llm", failure_threshold=3, recovery_timeout=10)
+    """
+    state = get_service_state(service)
+    with state._lock:
+        if failure_threshold is not None:
+            state.failure_threshold = failure_threshold
+        if recovery_timeout is not None:
+            state.recovery_timeout = recovery_timeout
+        if clock is not None:
+            state.clock = clock
+    return state
+
+
+def reset_service_states():
+    """Forget all shared state (e.g. between benchmark runs)"""
+    with _states_lock:
+        _states.clear()
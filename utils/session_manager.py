@@ -0,0 +1,317 @@
+"""
+Bounded storage for per-video chatbot sessions.
+Keeps the most recently used chatbots in memory within a count/byte budget.
+Every index is written to a shared on-disk store and recorded in a SQLite
+registry, so evicted sessions reload transparently and any worker process can
+serve a video that another worker ingested.
+"""
+
+import os
+import shutil
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Callable, Dict, Optional
+
+from .video_registry import VideoRegistry
+from .logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+# Marks a saved index that a newer version replaced (its mtime is when)
+_SUPERSEDED_MARKER = ".superseded"
+
+
+class VideoSessionManager(MutableMapping):
+    """
+    Dict-like LRU store of chatbot instances keyed by video id.
+
+    Chatbots must provide save(directory), save_state(directory),
+    estimate_memory_bytes(), index_status and is_indexing. Videos that are
+    still being indexed by this process are never evicted.
+
+    Parameters:
+        store_dir (str): Directory holding saved indexes (may be shared by workers).
+        loader (callable): Builds a chatbot from a saved index directory.
+        max_videos (int): Maximum resident videos (0 = unlimited).
+        max_bytes (int): Maximum estimated resident bytes (0 = unlimited).
+        registry (VideoRegistry): Registry of saved indexes
+            (default: registry.sqlite3 inside store_dir).
+        retain_seconds (float): How long a replaced index version is kept on
+            disk, so workers that already read its path can still load it.
+    """
+
+    def __init__(self, store_dir: str, loader: Callable[[str], object],
+                 max_videos: int = 0, max_bytes: int = 0,
+                 registry: Optional[VideoRegistry] = None, retain_seconds: float = 300.0):
+        os.makedirs(store_dir, exist_ok=True)
+        self.store_dir = store_dir
+        self.loader = loader
+        self.max_videos = max_videos
+        self.max_bytes = max_bytes
+        self.retain_seconds = retain_seconds
+        self.registry = registry or VideoRegistry(
+            os.path.join(store_dir, "registry.sqlite3"))
+
+        self._resident = OrderedDict()   # video_id -> chatbot, oldest first
+        self._sizes: Dict[str, int] = {}
+        self._versions: Dict[str, int] = {}  # registry version held in memory
+        self._paths: Dict[str, str] = {}
+        self._lock = threading.RLock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+
+        # Stats
+        self.evictions = 0
+        self.reloads = 0
+        self.reload_time_total = 0.0
+        self.reload_time_max = 0.0
+
+    # ---- MutableMapping interface ----
+
+    def __setitem__(self, video_id: str, chatbot):
+        with self._lock:
+            self._resident[video_id] = chatbot
+            self._resident.move_to_end(video_id)
+            self._sizes[video_id] = chatbot.estimate_memory_bytes()
+            self._versions.pop(video_id, None)
+        self.persist(video_id)
+        self._enforce_budget(keep=video_id)
+
+    def __getitem__(self, video_id: str):
+        row = self.registry.get(video_id)
+
+        with self._lock:
+            chatbot = self._resident.get(video_id)
+            if chatbot is not None:
+                if chatbot.is_indexing or (
+                        row is not None and row["version"] <= self._versions.get(video_id, 0)):
+                    self._resident.move_to_end(video_id)
+                    return chatbot
+                if row is None:
+                    # Cleared by another worker
+                    self._drop(video_id)
+                    raise KeyError(video_id)
+                # Another worker saved a newer index; fall through and reload
+            elif row is None:
+                raise KeyError(video_id)
+            load_lock = self._load_locks.setdefault(video_id, threading.Lock())
+
+        # Load outside the main lock so other videos stay available
+        with load_lock:
+            with self._lock:
+                if self._versions.get(video_id, 0) >= row["version"] and video_id in self._resident:
+                    self._resident.move_to_end(video_id)
+                    return self._resident[video_id]
+
+            started_at = time.perf_counter()
+            try:
+                chatbot = self.loader(row["index_path"])
+            except FileNotFoundError:
+                # Replaced and cleaned up since the registry was read; load the current one
+                fresh = self.registry.get(video_id)
+                if fresh is None:
+                    raise KeyError(video_id)
+                if fresh["index_path"] == row["index_path"]:
+                    raise
+                row = fresh
+                chatbot = self.loader(row["index_path"])
+            elapsed = time.perf_counter() - started_at
+            logger.info("♻️ Loaded session %s (v%d) in %.0fms", video_id, row['version'], elapsed * 1000)
+
+            with self._lock:
+                self.reloads += 1
+                self.reload_time_total += elapsed
+                self.reload_time_max = max(self.reload_time_max, elapsed)
+                self._resident[video_id] = chatbot
+                self._resident.move_to_end(video_id)
+                self._sizes[video_id] = chatbot.estimate_memory_bytes()
+                self._versions[video_id] = row["version"]
+                self._paths[video_id] = row["index_path"]
+
+        self._enforce_budget(keep=video_id)
+        return chatbot
+
+    def __delitem__(self, video_id: str):
+        with self._lock:
+            was_resident = self._drop(video_id)
+        row = self.registry.remove(video_id)
+        if not was_resident and row is None:
+            raise KeyError(video_id)
+        shutil.rmtree(os.path.join(self.store_dir, video_id), ignore_errors=True)
+
+    def __contains__(self, video_id) -> bool:
+        with self._lock:
+            if video_id in self._resident and self._resident[video_id].is_indexing:
+                return True
+        return video_id in self.registry
+
+    def __iter__(self):
+        video_ids = self.registry.list_video_ids()
+        registered = set(video_ids)
+        with self._lock:
+            video_ids += [video_id for video_id in self._resident
+                          if video_id not in registered]
+        return iter(video_ids)
+
+    def __len__(self) -> int:
+        return len(list(iter(self)))
+
+    # ---- Persistence ----
+
+    def persist(self, video_id: str) -> int:
+        """
+        Save a resident chatbot's index as a new version and register it.
+
+        Returns:
+            int: The registry version that was written.
+        """
+        with self._lock:
+            chatbot = self._resident[video_id]
+
+        directory = os.path.join(self.store_dir, video_id, uuid.uuid4().hex)
+        chatbot.save(directory)
+        version = self._register(video_id, chatbot, directory)
+
+        self._prune_versions(video_id, keep=directory)
+        return version
+
+    def _prune_versions(self, video_id: str, keep: str):
+        """
+        Mark versions other than keep as replaced, and delete those replaced
+        more than retain_seconds ago. Another worker may have read a replaced
+        version's path from the registry and not loaded it yet; workers that
+        mmapped a version keep their open mapping even after it is deleted.
+        """
+        now = time.time()
+        for name in os.listdir(os.path.join(self.store_dir, video_id)):
+            old_directory = os.path.join(self.store_dir, video_id, name)
+            if old_directory == keep or not os.path.isdir(old_directory):
+                continue
+            marker = os.path.join(old_directory, _SUPERSEDED_MARKER)
+            try:
+                replaced_at = os.path.getmtime(marker)
+            except FileNotFoundError:
+                try:
+                    open(marker, "w").close()
+                except OSError:
+                    pass  # Deleted meanwhile by another worker
+                continue
+            if now - replaced_at >= self.retain_seconds:
+                shutil.rmtree(old_directory, ignore_errors=True)
+
+    def persist_state(self, video_id: str) -> int:
+        """
+        Rewrite only a resident chatbot's per-video state (e.g. precomputed
+        artifacts) next to its saved index, and bump the version so other
+        workers reload it. Falls back to persist() when this worker's saved
+        index is not the registered one.
+
+        Returns:
+            int: The registry version that was written.
+        """
+        with self._lock:
+            chatbot = self._resident[video_id]
+            directory = self._paths.get(video_id)
+        row = self.registry.get(video_id)
+        if directory is None or row is None or row["index_path"] != directory:
+            return self.persist(video_id)
+
+        chatbot.save_state(directory)
+        return self._register(video_id, chatbot, directory)
+
+    def _register(self, video_id: str, chatbot, directory: str) -> int:
+        status = chatbot.index_status
+        version = self.registry.register(
+            video_id, directory,
+            status="ready" if status.get("state") == "ready" else "partial",
+            language_code=chatbot.processed_videos.get(video_id, {}).get("language_code"),
+            chunk_count=status.get("indexed_chunks", 0),
+            coverage=chatbot.get_coverage(),
+        )
+        with self._lock:
+            self._versions[video_id] = version
+            self._paths[video_id] = directory
+            self._sizes[video_id] = chatbot.estimate_memory_bytes()
+        return version
+
+    def claim(self, video_id: str) -> bool:
+        """Reserve a video for processing so other workers don't ingest it too,
+        or take over a partial one whose indexer stopped sending heartbeats"""
+        return self.registry.try_claim(video_id)
+
+    def release(self, video_id: str):
+        """Give up a claim after processing failed"""
+        self.registry.release_claim(video_id)
+
+    def heartbeat(self, video_id: str):
+        """Keep a claim alive while this worker is still indexing the video"""
+        self.registry.heartbeat(video_id)
+
+    # ---- Extras ----
+
+    def peek(self, video_id: str):
+        """Return the resident chatbot without loading or touching LRU order"""
+        with self._lock:
+            return self._resident.get(video_id)
+
+    def is_resident(self, video_id: str) -> bool:
+        with self._lock:
+            return video_id in self._resident
+
+    def _drop(self, video_id: str) -> bool:
+        self._sizes.pop(video_id, None)
+        self._versions.pop(video_id, None)
+        self._paths.pop(video_id, None)
+        return self._resident.pop(video_id, None) is not None
+
+    def _enforce_budget(self, keep: Optional[str] = None):
+        """Evict least recently used sessions until within budget"""
+        evicted = []
+        with self._lock:
+            # Sessions that are still indexing keep growing, so refresh their sizes
+            for video_id, chatbot in self._resident.items():
+                if chatbot.is_indexing:
+                    self._sizes[video_id] = chatbot.estimate_memory_bytes()
+
+            resident_bytes = sum(self._sizes.values())
+            for video_id in list(self._resident):
+                over_count = self.max_videos and len(self._resident) > self.max_videos
+                over_bytes = self.max_bytes and resident_bytes > self.max_bytes
+                if not (over_count or over_bytes):
+                    break
+                chatbot = self._resident[video_id]
+                if video_id == keep or chatbot.is_indexing:
+                    continue
+                path = self._paths.get(video_id)
+                resident_bytes -= self._sizes.get(video_id, 0)
+                self._drop(video_id)
+                self.evictions += 1
+                evicted.append((video_id, chatbot, path))
+
+        # The index is already on disk; only refresh the small per-video state
+        for video_id, chatbot, path in evicted:
+            if path:
+                try:
+                    chatbot.save_state(path)
+                except Exception as e:
+                    logger.warning("⚠️ Failed to save state for %s: %s", video_id, e)
+            logger.info("💤 Evicted session %s from memory", video_id)
+
+    def get_stats(self) -> dict:
+        """Resident videos, estimated bytes, evictions and reload latency"""
+        registered = len(self.registry.list_video_ids())
+        with self._lock:
+            return {
+                "resident_videos": len(self._resident),
+                "registered_videos": registered,
+                "resident_bytes": sum(self._sizes.values()),
+                "max_videos": self.max_videos,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+                "reloads": self.reloads,
+                "avg_reload_ms": round(self.reload_time_total / self.reloads * 1000, 2) if self.reloads else 0.0,
+                "max_reload_ms": round(self.reload_time_max * 1000, 2),
+                "store_dir": self.store_dir,
+            }
@@ -0,0 +1,93 @@
+"""
+Token counting for prompt budgets.
+Uses tiktoken when its encoding is available. tiktoken downloads encodings on
+first use, so offline hosts fall back to a characters-per-token estimate
+instead of failing; either way the counts are approximations of what the
+Gemini models bill, good enough for budgeting.
+"""
+
+import math
+import threading
+from typing import List, Optional, Sequence
+
+from .logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+TOKEN_ENCODING = "cl100k_base"
+CHARS_PER_TOKEN = 4.0  # Typical for English text
+
+_encoding = None
+_encoding_loaded = False
+_encoding_lock = threading.Lock()
+
+
+def get_encoding():
+    """The tiktoken encoding, or None when tiktoken or its data is unavailable"""
+    global _encoding, _encoding_loaded
+
+    if _encoding_loaded:
+        return _encoding
+    with _encoding_lock:
+        if not _encoding_loaded:
+            try:
+                import tiktoken
+                _encoding = tiktoken.get_encoding(TOKEN_ENCODING)
+            except Exception as e:
+                logger.warning("⚠️ tiktoken unavailable (%s); estimating %.0f characters per token",
+                               e, CHARS_PER_TOKEN)
+                _encoding = None
+            _encoding_loaded = True
+    return _encoding
+
+
+def set_encoding(encoding):
+    """Use a specific encoding (anything with encode/decode), or None for the estimate"""
+    global _encoding, _encoding_loaded
+    with _encoding_lock:
+        _encoding = encoding
+        _encoding_loaded = True
+
+
+def count_tokens(text: str) -> int:
+    """
+    Number of tokens in a text.
+
+    Example:
+        >>> count_tokens("How does gradient descent work?")
+        6
+    """
+    if not text:
+        return 0
+    encoding = get_encoding()
+    if encoding is None:
+        return math.ceil(len(text) / CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def count_tokens_batch(texts: Sequence[str]) -> List[int]:
+    """Number of tokens in each text (tiktoken encodes the batch in parallel)"""
+    encoding = get_encoding()
+    if encoding is None:
+        return [math.ceil(len(text) / CHARS_PER_TOKEN) for text in texts]
+    if not hasattr(encoding, "encode_batch"):
+        return [len(encoding.encode(text, disallowed_special=())) for text in texts]
+    return [len(tokens) for tokens in encoding.encode_batch(list(texts), disallowed_special=())]
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Longest prefix of a text that fits in max_tokens"""
+    if max_tokens <= 0:
+        return ""
+    encoding = get_encoding()
+    if encoding is None:
+        return text[:int(max_tokens * CHARS_PER_TOKEN)]
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens])
+
+
+def fits_token_budget(text: str, budget: Optional[int]) -> bool:
+    """True if budget is positive and the text fits in it"""
+    return bool(budget) and budget > 0 and count_tokens(text) <= budget
@@ -0,0 +1,151 @@
+"""
+SQLite registry of processed videos.
+Shared by every worker process (and host, when the database lives on a shared
+volume) so any worker can find and load an index another worker built.
+"""
+
+import sqlite3
+import threading
+import time
+from typing import List, Optional
+
+
+class VideoRegistry:
+    """
+    Small SQLite-backed table of processed videos and where their indexes live.
+
+    Each row carries a version that is bumped whenever the index is rewritten,
+    so workers holding an older copy in memory know to reload it.
+
+    Parameters:
+        db_path (str): Path of the SQLite database file.
+        claim_timeout (float): Seconds without a heartbeat after which an
+            unfinished (processing or partial) video is considered abandoned
+            and may be taken over.
+    """
+
+    AVAILABLE_STATES = ("partial", "ready")
+
+    def __init__(self, db_path: str, claim_timeout: float = 900.0):
+        self.db_path = db_path
+        self.claim_timeout = claim_timeout
+        self._local = threading.local()
+
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS videos (
+                    video_id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    index_path TEXT,
+                    version INTEGER NOT NULL DEFAULT 0,
+                    language_code TEXT,
+                    chunk_count INTEGER DEFAULT 0,
+                    coverage REAL DEFAULT 0,
+                    updated_at REAL NOT NULL
+                )
+            """)
+
+    def _connect(self) -> sqlite3.Connection:
+        """One connection per thread; WAL lets readers run alongside a writer"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30.0)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def try_claim(self, video_id: str) -> bool:
+        """
+        Mark a video as being processed by the caller.
+
+        A partial video whose indexer has not sent a heartbeat for
+        claim_timeout seconds is claimed in place: its saved index stays
+        available while the caller resumes indexing it.
+
+        Returns:
+            bool: False if the video is ready, or another worker claimed it
+            or sent a heartbeat for it recently.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT status, updated_at FROM videos WHERE video_id = ?", (video_id,)
+            ).fetchone()
+            if row is not None:
+                if row["status"] == "ready" or now - row["updated_at"] < self.claim_timeout:
+                    return False
+                if row["status"] == "partial":
+                    conn.execute(
+                        "UPDATE videos SET updated_at = ? WHERE video_id = ?", (now, video_id))
+                    return True
+            conn.execute(
+                "INSERT OR REPLACE INTO videos (video_id, status, updated_at) VALUES (?, 'processing', ?)",
+                (video_id, now),
+            )
+            return True
+
+    def heartbeat(self, video_id: str):
+        """Refresh an unfinished video's claim so other workers don't take it over"""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE videos SET updated_at = ? WHERE video_id = ? AND status IN ('processing', 'partial')",
+                (time.time(), video_id))
+
+    def release_claim(self, video_id: str):
+        """Drop a processing claim that did not lead to an index"""
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM videos WHERE video_id = ? AND status = 'processing'", (video_id,))
+
+    def register(self, video_id: str, index_path: str, status: str,
+                 language_code: Optional[str] = None, chunk_count: int = 0,
+                 coverage: float = 0.0) -> int:
+        """
+        Record a saved index and bump its version.
+
+        Returns:
+            int: The new version number.
+        """
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT version FROM videos WHERE video_id = ?", (video_id,)).fetchone()
+            version = (row["version"] if row else 0) + 1
+            conn.execute(
+                """INSERT OR REPLACE INTO videos
+                   (video_id, status, index_path, version, language_code, chunk_count, coverage, updated_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                (video_id, status, index_path, version, language_code,
+                 chunk_count, coverage, time.time()),
+            )
+            return version
+
+    def get(self, video_id: str) -> Optional[dict]:
+        """Registry row for a video that has a usable index, or None"""
+        row = self._connect().execute(
+            "SELECT * FROM videos WHERE video_id = ? AND status IN (?, ?)",
+            (video_id, *self.AVAILABLE_STATES),
+        ).fetchone()
+        return dict(row) if row else None
+
+    def list_video_ids(self) -> List[str]:
+        """Ids of all videos with a usable index, oldest first"""
+        rows = self._connect().execute(
+            "SELECT video_id FROM videos WHERE status IN (?, ?) ORDER BY updated_at",
+            self.AVAILABLE_STATES,
+        ).fetchall()
+        return [row["video_id"] for row in rows]
+
+    def remove(self, video_id: str) -> Optional[dict]:
+        """Delete a video's row, returning it if it existed"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT * FROM videos WHERE video_id = ?", (video_id,)).fetchone()
+            conn.execute("DELETE FROM videos WHERE video_id = ?", (video_id,))
+        return dict(row) if row else None
+
+    def __contains__(self, video_id) -> bool:
+        return self.get(video_id) is not None